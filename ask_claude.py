@@ -1,24 +1,90 @@
-import boto3
 import json
-from botocore.exceptions import ClientError
+import os
+import sys
+import threading
+
+# boto3/botocore are imported on first use; they add a few hundred ms to cold starts
+
+MODEL_ID = os.environ.get('BEDROCK_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
+MAX_POOL_CONNECTIONS = int(os.environ.get('BEDROCK_MAX_POOL_CONNECTIONS', '10'))
+
+_bedrock_client = None
+_bedrock_client_lock = threading.Lock()
+_response_cache = None
+
+def create_bedrock_client(max_pool_connections=None, tcp_keepalive=True):
+    """Create a bedrock-runtime client with a sized HTTP connection pool and TCP keep-alive"""
+    import boto3
+    from botocore.config import Config
+
+    config = Config(
+        max_pool_connections=max_pool_connections or MAX_POOL_CONNECTIONS,
+        tcp_keepalive=tcp_keepalive
+    )
+    return boto3.client('bedrock-runtime', config=config)
+
+def get_bedrock_client():
+    """Return the shared bedrock-runtime client, creating it on first use"""
+    global _bedrock_client
+    if _bedrock_client is None:
+        with _bedrock_client_lock:
+            if _bedrock_client is None:
+                _bedrock_client = create_bedrock_client()
+    return _bedrock_client
+
+def set_bedrock_client(client):
+    """Replace the shared client (e.g. with a local stub); pass None to recreate it lazily"""
+    global _bedrock_client
+    with _bedrock_client_lock:
+        _bedrock_client = client
+
+def set_response_cache(cache):
+    """Put a ResponseCache in front of ask_claude; pass None to disable caching"""
+    global _response_cache
+    _response_cache = cache
+
+def get_response_cache():
+    """Return the ResponseCache in front of ask_claude, or None"""
+    return _response_cache
+
+def _is_client_error(error):
+    """Whether error is a botocore ClientError, without importing botocore"""
+    # A ClientError can only come from an already imported botocore, so nothing is imported
+    # (or can fail to import) while handling the original exception
+    exceptions = sys.modules.get('botocore.exceptions')
+    return exceptions is not None and isinstance(error, exceptions.ClientError)
+
+def ask_claude(prompt, client=None, max_tokens=1000, cache=None):
+    if cache is None:
+        cache = _response_cache
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(MODEL_ID, prompt, max_tokens)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-def ask_claude(prompt):
     try:
-        bedrock = boto3.client('bedrock-runtime')
-        
+        bedrock = client or get_bedrock_client()
+
         body = json.dumps({
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1000,
+            "max_tokens": max_tokens,
             "messages": [{"role": "user", "content": prompt}]
         })
-        
+
         response = bedrock.invoke_model(
-            modelId='anthropic.claude-3-sonnet-20240229-v1:0',
+            modelId=MODEL_ID,
             body=body
         )
-        
+
         response_body = json.loads(response['body'].read())
-        return response_body['content'][0]['text']
-        
-    except ClientError as e:
-        return f"Error: {e}"
\ No newline at end of file
+        text = response_body['content'][0]['text']
+        if cache_key is not None:
+            cache.set(cache_key, text)
+        return text
+
+    except Exception as e:
+        if not _is_client_error(e):
+            raise
+        return f"Error: {e}"
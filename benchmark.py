@@ -0,0 +1,339 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+import evaluate_purchase
+from substitute_index import SubstituteIndex
+from resilience_auditor import ResilienceAuditor
+from compliance_validator import ComplianceValidator
+from stress_tester import StressTester
+from master_auditor import MasterAuditor
+from simulation import forecast_stockouts
+from generate_raw_materials import build_config, generate_items
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_RESULTS_PATH = 'benchmark_results.json'
+DEFAULT_BASELINE_PATH = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 0.25
+# Timings below this are dominated by noise and never flagged as regressions
+MIN_COMPARABLE_SECONDS = 0.01
+# The compiled default rules may be this much slower than the original hardcoded function
+DECISION_SPEED_TOLERANCE = 0.10
+DECISION_SPEED_ITEMS = 10_000
+
+
+def synthetic_catalog(count, seed=0):
+    """Build a deterministic in-memory catalog with substitute groups and ~10% low stock"""
+    groups = max(3, count // 20)
+    config = build_config(count, groups, 'uniform', 2, 5, 0.1, min(count, 2_000), seed)
+    return list(generate_items(0, count, config))
+
+
+def decision_pairs(materials):
+    """Pair every item with a substitute when it has one, otherwise with its neighbour"""
+    index = SubstituteIndex(materials)
+    return [(item, index.find_substitute(item) or materials[i - 1]) for i, item in enumerate(materials)]
+
+
+def original_evaluate_purchase(proposed_item, current_inventory_item):
+    """Copy of the hardcoded evaluate_purchase the compiled default rules replaced, kept as their speed reference"""
+    if proposed_item['TechnicalSpecs'] != current_inventory_item['TechnicalSpecs']:
+        return 'REJECTED: Specs Mismatch'
+    
+    if proposed_item['Price'] < 1000:
+        return 'APPROVED'
+    else:
+        return 'PENDING MANAGER'
+
+
+def compare_decision_speed(materials, rounds=15, tolerance=DECISION_SPEED_TOLERANCE):
+    """Time evaluate_purchase under the default rules against original_evaluate_purchase on the same pairs.
+
+    Rounds alternate between the two functions and keep each one's fastest,
+    so machine noise hits both alike. Fails if the decisions differ or the
+    compiled rules are slower by more than tolerance.
+    """
+    pairs = decision_pairs(materials)
+    previous = evaluate_purchase.get_procurement_rules()
+    evaluate_purchase.set_procurement_rules(None)
+    try:
+        compiled = evaluate_purchase.evaluate_purchase
+        same_decisions = all(compiled(p, c) == original_evaluate_purchase(p, c) for p, c in pairs)
+        best = {}
+        for _ in range(rounds):
+            for name, decide in (('original', original_evaluate_purchase), ('compiled', compiled)):
+                start = time.perf_counter()
+                for proposed, current in pairs:
+                    decide(proposed, current)
+                seconds = time.perf_counter() - start
+                best[name] = min(best.get(name, seconds), seconds)
+    finally:
+        evaluate_purchase.set_procurement_rules(previous)
+
+    ratio = best['compiled'] / best['original'] if best['original'] > 0 else 1.0
+    return {
+        'pairs': len(pairs),
+        'original_ns': round(best['original'] / len(pairs) * 1e9, 1),
+        'compiled_ns': round(best['compiled'] / len(pairs) * 1e9, 1),
+        'ratio': round(ratio, 3),
+        'same_decisions': same_decisions,
+        'status': 'pass' if same_decisions and ratio <= 1 + tolerance else 'fail'
+    }
+
+
+def bench_evaluate_purchase(materials):
+    pairs = decision_pairs(materials)
+
+    def run():
+        decide = evaluate_purchase.evaluate_purchase
+        for proposed, current in pairs:
+            decide(proposed, current)
+    return run, len(pairs)
+
+
+def bench_evaluate_purchase_rules(materials):
+    """evaluate_purchase under a rule set using every rule type"""
+    pairs = decision_pairs(materials)
+    suppliers = sorted({item['SupplierName'] for item in materials})
+    grades = sorted({str(item['TechnicalSpecs'].get('grade')) for item in materials})
+    rules = {
+        'approval_threshold': 1000,
+        'max_lead_time': 60,
+        'categories': {grade: {'approval_threshold': 5000, 'max_lead_time': 30} for grade in grades[::2]},
+        'suppliers': {'deny': suppliers[:1]},
+    }
+
+    def run():
+        previous = evaluate_purchase.get_procurement_rules()
+        evaluate_purchase.set_procurement_rules(rules)
+        try:
+            decide = evaluate_purchase.evaluate_purchase
+            for proposed, current in pairs:
+                decide(proposed, current)
+        finally:
+            evaluate_purchase.set_procurement_rules(previous)
+    return run, len(pairs)
+
+
+def bench_evaluate_purchase_batch(materials):
+    pairs = decision_pairs(materials)
+    proposed = [p for p, c in pairs]
+    current = [c for p, c in pairs]
+    return lambda: evaluate_purchase.evaluate_purchase_batch(proposed, current), len(pairs)
+
+
+def bench_substitute_search(materials):
+    low_stock = [item for item in materials if item['DaysOnHand'] < 5]
+
+    def run():
+        index = SubstituteIndex(materials)
+        for item in low_stock:
+            index.find_substitute(item)
+    return run, len(materials)
+
+
+def bench_spec_matching_exhaustive(materials):
+    return lambda: ResilienceAuditor().test_spec_matching_accuracy(materials), len(materials)
+
+
+def bench_resilience_audit(materials):
+    auditor = ResilienceAuditor(spec_matching_mode='grouped', seed=0)
+    return lambda: auditor.generate_resilience_report(materials), len(materials)
+
+
+def bench_compliance_audit(materials):
+    return lambda: ComplianceValidator().generate_compliance_report(materials), len(materials)
+
+
+def bench_stress_test(materials):
+    return lambda: StressTester().generate_stress_test_report(materials), len(materials)
+
+
+def bench_master_audit(materials):
+    auditor = MasterAuditor()
+    auditor.resilience_auditor = ResilienceAuditor(spec_matching_mode='grouped', seed=0)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            auditor.run_comprehensive_audit(materials)
+    return run, len(materials)
+
+
+def bench_stockout_forecast(materials):
+    return lambda: forecast_stockouts(materials, seed=0), len(materials)
+
+
+# (name, setup returning (callable, items processed), max catalog size or None, why it is capped)
+BENCHMARKS = (
+    ('evaluate_purchase', bench_evaluate_purchase, None, None),
+    ('evaluate_purchase_rules', bench_evaluate_purchase_rules, None, None),
+    ('evaluate_purchase_batch', bench_evaluate_purchase_batch, None, None),
+    ('substitute_search', bench_substitute_search, None, None),
+    ('spec_matching_exhaustive', bench_spec_matching_exhaustive, 1_000, 'checks all n^2 pairs'),
+    ('resilience_audit', bench_resilience_audit, None, None),
+    ('compliance_audit', bench_compliance_audit, None, None),
+    ('stress_test', bench_stress_test, 100_000, 'deep-copies the whole catalog for the crisis scenario'),
+    ('master_audit', bench_master_audit, 100_000, 'includes the stress test'),
+    ('stockout_forecast', bench_stockout_forecast, 100_000, 'runs 10k Monte Carlo trials per item'),
+)
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_case(name, setup, materials, measure_memory=True):
+    """Time one benchmark, then re-run it under tracemalloc for its peak allocation"""
+    run, items = setup(materials)
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    result = {
+        'benchmark': name,
+        'size': len(materials),
+        'seconds': round(seconds, 6),
+        'items_per_second': round(items / seconds, 1) if seconds > 0 else None,
+        'peak_traced_bytes': None,
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+    if measure_memory:
+        # tracemalloc slows allocation-heavy code, so the timing above comes from an untraced run
+        run, items = setup(materials)
+        tracemalloc.start()
+        try:
+            run()
+            result['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        result['peak_rss_bytes'] = peak_rss_bytes()
+    return result
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, names=None, measure_memory=True, ignore_limits=False, seed=0, log=print):
+    """Run the selected benchmarks at every catalog size, returning one result per (benchmark, size)"""
+    results = []
+    for size in sizes:
+        start = time.perf_counter()
+        materials = synthetic_catalog(size, seed)
+        log(f"{size:,} items: catalog generated in {time.perf_counter() - start:.1f}s")
+        for name, setup, max_size, reason in BENCHMARKS:
+            if names and name not in names:
+                continue
+            if max_size is not None and size > max_size and not ignore_limits:
+                results.append({'benchmark': name, 'size': size, 'skipped': f"above {max_size:,} items: {reason}"})
+                log(f"  {name:<26} skipped ({reason})")
+                continue
+            result = run_case(name, setup, materials, measure_memory)
+            results.append(result)
+            memory = f", peak {result['peak_traced_bytes'] / 2**20:.1f} MiB" if result['peak_traced_bytes'] else ''
+            log(f"  {name:<26} {result['seconds']:.3f}s ({result['items_per_second'] or 0:,.0f} items/s{memory})")
+        del materials
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Return the results that are slower or use more memory than the baseline by more than tolerance"""
+    previous = {(r['benchmark'], r['size']): r for r in baseline.get('results', []) if 'skipped' not in r}
+    regressions = []
+    for result in results:
+        before = previous.get((result['benchmark'], result['size']))
+        if before is None or 'skipped' in result:
+            continue
+        checks = [('seconds', before['seconds'], result['seconds'])]
+        if before.get('peak_traced_bytes') and result.get('peak_traced_bytes'):
+            checks.append(('peak_traced_bytes', before['peak_traced_bytes'], result['peak_traced_bytes']))
+        for metric, old, new in checks:
+            if metric == 'seconds' and max(old, new) < MIN_COMPARABLE_SECONDS:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append({
+                    'benchmark': result['benchmark'],
+                    'size': result['size'],
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change_percentage': round((new / old - 1) * 100, 1)
+                })
+    return regressions
+
+
+def build_results_document(results, regressions=None, baseline_path=None, tolerance=DEFAULT_TOLERANCE,
+                           decision_speed=None):
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'baseline': baseline_path,
+        'tolerance': tolerance,
+        'decision_speed': decision_speed,
+        'results': results,
+        'regressions': regressions or []
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the decision, substitute search and audit hot paths')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--benchmarks', nargs='+', choices=[b[0] for b in BENCHMARKS], default=None)
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--ignore-size-limits', action='store_true',
+                        help='Also run benchmarks above their size limit (quadratic paths)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_RESULTS_PATH)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown or memory growth before flagging a regression (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    print("=== PROCUREMENT AGENT BENCHMARKS ===")
+    results = run_benchmarks(args.sizes, args.benchmarks, not args.no_memory, args.ignore_size_limits, args.seed)
+
+    decision_speed = compare_decision_speed(synthetic_catalog(DECISION_SPEED_ITEMS, args.seed))
+    print(f"\nCompiled default rules vs original evaluate_purchase: {decision_speed['compiled_ns']}ns vs "
+          f"{decision_speed['original_ns']}ns per decision ({decision_speed['status'].upper()})")
+
+    regressions = []
+    baseline_used = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        baseline_used = args.baseline
+
+    document = build_results_document(results, regressions, baseline_used, args.tolerance, decision_speed)
+    with open(args.output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if decision_speed['status'] == 'fail':
+        reason = 'decide differently' if not decision_speed['same_decisions'] else \
+            f"are {decision_speed['ratio'] - 1:.0%} slower (tolerance {DECISION_SPEED_TOLERANCE:.0%})"
+        print(f"The compiled default rules {reason} than the original evaluate_purchase")
+        sys.exit(1)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif baseline_used is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for r in regressions:
+            print(f"  - {r['benchmark']} @ {r['size']:,}: {r['metric']} {r['baseline']} -> {r['current']} "
+                  f"(+{r['change_percentage']}%)")
+        sys.exit(1)
+    else:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
@@ -1,110 +1,201 @@
 import json
 import re
+from collections import Counter
+import numpy as np
 from datetime import datetime, timedelta
+from material_table import MaterialTable
+from inventory_loader import iter_chunks
+
+REQUIRED_FIELDS = ('SKU', 'SupplierName', 'Price', 'LeadTime', 'DaysOnHand', 'TechnicalSpecs')
+SPEC_FIELDS = ('density', 'tensile_strength', 'grade')
+SKU_PATTERN = re.compile(r'^SKU-\d{4}-[A-Za-z]{3}$')
+MAX_LEAD_TIME_DAYS = 365
+# validate_procurement_decisions compares each of the first 10 items with the next 5
+DECISION_SAMPLE_SIZE = 15
+
+# Violation types counted under each report summary heading
+SUMMARY_CATEGORIES = {
+    'data_integrity': lambda kind: 'missing' in kind or 'invalid' in kind,
+    'business_rules': lambda kind: kind in ('duplicate_sku', 'negative_inventory'),
+    'decision_logic': lambda kind: 'decision' in kind,
+    'audit_trail': lambda kind: 'audit' in kind,
+}
+
+_ABSENT = object()
+
+def duplicate_skus(skus):
+    """Return the SKUs that occur more than once, in the order their first repeat is seen"""
+    seen = set()
+    duplicates = {}
+    for sku in skus:
+        if sku in seen:
+            duplicates[sku] = None
+        else:
+            seen.add(sku)
+    return list(duplicates)
 
 class ComplianceValidator:
     def __init__(self):
         self.violations = []
         self.warnings = []
         
+    def item_integrity_violations(self, item):
+        """Return the data completeness and format violations for a single item"""
+        violations = []
+        
+        # Check required fields
+        for field in REQUIRED_FIELDS:
+            if field not in item or item[field] is None:
+                violations.append({
+                    'type': 'missing_required_field',
+                    'sku': item.get('SKU', 'UNKNOWN'),
+                    'field': field
+                })
+        
+        # Validate SKU format
+        if 'SKU' in item and not SKU_PATTERN.match(item['SKU']):
+            violations.append({
+                'type': 'invalid_sku_format',
+                'sku': item['SKU'],
+                'expected_format': 'SKU-####-XXX'
+            })
+        
+        # Validate price is positive
+        if 'Price' in item and item['Price'] <= 0:
+            violations.append({
+                'type': 'invalid_price',
+                'sku': item['SKU'],
+                'price': item['Price']
+            })
+        
+        # Validate technical specs
+        if 'TechnicalSpecs' in item:
+            for spec_field in SPEC_FIELDS:
+                if spec_field not in item['TechnicalSpecs']:
+                    violations.append({
+                        'type': 'missing_technical_spec',
+                        'sku': item['SKU'],
+                        'missing_spec': spec_field
+                    })
+        
+        return violations
+    
+    def item_findings(self, item):
+        """Return (integrity violations, rule violations, rule warnings) for a single item.
+        
+        Clean items are cleared by inline checks; any item that trips one goes
+        through the per-item methods, so findings are built exactly as they are.
+        """
+        integrity = rule_violations = warnings = ()
+        if (None in map(item.get, REQUIRED_FIELDS) or not SKU_PATTERN.match(item.get('SKU', ''))
+                or not item['Price'] > 0 or not all(f in item['TechnicalSpecs'] for f in SPEC_FIELDS)):
+            integrity = self.item_integrity_violations(item)
+        if item.get('LeadTime', 0) > MAX_LEAD_TIME_DAYS or item.get('DaysOnHand', 0) < 0:
+            rule_violations, warnings = self.item_rule_findings(item)
+        return integrity, rule_violations, warnings
+    
     def validate_data_integrity(self, materials):
         """Validate data completeness and format"""
-        required_fields = ['SKU', 'SupplierName', 'Price', 'LeadTime', 'DaysOnHand', 'TechnicalSpecs']
-        spec_fields = ['density', 'tensile_strength', 'grade']
-        
         for item in materials:
-            # Check required fields
-            for field in required_fields:
-                if field not in item or item[field] is None:
-                    self.violations.append({
-                        'type': 'missing_required_field',
-                        'sku': item.get('SKU', 'UNKNOWN'),
-                        'field': field
-                    })
-            
-            # Validate SKU format
-            if 'SKU' in item and not re.match(r'^SKU-\d{4}-[A-Za-z]{3}$', item['SKU']):
-                self.violations.append({
-                    'type': 'invalid_sku_format',
-                    'sku': item['SKU'],
-                    'expected_format': 'SKU-####-XXX'
-                })
-            
-            # Validate price is positive
-            if 'Price' in item and item['Price'] <= 0:
-                self.violations.append({
-                    'type': 'invalid_price',
-                    'sku': item['SKU'],
-                    'price': item['Price']
-                })
-            
-            # Validate technical specs
-            if 'TechnicalSpecs' in item:
-                for spec_field in spec_fields:
-                    if spec_field not in item['TechnicalSpecs']:
-                        self.violations.append({
-                            'type': 'missing_technical_spec',
-                            'sku': item['SKU'],
-                            'missing_spec': spec_field
-                        })
+            self.violations.extend(self.item_integrity_violations(item))
+    
+    def item_rule_findings(self, item):
+        """Return the per-item business rule (violations, warnings) for a single item"""
+        violations = []
+        warnings = []
+        
+        # Check for unrealistic lead times
+        if item.get('LeadTime', 0) > MAX_LEAD_TIME_DAYS:
+            warnings.append({
+                'type': 'excessive_lead_time',
+                'sku': item['SKU'],
+                'lead_time': item['LeadTime']
+            })
+        
+        # Check for negative days on hand
+        if item.get('DaysOnHand', 0) < 0:
+            violations.append({
+                'type': 'negative_inventory',
+                'sku': item['SKU'],
+                'days_on_hand': item['DaysOnHand']
+            })
+        
+        return violations, warnings
     
     def validate_business_rules(self, materials):
         """Validate business logic compliance"""
-        # Check for duplicate SKUs
-        skus = [item['SKU'] for item in materials if 'SKU' in item]
-        duplicates = set([sku for sku in skus if skus.count(sku) > 1])
+        if isinstance(materials, MaterialTable):
+            return self.validate_business_rules_columnar(materials)
         
-        for sku in duplicates:
+        # Check for duplicate SKUs
+        for sku in duplicate_skus(item['SKU'] for item in materials if 'SKU' in item):
             self.violations.append({
                 'type': 'duplicate_sku',
                 'sku': sku
             })
         
-        # Check for unrealistic lead times
         for item in materials:
-            if item.get('LeadTime', 0) > 365:
-                self.warnings.append({
-                    'type': 'excessive_lead_time',
-                    'sku': item['SKU'],
-                    'lead_time': item['LeadTime']
-                })
+            violations, warnings = self.item_rule_findings(item)
+            self.violations.extend(violations)
+            self.warnings.extend(warnings)
+    
+    def validate_business_rules_columnar(self, table):
+        """Validate business logic compliance with vectorized column checks"""
+        unique_skus, counts = np.unique(table.skus, return_counts=True)
+        for sku in unique_skus[counts > 1].tolist():
+            self.violations.append({
+                'type': 'duplicate_sku',
+                'sku': sku
+            })
+        
+        for i in np.flatnonzero(table.lead_time > MAX_LEAD_TIME_DAYS).tolist():
+            self.warnings.append({
+                'type': 'excessive_lead_time',
+                'sku': str(table.skus[i]),
+                'lead_time': table.lead_time[i].item()
+            })
+        
+        for i in np.flatnonzero(table.days_on_hand < 0).tolist():
+            self.violations.append({
+                'type': 'negative_inventory',
+                'sku': str(table.skus[i]),
+                'days_on_hand': table.days_on_hand[i].item()
+            })
+    
+    def pair_decision_violation(self, item1, item2):
+        """Return a violation if evaluate_purchase fails or answers outside DECISIONS for a pair, else None"""
+        try:
+            from evaluate_purchase import evaluate_purchase, DECISIONS
+            decision = evaluate_purchase(item1, item2)
             
-            # Check for negative days on hand
-            if item.get('DaysOnHand', 0) < 0:
-                self.violations.append({
-                    'type': 'negative_inventory',
-                    'sku': item['SKU'],
-                    'days_on_hand': item['DaysOnHand']
-                })
+            # Validate decision format
+            if decision not in DECISIONS:
+                return {
+                    'type': 'invalid_decision_format',
+                    'item1': item1['SKU'],
+                    'item2': item2['SKU'],
+                    'decision': decision
+                }
+                
+        except Exception as e:
+            return {
+                'type': 'decision_function_error',
+                'item1': item1['SKU'],
+                'item2': item2['SKU'],
+                'error': str(e)
+            }
+        return None
     
     def validate_procurement_decisions(self, materials):
         """Validate procurement decision logic"""
         decision_errors = []
         
-        # Test decision consistency
+        # Test decision consistency; sampling_audit.SamplingAuditor checks a uniform sample of pairs instead
         for i, item1 in enumerate(materials[:10]):  # Sample for performance
             for item2 in materials[i+1:i+6]:
-                try:
-                    from evaluate_purchase import evaluate_purchase
-                    decision = evaluate_purchase(item1, item2)
-                    
-                    # Validate decision format
-                    valid_decisions = ['APPROVED', 'REJECTED: Specs Mismatch', 'PENDING MANAGER']
-                    if decision not in valid_decisions:
-                        decision_errors.append({
-                            'type': 'invalid_decision_format',
-                            'item1': item1['SKU'],
-                            'item2': item2['SKU'],
-                            'decision': decision
-                        })
-                        
-                except Exception as e:
-                    decision_errors.append({
-                        'type': 'decision_function_error',
-                        'item1': item1['SKU'],
-                        'item2': item2['SKU'],
-                        'error': str(e)
-                    })
+                violation = self.pair_decision_violation(item1, item2)
+                if violation is not None:
+                    decision_errors.append(violation)
         
         self.violations.extend(decision_errors)
     
@@ -141,11 +232,58 @@ class ComplianceValidator:
     
     def generate_compliance_report(self, materials):
         """Generate comprehensive compliance report"""
-        self.validate_data_integrity(materials)
-        self.validate_business_rules(materials)
-        self.validate_procurement_decisions(materials)
+        if isinstance(materials, MaterialTable):
+            self.validate_data_integrity(materials)
+            self.validate_business_rules(materials)
+            self.validate_procurement_decisions(materials)
+            self.validate_audit_trail()
+            return self.build_compliance_report()
+        
+        return self.generate_compliance_report_from_chunks([materials])
+    
+    def generate_compliance_report_from_chunks(self, chunks):
+        """Generate the compliance report in one pass over chunks of materials, e.g. from inventory_loader.iter_chunks"""
+        integrity = []
+        rule_violations = []
+        seen = set()
+        duplicates = {}
+        head = []
+        item_findings = self.item_findings
+        
+        # Only SKUs and the first items (for decision sampling) are kept beyond the current chunk
+        for chunk in chunks:
+            for item in chunk:
+                item_integrity, item_violations, item_warnings = item_findings(item)
+                if item_integrity:
+                    integrity.extend(item_integrity)
+                if item_violations or item_warnings:
+                    rule_violations.extend(item_violations)
+                    self.warnings.extend(item_warnings)
+                sku = item.get('SKU', _ABSENT)
+                if sku is not _ABSENT:
+                    if sku in seen:
+                        duplicates[sku] = None
+                    else:
+                        seen.add(sku)
+                if len(head) < DECISION_SAMPLE_SIZE:
+                    head.append(item)
+        
+        # Same order as a multi-pass run: integrity, business rules, decisions, audit trail
+        self.violations.extend(integrity)
+        for sku in duplicates:
+            self.violations.append({
+                'type': 'duplicate_sku',
+                'sku': sku
+            })
+        self.violations.extend(rule_violations)
+        self.validate_procurement_decisions(head)
         self.validate_audit_trail()
         
+        return self.build_compliance_report()
+    
+    def build_compliance_report(self):
+        """Build the compliance report from the collected violations and warnings"""
+        violation_counts = Counter(v['type'] for v in self.violations)
         report = {
             'timestamp': datetime.now().isoformat(),
             'compliance_score': self.calculate_compliance_score(),
@@ -154,21 +292,20 @@ class ComplianceValidator:
             'violations': self.violations,
             'warnings': self.warnings,
             'summary': {
-                'data_integrity': len([v for v in self.violations if 'missing' in v['type'] or 'invalid' in v['type']]),
-                'business_rules': len([v for v in self.violations if v['type'] in ['duplicate_sku', 'negative_inventory']]),
-                'decision_logic': len([v for v in self.violations if 'decision' in v['type']]),
-                'audit_trail': len([v for v in self.violations if 'audit' in v['type']])
+                category: sum(count for kind, count in violation_counts.items() if matches(kind))
+                for category, matches in SUMMARY_CATEGORIES.items()
+            },
+            'rule_counts': {
+                'violations': dict(violation_counts),
+                'warnings': dict(Counter(w['type'] for w in self.warnings))
             }
         }
         
         return report
 
 if __name__ == "__main__":
-    with open('raw_materials.json', 'r') as f:
-        materials = json.load(f)
-    
     validator = ComplianceValidator()
-    report = validator.generate_compliance_report(materials)
+    report = validator.generate_compliance_report_from_chunks(iter_chunks())
     
     print("=== PROCUREMENT AGENT COMPLIANCE AUDIT ===")
     print(f"Timestamp: {report['timestamp']}")
@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from ask_claude import ask_claude
+from inventory_loader import load_materials, DEFAULT_INVENTORY_PATH
+from simulation import iter_low_stock, build_switch_prompt, build_substitute_index
+
+DEFAULT_CONCURRENCY = 16
+MAX_BATCH_SIZE = 10
+UNSAFE_FILENAME_CHARACTERS = re.compile(r'[^A-Za-z0-9._-]')
+
+
+def find_switch_proposals(materials, substitute_index=None):
+    """Return (low_stock_item, substitute) for every low-stock item that has a substitute"""
+    if substitute_index is None:
+        substitute_index = build_substitute_index(materials)
+    proposals = []
+    without_substitute = []
+    for item in iter_low_stock(materials):
+        substitute = substitute_index.find_substitute(item)
+        if substitute:
+            proposals.append((item, substitute))
+        else:
+            without_substitute.append(item['SKU'])
+    return proposals, without_substitute
+
+
+def build_batch_prompt(proposals):
+    """Build one prompt asking for a supplier switch email per proposal as a JSON array"""
+    entries = [
+        {
+            'id': k,
+            'current_sku': item['SKU'],
+            'current_supplier': item['SupplierName'],
+            'current_price': item['Price'],
+            'days_on_hand': item['DaysOnHand'],
+            'substitute_sku': substitute['SKU'],
+            'substitute_supplier': substitute['SupplierName'],
+            'substitute_price': substitute['Price'],
+            'technical_specs': item['TechnicalSpecs']
+        }
+        for k, (item, substitute) in enumerate(proposals)
+    ]
+    return f"""For each proposal below, write a short professional email to the R&D department proposing a supplier switch from the current item to the substitute. Both items in a proposal have identical technical specifications.
+
+Focus on the price difference and supply continuity. Keep each email under 150 words.
+
+Proposals (JSON):
+{json.dumps(entries, indent=1)}
+
+Respond with only a JSON array containing one object per proposal, in the form [{{"id": <proposal id>, "email": "<email text>"}}], and no other text."""
+
+
+def parse_batch_response(text, count):
+    """Split a batched reply into per-proposal emails, raising ValueError if it is malformed"""
+    start, end = text.find('['), text.rfind(']')
+    if start == -1 or end < start:
+        raise ValueError('No JSON array in batched response')
+    try:
+        entries = json.loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise ValueError(f'Invalid JSON in batched response: {e}')
+
+    emails = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, dict) and isinstance(entry.get('id'), int) and isinstance(entry.get('email'), str):
+            emails[entry['id']] = entry['email']
+    if sorted(emails) != list(range(count)):
+        raise ValueError(f'Batched response covered {len(emails)} of {count} proposals')
+    return [emails[k] for k in range(count)]
+
+
+def generate_batch_emails(proposals, client=None):
+    """Generate emails for several proposals in one call, falling back to one call per proposal"""
+    reply = ask_claude(build_batch_prompt(proposals), client, max_tokens=min(4096, 350 * len(proposals) + 200))
+    try:
+        return parse_batch_response(reply, len(proposals)), True
+    except ValueError:
+        return [ask_claude(build_switch_prompt(item, substitute), client) for item, substitute in proposals], False
+
+
+def email_result(item, substitute, email, start, batched=False):
+    """Build the manifest entry for one generated email"""
+    return {
+        'sku': item['SKU'],
+        'supplier': item['SupplierName'],
+        'days_on_hand': item['DaysOnHand'],
+        'substitute_sku': substitute['SKU'],
+        'substitute_supplier': substitute['SupplierName'],
+        'status': 'error' if email.startswith('Error:') else 'generated',
+        'batched': batched,
+        'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+        'email': email
+    }
+
+
+async def generate_email(item, substitute, semaphore, executor, client=None):
+    """Generate one supplier switch email once a semaphore slot is free"""
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            email = await loop.run_in_executor(executor, ask_claude, build_switch_prompt(item, substitute), client)
+        except Exception as e:
+            email = f"Error: {e}"
+        return [email_result(item, substitute, email, start)]
+
+
+async def generate_batch(batch, semaphore, executor, client=None):
+    """Generate the emails for one batch of proposals once a semaphore slot is free"""
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            emails, batched = await loop.run_in_executor(executor, generate_batch_emails, batch, client)
+        except Exception as e:
+            emails, batched = [f"Error: {e}"] * len(batch), False
+        return [email_result(item, substitute, email, start, batched)
+                for (item, substitute), email in zip(batch, emails)]
+
+
+async def generate_emails(proposals, concurrency=DEFAULT_CONCURRENCY, client=None, batch_size=1):
+    """Generate emails for all proposals concurrently, at most `concurrency` requests in flight"""
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    semaphore = asyncio.Semaphore(concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if batch_size == 1:
+            tasks = (generate_email(item, substitute, semaphore, executor, client) for item, substitute in proposals)
+        else:
+            tasks = (generate_batch(proposals[k:k + batch_size], semaphore, executor, client)
+                     for k in range(0, len(proposals), batch_size))
+        groups = await asyncio.gather(*tasks)
+    return [result for group in groups for result in group]
+
+
+def email_filename(sku, used):
+    """A safe, unused file name for a SKU's email; repeated SKUs get -2, -3, ... suffixes"""
+    stem = UNSAFE_FILENAME_CHARACTERS.sub('_', os.path.basename(str(sku))).strip('.') or 'item'
+    filename = f"{stem}.txt"
+    suffix = 1
+    while filename.lower() in used:
+        suffix += 1
+        filename = f"{stem}-{suffix}.txt"
+    used.add(filename.lower())
+    return filename
+
+
+def write_results(results, output_dir, without_substitute=(), elapsed=None):
+    """Write one email file per item plus a manifest.json, returning the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    items = []
+    used = set()
+    for result in results:
+        filename = email_filename(result['sku'], used)
+        with open(os.path.join(output_dir, filename), 'w') as f:
+            f.write(result['email'])
+        entry = {key: value for key, value in result.items() if key != 'email'}
+        entry['file'] = filename
+        items.append(entry)
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(),
+        'emails_generated': len([r for r in results if r['status'] == 'generated']),
+        'errors': len([r for r in results if r['status'] == 'error']),
+        'batched_emails': len([r for r in results if r['batched']]),
+        'items_without_substitutes': list(without_substitute),
+        'elapsed_seconds': elapsed,
+        'items': items
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def run_pipeline(materials, output_dir='supplier_switch_emails', concurrency=DEFAULT_CONCURRENCY, client=None,
+                 batch_size=1):
+    """Find every low-stock item with a substitute and generate all emails concurrently"""
+    proposals, without_substitute = find_switch_proposals(materials)
+    start = time.perf_counter()
+    results = asyncio.run(generate_emails(proposals, concurrency, client, batch_size))
+    elapsed = round(time.perf_counter() - start, 3)
+    return write_results(results, output_dir, without_substitute, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate supplier switch emails for all low-stock items')
+    parser.add_argument('--materials', default=DEFAULT_INVENTORY_PATH, help='Catalog as a JSON array or NDJSON')
+    parser.add_argument('--output-dir', default='supplier_switch_emails')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help=f'Pack up to this many proposals into one prompt (max {MAX_BATCH_SIZE})')
+    parser.add_argument('--fake-latency', type=float, default=None,
+                        help='Use an offline fake Bedrock backend with this per-call latency in seconds')
+    args = parser.parse_args()
+
+    materials = load_materials(args.materials)
+
+    client = None
+    if args.fake_latency is not None:
+        from fake_bedrock import FakeBedrockClient
+        client = FakeBedrockClient(latency=args.fake_latency)
+
+    manifest = run_pipeline(materials, args.output_dir, args.concurrency, client, args.batch_size)
+
+    print("=== SUPPLIER SWITCH EMAIL PIPELINE ===")
+    print(f"Emails generated: {manifest['emails_generated']}")
+    print(f"Errors: {manifest['errors']}")
+    print(f"Emails from batched prompts: {manifest['batched_emails']}")
+    print(f"Low-stock items without substitutes: {len(manifest['items_without_substitutes'])}")
+    print(f"Elapsed: {manifest['elapsed_seconds']:.2f}s with concurrency {args.concurrency}")
+    if client is not None:
+        print(f"Model calls: {client.calls} (at most {client.max_in_flight} at once)")
+    if manifest['elapsed_seconds']:
+        print(f"Throughput: {len(manifest['items']) / manifest['elapsed_seconds']:.1f} emails/s")
+    print(f"\nManifest saved to {os.path.join(args.output_dir, 'manifest.json')}")
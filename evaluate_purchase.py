@@ -1,8 +1,87 @@
-def evaluate_purchase(proposed_item, current_inventory_item):
-    if proposed_item['TechnicalSpecs'] != current_inventory_item['TechnicalSpecs']:
-        return 'REJECTED: Specs Mismatch'
-    
-    if proposed_item['Price'] < 1000:
-        return 'APPROVED'
-    else:
-        return 'PENDING MANAGER'
\ No newline at end of file
+from substitute_index import spec_key
+from procurement_rules import (ProcurementRules, load_rules, DEFAULT_RULES_PATH, DECISIONS,
+                               DECISION_APPROVED, DECISION_REJECTED, DECISION_PENDING,
+                               DECISION_SUPPLIER_REJECTED, DECISION_LEAD_TIME_REJECTED)
+
+# numpy and MaterialTable are imported inside the batch functions so the scalar decision path starts fast
+
+# Active rule set; PROCUREMENT_RULES_PATH points at a JSON or YAML file, otherwise the default rules apply
+_rules = ProcurementRules(load_rules(DEFAULT_RULES_PATH) if DEFAULT_RULES_PATH else None)
+
+# The active rule set's compiled decision function itself, so a call costs no more than the original
+# hardcoded function. set_procurement_rules rebinds it: look it up on this module to follow rule changes.
+evaluate_purchase = _rules.decide
+
+def set_procurement_rules(rules):
+    """Replace the active rule set with a ProcurementRules, a rules dict, or None for the defaults"""
+    global _rules, evaluate_purchase
+    if not isinstance(rules, ProcurementRules):
+        rules = ProcurementRules(rules)
+    _rules = rules
+    evaluate_purchase = rules.decide
+
+def get_procurement_rules():
+    return _rules
+
+def decide(proposed_groups, current_groups, proposed_prices):
+    """Vectorized decision on spec-group ids and prices, returning decision codes"""
+    import numpy as np
+    return _rules.decide_codes(np.asarray(proposed_groups) == np.asarray(current_groups), proposed_prices)
+
+def evaluate_purchase_batch(proposed_items, current_items):
+    """Evaluate aligned sequences of proposed and current items, returning decision codes"""
+    if len(proposed_items) != len(current_items):
+        raise ValueError('proposed_items and current_items must have the same length')
+    import numpy as np
+
+    group_ids = {}
+    def groups(items):
+        return np.fromiter((group_ids.setdefault(spec_key(item['TechnicalSpecs']), len(group_ids))
+                            for item in items), dtype=np.int64, count=len(items))
+
+    rules = _rules
+    count = len(proposed_items)
+    specs_match = groups(proposed_items) == groups(current_items)
+    prices = np.fromiter((item['Price'] for item in proposed_items), dtype=np.float64, count=count)
+    thresholds = max_lead_times = lead_times = supplier_ok = None
+    if rules.uses_categories:
+        limits = [rules.category_limits(item['TechnicalSpecs']) for item in proposed_items]
+        thresholds = np.fromiter((threshold for threshold, max_lead in limits), dtype=np.float64, count=count)
+        max_lead_times = np.fromiter((np.nan if max_lead is None else max_lead for threshold, max_lead in limits),
+                                     dtype=np.float64, count=count)
+    if rules.uses_lead_time:
+        lead_times = np.fromiter((item['LeadTime'] for item in proposed_items), dtype=np.float64, count=count)
+    if rules.uses_suppliers:
+        supplier_ok = np.fromiter((rules.supplier_allowed(item['SupplierName']) for item in proposed_items),
+                                  dtype=bool, count=count)
+    return rules.decide_codes(specs_match, prices, thresholds, lead_times, max_lead_times, supplier_ok)
+
+def evaluate_purchase_pairs(catalog, proposed_index, current_index):
+    """Evaluate index pairs into a catalog (material list or MaterialTable), returning decision codes"""
+    import numpy as np
+    from material_table import MaterialTable
+    table = MaterialTable.from_records(catalog)
+    proposed_index = np.asarray(proposed_index, dtype=np.int64)
+    current_index = np.asarray(current_index, dtype=np.int64)
+    proposed_groups = table.spec_group[proposed_index]
+
+    # Rule lookups are compiled into per-spec-group and per-supplier tables, then gathered per pair
+    rules = _rules
+    thresholds = max_lead_times = lead_times = supplier_ok = None
+    if rules.uses_categories:
+        limits = [rules.category_limits(spec) for spec in table.specs]
+        thresholds = np.array([threshold for threshold, max_lead in limits], dtype=np.float64)[proposed_groups]
+        max_lead_times = np.array([np.nan if max_lead is None else max_lead for threshold, max_lead in limits],
+                                  dtype=np.float64)[proposed_groups]
+    if rules.uses_lead_time:
+        lead_times = table.lead_time[proposed_index]
+    if rules.uses_suppliers:
+        allowed = np.array([rules.supplier_allowed(name) for name in table.suppliers], dtype=bool)
+        supplier_ok = allowed[table.supplier_codes[proposed_index]]
+    return rules.decide_codes(proposed_groups == table.spec_group[current_index], table.price[proposed_index],
+                              thresholds, lead_times, max_lead_times, supplier_ok)
+
+def decision_strings(codes):
+    """Translate decision codes into the strings returned by evaluate_purchase"""
+    import numpy as np
+    return [DECISIONS[code] for code in np.asarray(codes).tolist()]
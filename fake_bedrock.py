@@ -0,0 +1,106 @@
+import io
+import json
+import re
+import threading
+import time
+
+BATCH_PROPOSALS = re.compile(r'Proposals \(JSON\):\n(\[.*?\])\n\n', re.DOTALL)
+
+
+class FakeBedrockClient:
+    """Offline stand-in for a bedrock-runtime client.
+
+    Implements invoke_model with a configurable latency and canned reply so
+    the email pipeline can be exercised and benchmarked without AWS access.
+    Batched email prompts get a JSON array reply, or deliberately broken
+    output when malformed_batches is set. calls and max_in_flight record
+    how many requests were made and how many overlapped at most.
+    """
+
+    def __init__(self, latency=0.0, response_text='Stub response from FakeBedrockClient', malformed_batches=False):
+        self.latency = latency
+        self.response_text = response_text
+        self.malformed_batches = malformed_batches
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def reply_for(self, prompt):
+        """Return the text the fake model answers with"""
+        match = BATCH_PROPOSALS.search(prompt)
+        if match is None:
+            return self.response_text
+        if self.malformed_batches:
+            return '[{"id": 0, "email": "truncated'
+        proposals = json.loads(match.group(1))
+        return json.dumps([
+            {'id': p['id'], 'email': f"{self.response_text} ({p['current_sku']} -> {p['substitute_sku']})"}
+            for p in proposals
+        ])
+
+    def invoke_model(self, modelId, body, **kwargs):
+        request = json.loads(body)
+        prompt = request['messages'][0]['content']
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        payload = json.dumps({
+            'content': [{'type': 'text', 'text': self.reply_for(prompt)}],
+            'model': modelId,
+            'stop_reason': 'end_turn'
+        }).encode('utf-8')
+        return {'body': io.BytesIO(payload), 'contentType': 'application/json'}
+
+
+def measure_client_reuse(calls=50, region_name='us-east-1'):
+    """Compare a new boto3 client per call against the shared client, with a stub transport"""
+    import boto3
+    from ask_claude import ask_claude, create_bedrock_client
+
+    stub = FakeBedrockClient()
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        # Client construction cost is what the old ask_claude paid on every call
+        boto3.client('bedrock-runtime', region_name=region_name)
+        ask_claude('ping', client=stub)
+    per_call_new = (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    create_bedrock_client()
+    creation = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        ask_claude('ping', client=stub)
+    per_call_shared = (time.perf_counter() - start) / calls
+
+    return {
+        'calls': calls,
+        'new_client_per_call_ms': per_call_new * 1000,
+        'shared_client_per_call_ms': per_call_shared * 1000,
+        'savings_per_call_ms': (per_call_new - per_call_shared) * 1000,
+        'shared_client_creation_ms': creation * 1000
+    }
+
+
+if __name__ == "__main__":
+    import os
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+    results = measure_client_reuse()
+    print("=== BEDROCK CLIENT REUSE BENCHMARK (offline) ===")
+    print(f"Calls: {results['calls']}")
+    print(f"New client per call: {results['new_client_per_call_ms']:.2f} ms")
+    print(f"Shared client:       {results['shared_client_per_call_ms']:.2f} ms")
+    print(f"Savings per call:    {results['savings_per_call_ms']:.2f} ms")
+    print(f"One-time shared client creation: {results['shared_client_creation_ms']:.2f} ms")
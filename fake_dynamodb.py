@@ -0,0 +1,182 @@
+import copy
+import re
+import threading
+import time
+import zlib
+
+MAX_BATCH_WRITE_ITEMS = 25
+DEFAULT_SCAN_PAGE_SIZE = 1000
+
+_COMPARISON = re.compile(r'^\s*(\w+)\s*(=|<=|>=|<|>)\s*(:\w+)\s*$')
+_OPERATORS = {
+    '=': lambda a, b: a == b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def segment_of(key, total_segments):
+    """Stable segment number for a partition key value, as used by parallel scans"""
+    return zlib.crc32(str(key).encode('utf-8')) % total_segments
+
+
+def _check_types(value):
+    # boto3 refuses floats; numbers must be sent as Decimal
+    if isinstance(value, float):
+        raise TypeError('Float types are not supported. Use Decimal types instead.')
+    if isinstance(value, dict):
+        for v in value.values():
+            _check_types(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _check_types(v)
+
+
+def parse_key_condition(expression, values):
+    """Turn 'a = :x AND b < :y' into [(attribute, test, value)]"""
+    conditions = []
+    for part in re.split(r'\s+AND\s+', expression, flags=re.IGNORECASE):
+        match = _COMPARISON.match(part)
+        if match is None:
+            raise ValueError(f"Unsupported key condition: {part!r}")
+        attribute, operator, placeholder = match.groups()
+        conditions.append((attribute, _OPERATORS[operator], values[placeholder]))
+    return conditions
+
+
+class FakeDynamoDBTable:
+    """In-process stand-in for a boto3 DynamoDB Table resource.
+
+    Supports put_item, get_item, paginated and segmented scan, and query on
+    the table or a global secondary index, with DynamoDB's type rules (no
+    floats) and pagination via LastEvaluatedKey. latency is added to every
+    request, so parallel scans can be measured offline.
+    """
+
+    def __init__(self, name, key_schema, indexes=None, latency=0.0, page_size=DEFAULT_SCAN_PAGE_SIZE):
+        self.name = name
+        self.hash_key = next(k['AttributeName'] for k in key_schema if k['KeyType'] == 'HASH')
+        # index name -> (partition attribute, sort attribute or None)
+        self.indexes = {}
+        for index in indexes or ():
+            keys = {k['KeyType']: k['AttributeName'] for k in index['KeySchema']}
+            self.indexes[index['IndexName']] = (keys['HASH'], keys.get('RANGE'))
+        self.latency = latency
+        self.page_size = page_size
+        self.requests = 0
+        self._items = {}
+        self._segments = {}
+        # index name -> keys of the items carrying its partition attribute
+        self._index_keys = {name: set() for name in self.indexes}
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _put(self, item):
+        _check_types(item)
+        key = item[self.hash_key]
+        with self._lock:
+            if key not in self._items:
+                self._segments.clear()
+            self._items[key] = copy.deepcopy(item)
+            for name, (partition, sort) in self.indexes.items():
+                if partition in item and (sort is None or sort in item):
+                    self._index_keys[name].add(key)
+                else:
+                    self._index_keys[name].discard(key)
+
+    def put_item(self, Item, **kwargs):
+        self._request()
+        self._put(Item)
+        return {}
+
+    def get_item(self, Key, **kwargs):
+        self._request()
+        with self._lock:
+            item = self._items.get(Key[self.hash_key])
+        return {'Item': copy.deepcopy(item)} if item is not None else {}
+
+    def _segment_keys(self, segment, total_segments):
+        with self._lock:
+            if total_segments not in self._segments:
+                buckets = [[] for _ in range(total_segments)]
+                for key in self._items:
+                    buckets[segment_of(key, total_segments)].append(key)
+                self._segments[total_segments] = (buckets, [{k: i for i, k in enumerate(b)} for b in buckets])
+            buckets, positions = self._segments[total_segments]
+            return buckets[segment], positions[segment]
+
+    def _page(self, keys, start, limit):
+        page = []
+        with self._lock:
+            for key in keys[start:start + limit]:
+                if key in self._items:
+                    page.append(copy.deepcopy(self._items[key]))
+        response = {'Items': page, 'Count': len(page), 'ScannedCount': len(page)}
+        if start + limit < len(keys):
+            response['LastEvaluatedKey'] = {self.hash_key: keys[start + limit - 1]}
+        return response
+
+    def scan(self, Segment=0, TotalSegments=1, ExclusiveStartKey=None, Limit=None, **kwargs):
+        self._request()
+        keys, positions = self._segment_keys(Segment, TotalSegments)
+        start = positions[ExclusiveStartKey[self.hash_key]] + 1 if ExclusiveStartKey else 0
+        return self._page(keys, start, Limit or self.page_size)
+
+    def query(self, KeyConditionExpression, ExpressionAttributeValues, IndexName=None,
+              ExclusiveStartKey=None, Limit=None, **kwargs):
+        self._request()
+        _check_types(ExpressionAttributeValues)
+        conditions = parse_key_condition(KeyConditionExpression, ExpressionAttributeValues)
+        sort = self.indexes[IndexName][1] if IndexName else None
+        with self._lock:
+            # Only items carrying the index's key attributes are in a (sparse) index
+            candidates = self._index_keys[IndexName] if IndexName else self._items
+            matches = [item for item in map(self._items.get, candidates)
+                       if all(a in item and test(item[a], v) for a, test, v in conditions)]
+        if sort:
+            matches.sort(key=lambda item: (item[sort], item[self.hash_key]))
+        keys = [item[self.hash_key] for item in matches]
+        start = keys.index(ExclusiveStartKey[self.hash_key]) + 1 if ExclusiveStartKey else 0
+        return self._page(keys, start, Limit or self.page_size)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class FakeDynamoDBResource:
+    """Offline stand-in for boto3.resource('dynamodb'): create_table, Table and batch_write_item"""
+
+    def __init__(self, latency=0.0, page_size=DEFAULT_SCAN_PAGE_SIZE):
+        self.latency = latency
+        self.page_size = page_size
+        self.tables = {}
+        self.batch_requests = 0
+
+    def create_table(self, TableName, KeySchema, GlobalSecondaryIndexes=None, **kwargs):
+        if TableName in self.tables:
+            raise ValueError(f"Table already exists: {TableName}")
+        table = FakeDynamoDBTable(TableName, KeySchema, GlobalSecondaryIndexes, self.latency, self.page_size)
+        self.tables[TableName] = table
+        return table
+
+    def Table(self, name):
+        return self.tables[name]
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        requests = [(name, request) for name, batch in RequestItems.items() for request in batch]
+        if len(requests) > MAX_BATCH_WRITE_ITEMS:
+            raise ValueError(f"Too many items requested for the BatchWriteItem call (max {MAX_BATCH_WRITE_ITEMS})")
+        self.batch_requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        for name, request in requests:
+            self.tables[name]._put(request['PutRequest']['Item'])
+        return {'UnprocessedItems': {}}
+
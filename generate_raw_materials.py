@@ -1,8 +1,10 @@
+import argparse
+import bisect
 import json
+import multiprocessing
+import os
 import random
-from faker import Faker
-
-fake = Faker()
+import string
 
 # Define common technical specs for interchangeable parts
 common_specs = [
@@ -11,43 +13,223 @@ common_specs = [
     {"density": 1.2, "tensile_strength": 50, "grade": "HDPE"}
 ]
 
-materials = []
-
-# Generate 44 regular items
-for i in range(44):
-    material = {
-        "SKU": fake.bothify(text="SKU-####-???"),
-        "SupplierName": fake.company(),
-        "Price": round(random.uniform(10.0, 500.0), 2),
-        "LeadTime": random.randint(5, 60),
-        "DaysOnHand": random.randint(1, 30),
-        "TechnicalSpecs": {
-            "density": round(random.uniform(0.5, 10.0), 2),
-            "tensile_strength": random.randint(50, 800),
-            "grade": fake.bothify(text="??##")
-        }
+MAX_ITEMS = 10_000_000
+LETTERS = string.ascii_letters
+# Every SKU-####-XXX value; item indexes are mapped onto it bijectively so SKUs never collide
+SKU_SPACE = 10_000 * len(LETTERS) ** 3
+SKU_MULTIPLIER = 387_420_489  # 3**18 shares no factor with SKU_SPACE, so i -> i * m mod SKU_SPACE is a permutation
+SKU_OFFSET = 48_271_000_013 % SKU_SPACE
+# Each block of positions draws from its own seeded RNG, so output does not depend on chunking or workers
+RNG_BLOCK = 1_000
+
+# Set in each worker by init_worker so the pools are shipped once per process, not per chunk
+_config = None
+
+
+def build_supplier_pool(supplier_count, seed):
+    """Generate supplier names once with Faker, suffixing repeats so every name is distinct"""
+    from faker import Faker
+
+    fake = Faker()
+    Faker.seed(seed)
+    names = []
+    seen = {}
+    for _ in range(supplier_count):
+        name = fake.company()
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name} {seen[name]}")
+    return names
+
+
+def group_sizes(group_count, distribution, min_size, max_size, rng):
+    """Draw the size of every substitute group"""
+    if distribution == 'fixed':
+        return [min_size] * group_count
+    if distribution == 'uniform':
+        return [rng.randint(min_size, max_size) for _ in range(group_count)]
+    if distribution == 'zipf':
+        # Heavy tail: a few large groups, many small ones
+        return [min(max_size, min_size + int(rng.paretovariate(1.2)) - 1) for _ in range(group_count)]
+    raise ValueError(f"Unknown group size distribution: {distribution}")
+
+
+def group_spec(group, rng):
+    """Return the shared TechnicalSpecs of a substitute group"""
+    if group < len(common_specs):
+        return common_specs[group]
+    return {
+        "density": round(rng.uniform(0.5, 10.0), 2),
+        "tensile_strength": rng.randint(50, 800),
+        "grade": f"{rng.choice(LETTERS)}{rng.choice(LETTERS)}-{group}"
     }
-    materials.append(material)
-
-# Generate 3 pairs of interchangeable parts (6 items total)
-for spec in common_specs:
-    for j in range(2):
-        material = {
-            "SKU": fake.bothify(text="SKU-####-???"),
-            "SupplierName": fake.company(),
-            "Price": round(random.uniform(10.0, 500.0), 2),
-            "LeadTime": random.randint(5, 60),
-            "DaysOnHand": random.randint(1, 30),
-            "TechnicalSpecs": spec
+
+
+def sku_for(index):
+    """Map an item index to a unique SKU in SKU-####-XXX format"""
+    value = (index * SKU_MULTIPLIER + SKU_OFFSET) % SKU_SPACE
+    digits, value = value % 10_000, value // 10_000
+    letters = []
+    for _ in range(3):
+        value, k = divmod(value, len(LETTERS))
+        letters.append(LETTERS[k])
+    return f"SKU-{digits:04d}-{''.join(letters)}"
+
+
+def build_config(count, groups, size_distribution, min_group_size, max_group_size, low_stock_fraction,
+                 suppliers, seed):
+    """Precompute everything shared by the chunk workers"""
+    if not 0 < count <= MAX_ITEMS:
+        raise ValueError(f"count must be between 1 and {MAX_ITEMS:,}")
+    rng = random.Random(f"{seed}-layout")
+
+    sizes = group_sizes(groups, size_distribution, min_group_size, max_group_size, rng)
+    cumulative = []
+    total = 0
+    for size in sizes:
+        total += size
+        cumulative.append(total)
+    if total > count:
+        raise ValueError(f"{groups} substitute groups need {total} items but only {count} were requested")
+
+    # Pick an affine permutation of positions so group members are scattered like a shuffle
+    multiplier = rng.randrange(1, count) if count > 1 else 1
+    while _gcd(multiplier, count) != 1:
+        multiplier = rng.randrange(1, count)
+
+    return {
+        'count': count,
+        'seed': seed,
+        'cumulative_sizes': cumulative,
+        'group_specs': [group_spec(k, rng) for k in range(groups)],
+        'suppliers': build_supplier_pool(suppliers, seed),
+        'low_stock_fraction': low_stock_fraction,
+        'multiplier': multiplier,
+        'offset': rng.randrange(count)
+    }
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+def init_worker(config):
+    global _config
+    _config = config
+
+
+def generate_item(position, rng, config):
+    """Generate the material at one position of the catalog"""
+    suppliers = config['suppliers']
+    slot = (position * config['multiplier'] + config['offset']) % config['count']
+    cumulative = config['cumulative_sizes']
+
+    if cumulative and slot < cumulative[-1]:
+        # Member of a substitute group: members get consecutive suppliers so they always differ
+        group = bisect.bisect_right(cumulative, slot)
+        member = slot - (cumulative[group - 1] if group else 0)
+        supplier = suppliers[(group * 2654435761 + config['seed'] + member) % len(suppliers)]
+        specs = config['group_specs'][group]
+    else:
+        supplier = suppliers[rng.randrange(len(suppliers))]
+        specs = {
+            "density": round(rng.uniform(0.5, 10.0), 2),
+            "tensile_strength": rng.randint(50, 800),
+            "grade": f"{rng.choice(LETTERS)}{rng.choice(LETTERS)}{rng.randint(0, 9)}{rng.randint(0, 9)}"
         }
-        materials.append(material)
 
-# Shuffle to mix interchangeable parts with regular items
-random.shuffle(materials)
+    fraction = config['low_stock_fraction']
+    if fraction is None:
+        days_on_hand = rng.randint(1, 30)
+    elif rng.random() < fraction:
+        days_on_hand = rng.randint(1, 4)
+    else:
+        days_on_hand = rng.randint(5, 30)
+
+    return {
+        "SKU": sku_for(position),
+        "SupplierName": supplier,
+        "Price": round(rng.uniform(10.0, 500.0), 2),
+        "LeadTime": rng.randint(5, 60),
+        "DaysOnHand": days_on_hand,
+        "TechnicalSpecs": dict(specs)
+    }
+
+
+def generate_items(start, stop, config):
+    """Yield the materials at positions [start, stop)"""
+    for position in range(start, stop):
+        if position == start or position % RNG_BLOCK == 0:
+            rng = random.Random(f"{config['seed']}-{position // RNG_BLOCK}")
+            # Fast-forward when starting mid-block so chunking never changes the output
+            for skipped in range(position - position % RNG_BLOCK, position):
+                generate_item(skipped, rng, config)
+        yield generate_item(position, rng, config)
+
+
+def generate_chunk(bounds):
+    """Worker entry point: serialize items [start, stop) in the requested output format"""
+    start, stop, output_format = bounds
+    items = generate_items(start, stop, _config)
+    if output_format == 'ndjson':
+        return ''.join(json.dumps(item) + '\n' for item in items)
+    # Matches json.dump(materials, f, indent=2) element formatting
+    return ',\n'.join('  ' + json.dumps(item, indent=2).replace('\n', '\n  ') for item in items)
+
+
+def write_catalog(path, config, output_format='json', workers=None, chunk_size=50_000):
+    """Generate the catalog in chunks across processes, streaming each chunk to disk in order"""
+    count = config['count']
+    bounds = [(start, min(start + chunk_size, count), output_format) for start in range(0, count, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    with open(path, 'w') as f:
+        if output_format == 'json':
+            f.write('[\n')
+        if workers == 1 or len(bounds) == 1:
+            init_worker(config)
+            chunks = map(generate_chunk, bounds)
+            _write_chunks(f, chunks, output_format)
+        else:
+            with multiprocessing.Pool(workers, initializer=init_worker, initargs=(config,)) as pool:
+                # imap keeps chunk order, so output is identical for any worker count
+                _write_chunks(f, pool.imap(generate_chunk, bounds), output_format)
+        if output_format == 'json':
+            f.write('\n]')
+
+
+def _write_chunks(f, chunks, output_format):
+    for k, chunk in enumerate(chunks):
+        if output_format == 'json' and k:
+            f.write(',\n')
+        f.write(chunk)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate a synthetic raw materials catalog')
+    parser.add_argument('--count', type=int, default=50, help=f'Number of items (up to {MAX_ITEMS:,})')
+    parser.add_argument('--groups', type=int, default=3, help='Number of substitute groups (identical specs)')
+    parser.add_argument('--group-size-distribution', choices=['fixed', 'uniform', 'zipf'], default='fixed')
+    parser.add_argument('--min-group-size', type=int, default=2)
+    parser.add_argument('--max-group-size', type=int, default=2)
+    parser.add_argument('--low-stock-fraction', type=float, default=None,
+                        help='Fraction of items with DaysOnHand < 5 (default: DaysOnHand uniform in 1-30)')
+    parser.add_argument('--suppliers', type=int, default=None, help='Number of distinct suppliers')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for deterministic output')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json')
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    suppliers = args.suppliers or min(args.count, 10_000)
+    output = args.output or ('raw_materials.ndjson' if args.format == 'ndjson' else 'raw_materials.json')
 
-# Write to JSON file
-with open('raw_materials.json', 'w') as f:
-    json.dump(materials, f, indent=2)
+    config = build_config(args.count, args.groups, args.group_size_distribution, args.min_group_size,
+                          args.max_group_size, args.low_stock_fraction, suppliers, seed)
+    write_catalog(output, config, args.format, args.workers, args.chunk_size)
 
-print(f"Generated {len(materials)} materials in raw_materials.json")
-print("Interchangeable parts created with identical TechnicalSpecs")
\ No newline at end of file
+    print(f"Generated {args.count:,} materials in {output} (seed {seed})")
+    print(f"{args.groups:,} groups of interchangeable parts created with identical TechnicalSpecs")
@@ -1,44 +1,162 @@
+import argparse
+import html
 import json
+import os
 from datetime import datetime
 
+DEFAULT_REPORT_PATH = 'master_audit_report.json'
+DEFAULT_HTML_PATH = 'audit_report.html'
+DEFAULT_PAGE_SIZE = 500
+
+# (section id, heading, path into the report, row kind); each becomes a chunked, paginated table
+FINDING_SECTIONS = (
+    ('compliance_violations', 'Compliance Violations', ('detailed_reports', 'compliance', 'violations'), 'finding'),
+    ('compliance_warnings', 'Compliance Warnings', ('detailed_reports', 'compliance', 'warnings'), 'finding'),
+    ('price_violations', 'Price Threshold Violations', ('detailed_reports', 'resilience', 'price_compliance'), 'finding'),
+    ('decision_violations', 'Decision Errors', ('detailed_reports', 'resilience', 'compliance_violations'), 'finding'),
+    ('critical_items', 'Critical Stock Items', ('detailed_reports', 'resilience', 'stock_analysis', 'critical_items'), 'sku'),
+    ('items_without_substitutes', 'Items Without Substitutes',
+     ('detailed_reports', 'resilience', 'substitute_analysis', 'items_without_substitutes'), 'sku'),
+)
+
+STYLE = """
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }
+        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }
+        .header { text-align: center; margin-bottom: 30px; border-bottom: 3px solid #2196F3; padding-bottom: 20px; }
+        .score-card { display: flex; justify-content: space-around; margin: 30px 0; }
+        .score { text-align: center; padding: 20px; border-radius: 10px; color: white; font-weight: bold; }
+        .score.high { background: #f44336; }
+        .score.medium { background: #ff9800; }
+        .score.low { background: #4caf50; }
+        .metrics-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; margin: 30px 0; }
+        .metric-card { background: #f8f9fa; padding: 20px; border-radius: 8px; border-left: 4px solid #2196F3; }
+        .metric-title { font-weight: bold; color: #333; margin-bottom: 10px; }
+        .metric-value { font-size: 24px; color: #2196F3; font-weight: bold; }
+        .findings { background: #fff3cd; border: 1px solid #ffeaa7; border-radius: 8px; padding: 20px; margin: 20px 0; }
+        .finding { margin: 10px 0; padding: 10px; border-radius: 5px; }
+        .finding.high { background: #ffebee; border-left: 4px solid #f44336; }
+        .finding.medium { background: #fff3e0; border-left: 4px solid #ff9800; }
+        .table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        .table th, .table td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+        .table th { background: #2196F3; color: white; }
+        .status-pass { color: #4caf50; font-weight: bold; }
+        .status-fail { color: #f44336; font-weight: bold; }
+        .status-warn { color: #ff9800; font-weight: bold; }
+        details.section { margin: 15px 0; }
+        details.section summary { cursor: pointer; font-weight: bold; }
+        .pager { margin: 10px 0; }
+        .section-frame { width: 100%; height: 600px; border: 1px solid #ddd; }
+"""
+
+# Shows one page of a section: toggles inline pages, or points the section's iframe at its page file
+PAGER_SCRIPT = """
+        function showPage(id, page) {
+            var section = document.getElementById(id);
+            var total = Number(section.dataset.pages);
+            page = Math.min(Math.max(page, 1), total);
+            section.dataset.page = page;
+            var frame = section.querySelector('iframe');
+            if (frame) {
+                frame.src = section.dataset.base + String(page).padStart(4, '0') + '.html';
+            } else {
+                section.querySelectorAll('.page').forEach(function (p) { p.hidden = Number(p.dataset.page) !== page; });
+            }
+            section.querySelector('.page-label').textContent = 'Page ' + page + ' of ' + total;
+        }
+        function openSection(section) {
+            if (section.open && !section.dataset.loaded) {
+                section.dataset.loaded = '1';
+                showPage(section.id, 1);
+            }
+        }
+"""
+
+
+def _lookup(report, path):
+    for key in path:
+        if not isinstance(report, dict) or key not in report:
+            return []
+        report = report[key]
+    return report
+
+
+def _finding_cells(finding):
+    """Type, SKU(s) and the remaining fields of a violation or warning"""
+    if not isinstance(finding, dict):
+        return ('', '', str(finding))
+    sku = finding.get('sku') or ' / '.join(str(finding[k]) for k in ('item1', 'item2') if k in finding)
+    details = ', '.join(f"{key}={value}" for key, value in finding.items()
+                        if key not in ('type', 'sku', 'item1', 'item2'))
+    return (finding.get('type', ''), sku, details)
+
+
+def _table(columns, rows):
+    cells = ''.join(f'<th>{column}</th>' for column in columns)
+    body = ''.join('<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in row) + '</tr>'
+                   for row in rows)
+    return f'<table class="table"><thead><tr>{cells}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def _write_page_file(path, title, table):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>{html.escape(title)}</title>'
+                f'<style>{STYLE}</style></head><body>{table}</body></html>')
+
+
 class HTMLReportGenerator:
-    def __init__(self, report_file='master_audit_report.json'):
-        with open(report_file, 'r') as f:
-            self.report = json.load(f)
+    def __init__(self, report_file=DEFAULT_REPORT_PATH, report=None):
+        if report is None:
+            with open(report_file, 'r') as f:
+                report = json.load(f)
+        self.report = report
     
-    def generate_html_report(self):
-        """Generate comprehensive HTML audit report"""
-        html = f"""
+    def generate_html_report(self, page_size=DEFAULT_PAGE_SIZE):
+        """Generate comprehensive HTML audit report as one string (see write_html_report for large reports)"""
+        return ''.join(self.iter_html(page_size))
+
+    def write_html_report(self, path=DEFAULT_HTML_PATH, page_size=DEFAULT_PAGE_SIZE, split_sections=False):
+        """Stream the report to path, holding at most one page of table rows in memory.
+
+        With split_sections, every table page goes to its own file under
+        <name>_sections/ and the report loads pages on demand when a section
+        is opened. Returns the sizes of what was written.
+        """
+        sections_dir = None
+        if split_sections:
+            sections_dir = os.path.splitext(path)[0] + '_sections'
+        stats = {'path': path, 'bytes': 0, 'rows': 0, 'pages': 0, 'sections_dir': sections_dir}
+        with open(path, 'w', encoding='utf-8') as f:
+            for part in self.iter_html(page_size, sections_dir, stats):
+                f.write(part)
+                stats['bytes'] += len(part.encode('utf-8'))
+        return stats
+
+    def iter_html(self, page_size=DEFAULT_PAGE_SIZE, sections_dir=None, stats=None):
+        """Yield the report in pieces: the summary first, then each finding table one page at a time"""
+        yield self.generate_header()
+        yield self.generate_component_scores()
+        yield self.generate_key_metrics()
+        yield self.generate_critical_findings()
+        yield self.generate_detailed_analysis()
+        for section in FINDING_SECTIONS:
+            yield from self.iter_finding_section(section, page_size, sections_dir, stats)
+        yield """
+    </div>
+</body>
+</html>
+"""
+
+    def generate_header(self):
+        """Generate the page head, score card and executive summary"""
+        return f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Procurement Agent Audit Report</title>
-    <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
-        .header {{ text-align: center; margin-bottom: 30px; border-bottom: 3px solid #2196F3; padding-bottom: 20px; }}
-        .score-card {{ display: flex; justify-content: space-around; margin: 30px 0; }}
-        .score {{ text-align: center; padding: 20px; border-radius: 10px; color: white; font-weight: bold; }}
-        .score.high {{ background: #f44336; }}
-        .score.medium {{ background: #ff9800; }}
-        .score.low {{ background: #4caf50; }}
-        .metrics-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; margin: 30px 0; }}
-        .metric-card {{ background: #f8f9fa; padding: 20px; border-radius: 8px; border-left: 4px solid #2196F3; }}
-        .metric-title {{ font-weight: bold; color: #333; margin-bottom: 10px; }}
-        .metric-value {{ font-size: 24px; color: #2196F3; font-weight: bold; }}
-        .findings {{ background: #fff3cd; border: 1px solid #ffeaa7; border-radius: 8px; padding: 20px; margin: 20px 0; }}
-        .finding {{ margin: 10px 0; padding: 10px; border-radius: 5px; }}
-        .finding.high {{ background: #ffebee; border-left: 4px solid #f44336; }}
-        .finding.medium {{ background: #fff3e0; border-left: 4px solid #ff9800; }}
-        .table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-        .table th, .table td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-        .table th {{ background: #2196F3; color: white; }}
-        .status-pass {{ color: #4caf50; font-weight: bold; }}
-        .status-fail {{ color: #f44336; font-weight: bold; }}
-        .status-warn {{ color: #ff9800; font-weight: bold; }}
-    </style>
+    <style>{STYLE}    </style>
+    <script>{PAGER_SCRIPT}    </script>
 </head>
 <body>
     <div class="container">
@@ -62,17 +180,43 @@ class HTMLReportGenerator:
             <h3>📋 Executive Summary</h3>
             <p><strong>Recommendation:</strong> {self.report['recommendation']}</p>
         </div>
-        
-        {self.generate_component_scores()}
-        {self.generate_key_metrics()}
-        {self.generate_critical_findings()}
-        {self.generate_detailed_analysis()}
-        
-    </div>
-</body>
-</html>
-"""
-        return html
+        """
+
+    def iter_finding_section(self, section, page_size=DEFAULT_PAGE_SIZE, sections_dir=None, stats=None):
+        """Yield one collapsible table section, page by page; pages go to separate files if sections_dir is set"""
+        section_id, title, path, kind = section
+        rows = _lookup(self.report, path)
+        if not rows:
+            return
+        columns = ('Type', 'SKU', 'Details') if kind == 'finding' else ('SKU',)
+        pages = (len(rows) + page_size - 1) // page_size
+        base = ''
+        if sections_dir:
+            os.makedirs(os.path.join(sections_dir, section_id), exist_ok=True)
+            base = f"{os.path.basename(sections_dir)}/{section_id}/page-"
+        yield (f'<details class="section" id="{section_id}" data-pages="{pages}" data-page="1" data-base="{base}" '
+               f'ontoggle="openSection(this)"><summary>{title} ({len(rows):,})</summary>'
+               f'<div class="pager"><button onclick="showPage(\'{section_id}\', Number(this.parentNode.parentNode.dataset.page) - 1)">Previous</button> '
+               f'<span class="page-label">Page 1 of {pages}</span> '
+               f'<button onclick="showPage(\'{section_id}\', Number(this.parentNode.parentNode.dataset.page) + 1)">Next</button></div>')
+        if sections_dir:
+            yield '<iframe class="section-frame" loading="lazy"></iframe>'
+        for number in range(1, pages + 1):
+            chunk = rows[(number - 1) * page_size:number * page_size]
+            if kind == 'finding':
+                chunk = [_finding_cells(finding) for finding in chunk]
+            else:
+                chunk = [(sku,) for sku in chunk]
+            table = _table(columns, chunk)
+            if sections_dir:
+                _write_page_file(os.path.join(sections_dir, section_id, f"page-{number:04d}.html"),
+                                 f"{title} - page {number}", table)
+            else:
+                yield f'<div class="page" data-page="{number}"{"" if number == 1 else " hidden"}>{table}</div>'
+            if stats is not None:
+                stats['rows'] += len(chunk)
+                stats['pages'] += 1
+        yield '</details>'
     
     def get_risk_class(self):
         """Get CSS class based on risk level"""
@@ -182,11 +326,18 @@ class HTMLReportGenerator:
         return html
 
 if __name__ == "__main__":
-    generator = HTMLReportGenerator()
-    html_content = generator.generate_html_report()
-    
-    with open('audit_report.html', 'w') as f:
-        f.write(html_content)
+    parser = argparse.ArgumentParser(description='Write the master audit report as HTML')
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH)
+    parser.add_argument('--output', default=DEFAULT_HTML_PATH)
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='Rows per table page')
+    parser.add_argument('--split-sections', action='store_true',
+                        help='Write each table page to its own file, loaded when the section is opened')
+    args = parser.parse_args()
+
+    generator = HTMLReportGenerator(args.report)
+    stats = generator.write_html_report(args.output, args.page_size, args.split_sections)
     
-    print("HTML audit report saved as 'audit_report.html'")
-    print("Open the file in your web browser to view the interactive report.")
\ No newline at end of file
+    print(f"HTML audit report saved as '{args.output}' ({stats['rows']:,} finding rows in {stats['pages']:,} pages)")
+    if stats['sections_dir']:
+        print(f"Table pages written to '{stats['sections_dir']}'")
+    print("Open the file in your web browser to view the interactive report.")
@@ -0,0 +1,85 @@
+import argparse
+import re
+import subprocess
+import sys
+
+# Cumulative import time allowed per module, in milliseconds. The core decision path must
+# not pull numpy, boto3 or matplotlib in at import time; they load on first use instead.
+IMPORT_BUDGETS_MS = {
+    'evaluate_purchase': 50,
+    'substitute_index': 50,
+    'material': 50,
+    'inventory_loader': 50,
+    'ask_claude': 50,
+    'simulation': 80,
+}
+HEAVY_MODULES = ('numpy', 'boto3', 'botocore', 'matplotlib', 'seaborn')
+DEFAULT_RUNS = 5
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)$')
+
+
+def _import_tree(module, python=sys.executable):
+    """Run -X importtime for module in a fresh interpreter, returning its (cumulative us, imported modules)"""
+    completed = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, check=True)
+    cumulative_us = None
+    imported = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        imported.append(match.group(4))
+        # The requested module is the one printed at the outermost indentation level
+        if match.group(4) == module and len(match.group(3)) <= 1:
+            cumulative_us = int(match.group(2))
+    if cumulative_us is None:
+        raise RuntimeError(f"-X importtime reported no entry for {module}")
+    return cumulative_us, imported
+
+
+def import_time_us(module, python=sys.executable):
+    """Cumulative microseconds spent importing module in a fresh interpreter, from -X importtime"""
+    return _import_tree(module, python)[0]
+
+
+def loaded_heavy_modules(module, python=sys.executable):
+    """Heavy dependencies imported along with module, from the -X importtime tree"""
+    imported = _import_tree(module, python)[1]
+    return [m for m in HEAVY_MODULES if any(name == m or name.startswith(m + '.') for name in imported)]
+
+
+def check_import_budgets(budgets=IMPORT_BUDGETS_MS, runs=DEFAULT_RUNS):
+    """Measure every module's best-of-runs import time, returning one result per module"""
+    results = []
+    for module, budget_ms in budgets.items():
+        best_ms = min(import_time_us(module) for _ in range(runs)) / 1000
+        heavy = loaded_heavy_modules(module)
+        results.append({
+            'module': module,
+            'import_ms': round(best_ms, 1),
+            'budget_ms': budget_ms,
+            'heavy_modules': heavy,
+            'status': 'pass' if best_ms <= budget_ms and not heavy else 'fail'
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fail if the core decision path imports too slowly')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Best-of-N runs per module')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget (e.g. 2 on slow CI)')
+    args = parser.parse_args()
+
+    budgets = {module: budget * args.scale for module, budget in IMPORT_BUDGETS_MS.items()}
+    print("=== IMPORT TIME BUDGET ===")
+    results = check_import_budgets(budgets, args.runs)
+    for r in results:
+        heavy = f" (loads {', '.join(r['heavy_modules'])})" if r['heavy_modules'] else ''
+        print(f"  {r['status'].upper():<5} {r['module']:<20} {r['import_ms']:>7.1f}ms / {r['budget_ms']:g}ms{heavy}")
+
+    failures = [r for r in results if r['status'] == 'fail']
+    if failures:
+        print(f"\n{len(failures)} module(s) over budget")
+        sys.exit(1)
+    print("\nAll modules within budget")
@@ -0,0 +1,321 @@
+import hashlib
+import inspect
+import json
+import os
+from datetime import datetime
+import evaluate_purchase
+import procurement_rules
+import resilience_auditor
+import compliance_validator
+import material
+import material_table
+import substitute_index
+from material_table import MaterialTable
+from material import Material, Spec
+
+FINGERPRINT_STORE_VERSION = 2
+DEFAULT_STORE_PATH = 'audit_fingerprints.json'
+
+
+def _json_default(value):
+    """Serialize compact Material records and specs exactly like the dicts they were loaded from"""
+    if isinstance(value, Material):
+        return value.to_dict()
+    if isinstance(value, Spec):
+        return dict(value)
+    return str(value)
+
+
+def item_fingerprint(item):
+    """Return a content hash of one material record"""
+    return hashlib.sha1(json.dumps(item, sort_keys=True, default=_json_default).encode('utf-8')).hexdigest()
+
+
+def _canonical(value):
+    """Map values that compare equal, like 2, 2.0 and True == 1, to one JSON form"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (tuple, list)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def group_key(technical_specs):
+    """Return a JSON-safe key for a spec group, equal exactly when the specs' spec_key is"""
+    key = substitute_index.spec_key(technical_specs)
+    if isinstance(key, str):
+        # Already the canonical JSON fallback; it is an object, so it never collides with the list below
+        return key
+    return json.dumps(_canonical(key), default=str)
+
+
+def code_fingerprint():
+    """Hash the decision and audit logic, including the active procurement rules, so stored results
+    are dropped when either changes"""
+    digest = hashlib.sha1()
+    for module in (evaluate_purchase, procurement_rules, resilience_auditor, compliance_validator, material,
+                   material_table, substitute_index):
+        digest.update(inspect.getsource(module).encode('utf-8'))
+    digest.update(json.dumps(evaluate_purchase.get_procurement_rules().to_dict(), sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class FingerprintStore:
+    """On-disk fingerprints per SKU and per spec group, with the audit results derived from them"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.reset()
+        if path and os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == FINGERPRINT_STORE_VERSION:
+                self.code = data['code']
+                self.order = data['order']
+                self.items = data['items']
+                self.groups = data['groups']
+                self.pair_violations = data['pair_violations']
+
+    def reset(self):
+        """Forget every stored fingerprint and result"""
+        self.code = None
+        self.order = []
+        self.items = {}
+        self.groups = {}
+        self.pair_violations = None
+
+    def save(self):
+        if not self.path:
+            return
+        with open(self.path, 'w') as f:
+            json.dump({
+                'version': FINGERPRINT_STORE_VERSION,
+                'saved_at': datetime.now().isoformat(),
+                'code': self.code,
+                'order': self.order,
+                'items': self.items,
+                'groups': self.groups,
+                'pair_violations': self.pair_violations
+            }, f)
+
+
+class IncrementalAuditor:
+    """Produces resilience and compliance reports equal to a full run, recomputing only what changed.
+
+    Per-SKU checks are reused for items whose fingerprint is unchanged,
+    substitute availability is reused for spec groups with no changed
+    members, and pairwise spec checks are only re-run for pairs that
+    involve a changed or added SKU.
+    """
+
+    def __init__(self, resilience, compliance, store):
+        self.resilience_auditor = resilience
+        self.compliance_validator = compliance
+        self.store = store
+        self.last_run = {}
+
+    def plan(self, materials, full):
+        """Return (fingerprints, changed SKUs, removed SKUs, reason for a full run or None)"""
+        fingerprints = {}
+        for item in materials:
+            sku = item.get('SKU')
+            if not isinstance(sku, str) or sku in fingerprints:
+                # Results are keyed by SKU, so missing or duplicate SKUs need a full run
+                return None, None, None, 'missing or duplicate SKUs'
+            fingerprints[sku] = item_fingerprint(item)
+
+        code = code_fingerprint()
+        reason = None
+        if full:
+            reason = 'full re-audit requested'
+        elif self.store.code is None:
+            reason = 'no fingerprint store'
+        elif self.store.code != code:
+            reason = 'audit logic changed'
+        if reason:
+            self.store.reset()
+        self.store.code = code
+
+        stored = self.store.items
+        changed = {sku for sku, fp in fingerprints.items() if sku not in stored or stored[sku]['fp'] != fp}
+        removed = set(stored) - set(fingerprints)
+        return fingerprints, changed, removed, reason
+
+    def run(self, materials, full=False):
+        """Return (resilience_report, compliance_report) for the materials"""
+        if isinstance(materials, MaterialTable):
+            materials = materials.to_records()
+
+        fingerprints, changed, removed, reason = self.plan(materials, full)
+        if fingerprints is None:
+            self.last_run = {'mode': 'full', 'reason': reason}
+            return (self.resilience_auditor.generate_resilience_report(materials),
+                    self.compliance_validator.generate_compliance_report(materials))
+
+        previous_order = self.store.order
+        touched = self.update_items(materials, fingerprints, changed, removed)
+        pairs_evaluated = self.update_pairs(materials, changed, previous_order)
+        touched_groups = self.update_groups(materials, touched)
+        self.store.order = [item['SKU'] for item in materials]
+        self.store.save()
+
+        self.last_run = {
+            'mode': 'full' if reason else 'incremental',
+            'reason': reason,
+            'changed_or_added': len(changed),
+            'removed': len(removed),
+            'reused_items': len(materials) - len(changed),
+            'pairs_evaluated': pairs_evaluated,
+            'spec_groups_recomputed': touched_groups
+        }
+        return self.build_resilience_report(materials), self.build_compliance_report(materials)
+
+    def update_items(self, materials, fingerprints, changed, removed):
+        """Recompute per-SKU checks for changed and added items, returning the spec groups they touch"""
+        touched = set()
+        for sku in removed:
+            touched.add(self.store.items.pop(sku)['group'])
+        for item in materials:
+            if item['SKU'] not in changed:
+                continue
+            if item['SKU'] in self.store.items:
+                touched.add(self.store.items[item['SKU']]['group'])
+            touched.add(group_key(item['TechnicalSpecs']))
+            rule_violations, rule_warnings = self.compliance_validator.item_rule_findings(item)
+            self.store.items[item['SKU']] = {
+                'fp': fingerprints[item['SKU']],
+                'group': group_key(item['TechnicalSpecs']),
+                'integrity': self.compliance_validator.item_integrity_violations(item),
+                'rule_violations': rule_violations,
+                'rule_warnings': rule_warnings,
+                'price': self.resilience_auditor.item_price_violations(item)
+            }
+        return touched
+
+    def update_pairs(self, materials, changed, previous_order):
+        """Re-run pairwise spec checks touched by changed items, returning how many pairs were evaluated"""
+        if self.resilience_auditor.spec_matching_mode != 'exhaustive':
+            self.store.pair_violations = None
+            return 0
+
+        auditor = self.resilience_auditor
+        position = {item['SKU']: i for i, item in enumerate(materials)}
+        n = len(materials)
+
+        # Stored pair results keep their (item1, item2) orientation only if unchanged items kept their order
+        unchanged_now = [sku for sku in position if sku not in changed]
+        unchanged_before = [sku for sku in previous_order if sku in position and sku not in changed]
+        if self.store.pair_violations is None or unchanged_now != unchanged_before:
+            violations = []
+            for i in range(n):
+                for j in range(i + 1, n):
+                    violation = auditor.spec_pair_violation(materials[i], materials[j])
+                    if violation:
+                        violations.append(violation)
+            self.store.pair_violations = violations
+            return n * (n - 1) // 2
+
+        violations = [v for v in self.store.pair_violations
+                      if v['item1'] in position and v['item2'] in position
+                      and v['item1'] not in changed and v['item2'] not in changed]
+        changed_positions = sorted(position[sku] for sku in changed)
+        changed_set = set(changed_positions)
+        evaluated = 0
+        for c in changed_positions:
+            for j in range(n):
+                if j == c or (j in changed_set and j < c):
+                    continue
+                first, second = min(c, j), max(c, j)
+                evaluated += 1
+                violation = auditor.spec_pair_violation(materials[first], materials[second])
+                if violation:
+                    violations.append(violation)
+
+        violations.sort(key=lambda v: (position[v['item1']], position[v['item2']]))
+        self.store.pair_violations = violations
+        return evaluated
+
+    def update_groups(self, materials, touched):
+        """Refresh fingerprints and supplier coverage of spec groups that gained, lost or changed members"""
+        members = {}
+        for item in materials:
+            members.setdefault(self.store.items[item['SKU']]['group'], []).append(item)
+
+        touched = set(touched) | {key for key in members if key not in self.store.groups}
+        for key in touched:
+            self.store.groups.pop(key, None)
+            if key not in members:
+                continue
+            group = members[key]
+            digest = hashlib.sha1()
+            for fp in sorted(self.store.items[item['SKU']]['fp'] for item in group):
+                digest.update(fp.encode('utf-8'))
+            self.store.groups[key] = {
+                'fp': digest.hexdigest(),
+                'size': len(group),
+                'multi_supplier': len({item['SupplierName'] for item in group}) > 1
+            }
+        return len(touched)
+
+    def build_resilience_report(self, materials):
+        """Assemble the resilience report from stored and recomputed results"""
+        auditor = self.resilience_auditor
+        items = self.store.items
+
+        if self.store.pair_violations is None:
+            spec_matching = auditor.test_spec_matching_accuracy(materials)
+        else:
+            n = len(materials)
+            total_tests = n * (n - 1) // 2
+            correct = total_tests - len(self.store.pair_violations)
+            auditor.compliance_violations.extend(self.store.pair_violations)
+            spec_matching = {
+                'accuracy': correct / total_tests if total_tests > 0 else 0,
+                'total_tests': total_tests,
+                'correct': correct
+            }
+
+        price_compliance = []
+        substitutes_found = 0
+        without_substitutes = []
+        low_stock_count = 0
+        for item in materials:
+            entry = items[item['SKU']]
+            price_compliance.extend(entry['price'])
+            if item['DaysOnHand'] < 5:
+                low_stock_count += 1
+                if self.store.groups[entry['group']]['multi_supplier']:
+                    substitutes_found += 1
+                else:
+                    without_substitutes.append(item['SKU'])
+
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'spec_matching': spec_matching,
+            'price_compliance': price_compliance,
+            'stock_analysis': auditor.test_low_stock_detection(materials),
+            'substitute_analysis': {
+                'substitutes_found': substitutes_found,
+                'items_without_substitutes': without_substitutes,
+                'substitute_coverage': substitutes_found / low_stock_count * 100 if low_stock_count else 100
+            },
+            'compliance_violations': auditor.compliance_violations
+        }
+        return auditor.score_resilience_report(report)
+
+    def build_compliance_report(self, materials):
+        """Assemble the compliance report from stored and recomputed results"""
+        validator = self.compliance_validator
+        entries = [self.store.items[item['SKU']] for item in materials]
+
+        # Same order as a full run: integrity, business rules, decisions, audit trail
+        for entry in entries:
+            validator.violations.extend(entry['integrity'])
+        for entry in entries:
+            validator.violations.extend(entry['rule_violations'])
+            validator.warnings.extend(entry['rule_warnings'])
+        validator.validate_procurement_decisions(materials)
+        validator.validate_audit_trail()
+        return validator.build_compliance_report()
@@ -0,0 +1,108 @@
+import json
+import os
+import re
+
+DEFAULT_INVENTORY_PATH = os.environ.get('RAW_MATERIALS_PATH', 'raw_materials.json')
+DEFAULT_CHUNK_SIZE = 10_000
+
+# DaysOnHand thresholds shared by the simulation and the auditors
+LOW_STOCK_DAYS = 5
+CRITICAL_STOCK_DAYS = 1
+
+_WHITESPACE = re.compile(r'\s*')
+_NUMBER_CHARACTERS = frozenset('0123456789.eE+-')
+# A decode error this close to the end of the buffer may be a literal, number or escape cut off by the block
+_TOKEN_TAIL = 16
+
+
+def _iter_json_array(f, block_size):
+    """Incrementally decode the elements of a top-level JSON array"""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+    # Characters dropped from the front of the buffer so far, to report error offsets in the file
+    consumed = 0
+    # What comes next: the opening '[', the first element or ']', a ',' or ']' after an element, or an element
+    expected = 'open'
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if eof:
+                raise ValueError('Unexpected end of the JSON array of materials')
+            consumed += len(buffer)
+            buffer, pos = f.read(block_size), 0
+            eof = not buffer
+            continue
+        char = buffer[pos]
+        if expected == 'open':
+            if char != '[':
+                raise ValueError('Expected a JSON array of materials')
+            pos, expected = pos + 1, 'first'
+            continue
+        if expected == 'separator':
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' after a material, found {char!r}")
+            pos, expected = pos + 1, 'element'
+            continue
+        if char == ']':
+            if expected == 'first':
+                return
+            raise ValueError("Expected a material after ',', found ']'")
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # A number at the end of the buffer may continue in the next block
+            complete = eof or end < len(buffer) and buffer[end] not in _NUMBER_CHARACTERS
+        except json.JSONDecodeError as e:
+            # Only an element cut off by the end of the buffer can be fixed by reading more; anything else
+            # is malformed whatever follows, and reading on would keep the rest of the file in memory
+            truncated = e.pos >= len(buffer) - _TOKEN_TAIL or e.msg.startswith('Unterminated string')
+            if eof or not truncated:
+                raise ValueError(f"Malformed material at offset {consumed + e.pos}: {e.msg}") from e
+            complete = False
+        if not complete:
+            more = f.read(block_size)
+            eof = not more
+            # Drop what has been consumed so the buffer stays around one block
+            consumed += pos
+            buffer, pos = buffer[pos:] + more, 0
+            continue
+        yield item
+        pos, expected = end, 'separator'
+
+
+def iter_materials(path=DEFAULT_INVENTORY_PATH, block_size=1 << 16):
+    """Yield material records one at a time from a JSON array or NDJSON file"""
+    with open(path, 'r') as f:
+        # The format is set by the first non-whitespace character, which may lie past the first block
+        first = ''
+        while not first:
+            head = f.read(block_size)
+            if not head:
+                break
+            first = head.lstrip()[:1]
+        f.seek(0)
+        if first == '[':
+            yield from _iter_json_array(f, block_size)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def iter_chunks(path=DEFAULT_INVENTORY_PATH, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of up to chunk_size material records"""
+    chunk = []
+    for item in iter_materials(path):
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_materials(path=DEFAULT_INVENTORY_PATH):
+    """Load the whole catalog as a list, from either a JSON array or NDJSON file"""
+    return list(iter_materials(path))
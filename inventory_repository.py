@@ -0,0 +1,350 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from inventory_loader import iter_materials, DEFAULT_INVENTORY_PATH, LOW_STOCK_DAYS
+
+BATCH_WRITE_SIZE = 25
+DEFAULT_SCAN_SEGMENTS = 4
+DEFAULT_SQLITE_PATH = 'inventory.sqlite'
+DEFAULT_TABLE_NAME = os.environ.get('DYNAMODB_TABLE', 'raw-materials-inventory')
+LOW_STOCK_INDEX = 'LowStockIndex'
+# Sparse index attribute: only set on items below LOW_STOCK_DAYS, so only they appear in LowStockIndex
+LOW_STOCK_ATTRIBUTE = 'LowStock'
+MAX_UNPROCESSED_RETRIES = 8
+
+
+def to_dynamodb(value):
+    """Convert floats to Decimal, as boto3 requires"""
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, dict):
+        return {k: to_dynamodb(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_dynamodb(v) for v in value]
+    return value
+
+
+def from_dynamodb(value):
+    """Convert the Decimals boto3 returns back to int or float"""
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, dict):
+        return {k: from_dynamodb(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [from_dynamodb(v) for v in value]
+    return value
+
+
+class JsonFileBackend:
+    """Inventory held in memory and persisted as a JSON array like raw_materials.json.
+
+    A dict of low-stock SKUs stands in for the secondary index; flush()
+    writes the file back.
+    """
+
+    def __init__(self, path=DEFAULT_INVENTORY_PATH):
+        self.path = path
+        self.items = {}
+        self.low_stock = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            for item in iter_materials(path):
+                self._store(item)
+
+    def _store(self, item):
+        sku = item['SKU']
+        self.items[sku] = item
+        if item['DaysOnHand'] < LOW_STOCK_DAYS:
+            self.low_stock[sku] = item['DaysOnHand']
+        else:
+            self.low_stock.pop(sku, None)
+
+    def batch_write(self, items):
+        with self._lock:
+            for item in items:
+                self._store(dict(item))
+            self.dirty = True
+
+    def get_item(self, sku):
+        return self.items.get(sku)
+
+    def scan_segment(self, segment, total_segments):
+        with self._lock:
+            items = list(self.items.values())
+        return items[segment::total_segments]
+
+    def query_low_stock(self, threshold=LOW_STOCK_DAYS):
+        with self._lock:
+            if threshold > LOW_STOCK_DAYS:
+                skus = sorted((item['DaysOnHand'], sku) for sku, item in self.items.items()
+                              if item['DaysOnHand'] < threshold)
+            else:
+                skus = sorted((days, sku) for sku, days in self.low_stock.items() if days < threshold)
+        return [self.items[sku] for days, sku in skus]
+
+    def flush(self):
+        if not self.dirty:
+            return
+        with self._lock:
+            temporary = self.path + '.tmp'
+            with open(temporary, 'w') as f:
+                json.dump(list(self.items.values()), f, indent=2)
+            os.replace(temporary, self.path)
+            self.dirty = False
+
+    def close(self):
+        self.flush()
+
+
+class SQLiteBackend:
+    """Inventory in a SQLite file, with an index on DaysOnHand for low-stock queries"""
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # WAL keeps a commit per batch cheap while staying crash-safe
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS materials '
+            '(sku TEXT PRIMARY KEY, days_on_hand REAL NOT NULL, record TEXT NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS materials_days_on_hand ON materials (days_on_hand)')
+        self._db.commit()
+
+    def batch_write(self, items):
+        rows = [(item['SKU'], item['DaysOnHand'], json.dumps(item)) for item in items]
+        with self._lock:
+            self._db.executemany(
+                'INSERT INTO materials (sku, days_on_hand, record) VALUES (?, ?, ?) '
+                'ON CONFLICT(sku) DO UPDATE SET days_on_hand = excluded.days_on_hand, record = excluded.record',
+                rows
+            )
+            self._db.commit()
+
+    def get_item(self, sku):
+        with self._lock:
+            row = self._db.execute('SELECT record FROM materials WHERE sku = ?', (sku,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def scan_segment(self, segment, total_segments):
+        # Contiguous rowid ranges, so each segment is one range read on the primary b-tree
+        with self._lock:
+            low, high = self._db.execute('SELECT MIN(rowid), MAX(rowid) FROM materials').fetchone()
+            if low is None:
+                return []
+            span = high - low + 1
+            start = low + span * segment // total_segments
+            end = low + span * (segment + 1) // total_segments
+            rows = self._db.execute('SELECT record FROM materials WHERE rowid >= ? AND rowid < ? ORDER BY rowid',
+                                    (start, end)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def query_low_stock(self, threshold=LOW_STOCK_DAYS):
+        with self._lock:
+            rows = self._db.execute('SELECT record FROM materials WHERE days_on_hand < ? ORDER BY days_on_hand, sku',
+                                    (threshold,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def create_dynamodb_table(resource, table_name=DEFAULT_TABLE_NAME):
+    """Create the inventory table keyed on SKU, with the sparse LowStockIndex on DaysOnHand"""
+    return resource.create_table(
+        TableName=table_name,
+        KeySchema=[{'AttributeName': 'SKU', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[
+            {'AttributeName': 'SKU', 'AttributeType': 'S'},
+            {'AttributeName': LOW_STOCK_ATTRIBUTE, 'AttributeType': 'S'},
+            {'AttributeName': 'DaysOnHand', 'AttributeType': 'N'},
+        ],
+        GlobalSecondaryIndexes=[{
+            'IndexName': LOW_STOCK_INDEX,
+            'KeySchema': [
+                {'AttributeName': LOW_STOCK_ATTRIBUTE, 'KeyType': 'HASH'},
+                {'AttributeName': 'DaysOnHand', 'KeyType': 'RANGE'},
+            ],
+            'Projection': {'ProjectionType': 'ALL'},
+        }],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
+class DynamoDBBackend:
+    """Inventory in a DynamoDB table, through boto3 or fake_dynamodb.FakeDynamoDBResource.
+
+    Items below LOW_STOCK_DAYS carry the LowStock attribute, which puts them
+    in the sparse LowStockIndex; low-stock queries read only that index.
+    """
+
+    def __init__(self, resource=None, table_name=DEFAULT_TABLE_NAME):
+        if resource is None:
+            import boto3
+            resource = boto3.resource('dynamodb')
+        self.resource = resource
+        self.table_name = table_name
+        self.table = resource.Table(table_name)
+
+    def _to_item(self, item):
+        item = dict(item)
+        item.pop(LOW_STOCK_ATTRIBUTE, None)
+        if item['DaysOnHand'] < LOW_STOCK_DAYS:
+            item[LOW_STOCK_ATTRIBUTE] = 'Y'
+        return to_dynamodb(item)
+
+    def _from_item(self, item):
+        item = from_dynamodb(item)
+        item.pop(LOW_STOCK_ATTRIBUTE, None)
+        return item
+
+    def batch_write(self, items):
+        requests = [{'PutRequest': {'Item': self._to_item(item)}} for item in items]
+        for attempt in range(MAX_UNPROCESSED_RETRIES + 1):
+            response = self.resource.batch_write_item(RequestItems={self.table_name: requests})
+            requests = response.get('UnprocessedItems', {}).get(self.table_name)
+            if not requests:
+                return
+            # Throttled writes come back unprocessed and are retried with exponential backoff
+            time.sleep(0.05 * 2 ** attempt)
+        raise RuntimeError(f"{len(requests)} items still unprocessed after {MAX_UNPROCESSED_RETRIES} retries")
+
+    def get_item(self, sku):
+        item = self.table.get_item(Key={'SKU': sku}).get('Item')
+        return self._from_item(item) if item is not None else None
+
+    def _pages(self, method, **kwargs):
+        while True:
+            response = method(**kwargs)
+            yield [self._from_item(item) for item in response['Items']]
+            if 'LastEvaluatedKey' not in response:
+                return
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def scan_segment(self, segment, total_segments):
+        return [item for page in self._pages(self.table.scan, Segment=segment, TotalSegments=total_segments)
+                for item in page]
+
+    def query_low_stock(self, threshold=LOW_STOCK_DAYS):
+        if threshold > LOW_STOCK_DAYS:
+            # Above the index's cut-off the whole table has to be read
+            return sorted((item for item in self.scan_segment(0, 1) if item['DaysOnHand'] < threshold),
+                          key=lambda item: (item['DaysOnHand'], item['SKU']))
+        return [item for page in self._pages(
+            self.table.query,
+            IndexName=LOW_STOCK_INDEX,
+            KeyConditionExpression=f"{LOW_STOCK_ATTRIBUTE} = :low AND DaysOnHand < :threshold",
+            ExpressionAttributeValues={':low': 'Y', ':threshold': to_dynamodb(threshold)}
+        ) for item in page]
+
+    def close(self):
+        pass
+
+
+class InventoryRepository:
+    """Reads and writes the inventory through a JSON, SQLite or DynamoDB backend.
+
+    Writes go out in batches of 25 (DynamoDB's BatchWriteItem limit), full
+    reads are split into segments scanned by worker threads, and low-stock
+    items come from a secondary index instead of a full-table scan.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def put_materials(self, materials, batch_size=BATCH_WRITE_SIZE):
+        """Write materials in batches, returning the number of batch requests"""
+        batches = 0
+        batch = []
+        for item in materials:
+            batch.append(item)
+            if len(batch) == batch_size:
+                self.backend.batch_write(batch)
+                batches += 1
+                batch = []
+        if batch:
+            self.backend.batch_write(batch)
+            batches += 1
+        return batches
+
+    def get(self, sku):
+        return self.backend.get_item(sku)
+
+    def scan(self, segments=DEFAULT_SCAN_SEGMENTS, workers=None):
+        """Read every item with a parallel segmented scan; order follows the segments, not the file"""
+        if segments == 1:
+            return list(self.backend.scan_segment(0, 1))
+        with ThreadPoolExecutor(max_workers=workers or segments) as pool:
+            parts = list(pool.map(lambda segment: self.backend.scan_segment(segment, segments), range(segments)))
+        return [item for part in parts for item in part]
+
+    def query_low_stock(self, threshold=LOW_STOCK_DAYS):
+        """Items with DaysOnHand below threshold, lowest first, read from the low-stock index"""
+        return self.backend.query_low_stock(threshold)
+
+    def close(self):
+        self.backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_repository(backend='json', path=None, resource=None, table_name=DEFAULT_TABLE_NAME, latency=0.0):
+    """Open an InventoryRepository on 'json', 'sqlite', 'dynamodb' (boto3) or 'local-dynamodb' (in-process)"""
+    if backend == 'json':
+        return InventoryRepository(JsonFileBackend(path or DEFAULT_INVENTORY_PATH))
+    if backend == 'sqlite':
+        return InventoryRepository(SQLiteBackend(path or DEFAULT_SQLITE_PATH))
+    if backend == 'dynamodb':
+        return InventoryRepository(DynamoDBBackend(resource, table_name))
+    if backend == 'local-dynamodb':
+        from fake_dynamodb import FakeDynamoDBResource
+        resource = resource or FakeDynamoDBResource(latency=latency)
+        create_dynamodb_table(resource, table_name)
+        return InventoryRepository(DynamoDBBackend(resource, table_name))
+    raise ValueError(f"Unknown inventory backend: {backend}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load, scan and query the inventory through a repository backend')
+    parser.add_argument('--backend', choices=['json', 'sqlite', 'dynamodb', 'local-dynamodb'], default='local-dynamodb')
+    parser.add_argument('--path', default=None, help='JSON or SQLite file for those backends')
+    parser.add_argument('--load', default=DEFAULT_INVENTORY_PATH, help='Catalog to batch-write first (JSON or NDJSON)')
+    parser.add_argument('--no-load', action='store_true', help='Use what the backend already holds')
+    parser.add_argument('--segments', type=int, default=DEFAULT_SCAN_SEGMENTS)
+    parser.add_argument('--threshold', type=float, default=LOW_STOCK_DAYS)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Simulated per-request latency in seconds for local-dynamodb')
+    args = parser.parse_args()
+
+    print("=== INVENTORY REPOSITORY ===")
+    with open_repository(args.backend, args.path, latency=args.latency) as repository:
+        if not args.no_load:
+            start = time.perf_counter()
+            batches = repository.put_materials(iter_materials(args.load))
+            print(f"Loaded {args.load} in {batches:,} batch writes of up to {BATCH_WRITE_SIZE} "
+                  f"({time.perf_counter() - start:.2f}s)")
+
+        for segments in sorted({1, args.segments}):
+            start = time.perf_counter()
+            items = repository.scan(segments)
+            print(f"Scan with {segments} segment(s): {len(items):,} items in {time.perf_counter() - start:.3f}s")
+
+        start = time.perf_counter()
+        low_stock = repository.query_low_stock(args.threshold)
+        print(f"Low-stock index query: {len(low_stock):,} items below {args.threshold:g} days "
+              f"in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,144 @@
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import evaluate_purchase
+from substitute_index import SubstituteIndex
+from inventory_loader import load_materials, DEFAULT_INVENTORY_PATH
+
+NO_SUBSTITUTE = 'NO SUBSTITUTE'
+
+# Substitute index used by the request handler; set in the parent before forking or by init_load_worker
+_index = None
+
+
+def init_load_worker(materials):
+    global _index
+    _index = SubstituteIndex(materials)
+
+
+def handle_request(sku):
+    """One agent invocation: find a substitute for the SKU and decide whether to buy it"""
+    item = _index.by_sku[sku]
+    substitute = _index.find_substitute(item)
+    if substitute is None:
+        return sku, None, NO_SUBSTITUTE
+    return sku, substitute['SKU'], evaluate_purchase.evaluate_purchase(substitute, item)
+
+
+def request_skus(materials, count, seed=0):
+    """Pick the SKUs to request, favouring low-stock items as the agent would"""
+    candidates = [item['SKU'] for item in materials if item['DaysOnHand'] < 5] or [item['SKU'] for item in materials]
+    rng = random.Random(seed)
+    return [rng.choice(candidates) for _ in range(count)]
+
+
+def latency_summary(latencies):
+    """Return p50/p95/p99/max/mean of latencies given in seconds, in milliseconds"""
+    if not latencies:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None, 'mean_ms': None}
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(values.max()), 3),
+        'mean_ms': round(float(values.mean()), 3)
+    }
+
+
+def _pool(kind, workers, materials):
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=workers)
+    if kind != 'process':
+        raise ValueError(f"Unknown pool kind: {kind}")
+    if 'fork' in multiprocessing.get_all_start_methods():
+        # Workers inherit the parent's index copy-on-write
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_load_worker, initargs=(materials,))
+
+
+def _drive(kind, workers, materials, skus, target_rate):
+    """Submit every request on schedule, returning (latencies, outcomes, errors, elapsed seconds)"""
+    latencies = []
+    outcomes = []
+    errors = []
+    lock = threading.Lock()
+
+    def record(future, scheduled):
+        finished = time.perf_counter()
+        with lock:
+            latencies.append(finished - scheduled)
+            try:
+                outcomes.append(future.result())
+            except Exception as e:
+                errors.append(str(e))
+
+    with _pool(kind, workers, materials) as pool:
+        # Warm the pool up so process start-up is not charged to the first requests
+        list(pool.map(handle_request, skus[:workers]))
+        start = time.perf_counter()
+        for k, sku in enumerate(skus):
+            scheduled = start + k / target_rate if target_rate else time.perf_counter()
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            future = pool.submit(handle_request, sku)
+            future.add_done_callback(lambda f, scheduled=scheduled: record(f, scheduled))
+    return latencies, outcomes, errors, time.perf_counter() - start
+
+
+def run_load(materials, kind='thread', workers=8, requests=500, target_rate=None, seed=0):
+    """Drive handle_request from a thread or process pool at target_rate requests/s (None = unthrottled).
+
+    Latency is measured from each request's scheduled start, so queueing
+    behind a saturated pool counts against it instead of being hidden.
+    Decisions are compared with a sequential run over the same SKUs.
+    """
+    global _index
+    skus = request_skus(materials, requests, seed)
+    _index = SubstituteIndex(materials)
+    try:
+        expected = {sku: handle_request(sku) for sku in set(skus)}
+        latencies, outcomes, errors, elapsed = _drive(kind, workers, materials, skus, target_rate)
+    finally:
+        _index = None
+
+    violations = [{'sku': sku, 'substitute': substitute, 'decision': decision, 'expected': expected[sku][2]}
+                  for sku, substitute, decision in outcomes if (sku, substitute, decision) != expected[sku]]
+    return {
+        'pool': kind,
+        'workers': workers,
+        'requests': len(skus),
+        'target_rate': target_rate,
+        'achieved_rate': round(len(outcomes) / elapsed, 1) if elapsed > 0 else None,
+        'elapsed_seconds': round(elapsed, 4),
+        'latency': latency_summary(latencies),
+        'errors': len(errors),
+        'error_samples': errors[:5],
+        'consistency_violations': len(violations),
+        'violation_samples': violations[:5]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Concurrent load test of the substitute lookup and decision path')
+    parser.add_argument('--materials', default=DEFAULT_INVENTORY_PATH)
+    parser.add_argument('--pool', choices=['thread', 'process'], nargs='+', default=['thread', 'process'])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=None, help='Target requests per second (default: unthrottled)')
+    args = parser.parse_args()
+
+    materials = load_materials(args.materials)
+    print("=== PROCUREMENT AGENT LOAD TEST ===")
+    for kind in args.pool:
+        result = run_load(materials, kind, args.workers, args.requests, args.rate)
+        latency = result['latency']
+        print(f"{kind} pool x{args.workers}: {result['achieved_rate']} req/s, "
+              f"p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms, p99 {latency['p99_ms']}ms, "
+              f"{result['errors']} errors, {result['consistency_violations']} consistency violations")
@@ -1,25 +1,185 @@
+import argparse
 import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from multiprocessing import shared_memory
 from resilience_auditor import ResilienceAuditor
 from compliance_validator import ComplianceValidator
 from stress_tester import StressTester
+from material_table import MaterialTable
+from material import Material, load_compact_materials, to_records
+from inventory_loader import load_materials, DEFAULT_INVENTORY_PATH
+from response_cache import read_cache_stats
+from incremental_audit import IncrementalAuditor, FingerprintStore, DEFAULT_STORE_PATH
+from sampling_audit import SamplingAuditor, DEFAULT_CONFIDENCE
+from sharded_audit import ShardedAuditor
+
+# (report name, MasterAuditor attribute, report method) for each independent audit
+AUDITS = (
+    ('resilience', 'resilience_auditor', 'generate_resilience_report'),
+    ('compliance', 'compliance_validator', 'generate_compliance_report'),
+    ('stress_test', 'stress_tester', 'generate_stress_test_report'),
+)
+
+# Materials published by the parent before forking; workers inherit them copy-on-write
+_shared_materials = None
+
+def run_timed_audit(auditor, method_name, materials):
+    """Run one audit report method, returning the report and its wall time in seconds"""
+    start = time.perf_counter()
+    report = getattr(auditor, method_name)(materials)
+    return report, time.perf_counter() - start
+
+def _run_shared_audit(auditor, method_name, shm_name=None, shm_size=0, container='records'):
+    """Worker entry point: run one audit on the materials shared by the parent process"""
+    if shm_name is None:
+        return run_timed_audit(auditor, method_name, _shared_materials)
+    
+    buffer = shared_memory.SharedMemory(name=shm_name)
+    try:
+        materials = json.loads(bytes(buffer.buf[:shm_size]))
+    finally:
+        buffer.close()
+    if container == 'table':
+        materials = MaterialTable.from_records(materials)
+    elif container == 'compact':
+        materials = [Material.from_dict(record) for record in materials]
+    return run_timed_audit(auditor, method_name, materials)
 
 class MasterAuditor:
     def __init__(self):
         self.resilience_auditor = ResilienceAuditor()
         self.compliance_validator = ComplianceValidator()
         self.stress_tester = StressTester()
+        self.incremental_stats = None
+        self.sampling_stats = None
+        self.sharding_stats = None
+    
+    def run_audits_sequential(self, materials):
+        """Run each audit in turn, returning {name: (report, seconds)}"""
+        return {name: run_timed_audit(getattr(self, attribute), method, materials)
+                for name, attribute, method in AUDITS}
     
-    def run_comprehensive_audit(self, materials):
-        """Run all audit tests and generate master report"""
+    def run_audits_parallel(self, materials):
+        """Run the audits on a process pool, sharing the materials once instead of pickling them per audit"""
+        global _shared_materials
+        
+        if 'fork' in multiprocessing.get_all_start_methods():
+            _shared_materials = materials
+            try:
+                with ProcessPoolExecutor(max_workers=len(AUDITS), mp_context=multiprocessing.get_context('fork')) as pool:
+                    futures = {name: pool.submit(_run_shared_audit, getattr(self, attribute), method)
+                               for name, attribute, method in AUDITS}
+                    return {name: future.result() for name, future in futures.items()}
+            finally:
+                _shared_materials = None
+        
+        # Without fork, serialize once into a shared-memory buffer that every worker reads
+        if isinstance(materials, MaterialTable):
+            container, records = 'table', materials.to_records()
+        elif materials and isinstance(materials[0], Material):
+            container, records = 'compact', to_records(materials)
+        else:
+            container, records = 'records', materials
+        payload = json.dumps(records).encode('utf-8')
+        buffer = shared_memory.SharedMemory(create=True, size=max(1, len(payload)))
+        try:
+            buffer.buf[:len(payload)] = payload
+            with ProcessPoolExecutor(max_workers=len(AUDITS)) as pool:
+                futures = {name: pool.submit(_run_shared_audit, getattr(self, attribute), method,
+                                             buffer.name, len(payload), container)
+                           for name, attribute, method in AUDITS}
+                return {name: future.result() for name, future in futures.items()}
+        finally:
+            buffer.close()
+            buffer.unlink()
+    
+    def run_audits_incremental(self, materials, fingerprint_store, full_audit=False):
+        """Reuse stored per-SKU and per-spec-group results, recomputing only what changed"""
+        incremental = IncrementalAuditor(self.resilience_auditor, self.compliance_validator, fingerprint_store)
+        start = time.perf_counter()
+        resilience_report, compliance_report = incremental.run(materials, full=full_audit)
+        seconds = time.perf_counter() - start
+        self.incremental_stats = incremental.last_run
+        
+        # The split between the two reports is not measured separately in incremental mode
+        return {
+            'resilience': (resilience_report, seconds),
+            'compliance': (compliance_report, 0.0),
+            'stress_test': run_timed_audit(self.stress_tester, 'generate_stress_test_report', materials)
+        }
+    
+    def run_audits_sharded(self, materials, shards=None, workers=None):
+        """Run the resilience and compliance checks map-reduce style across worker processes"""
+        sharded = ShardedAuditor(self.resilience_auditor, self.compliance_validator, shards, workers)
+        start = time.perf_counter()
+        resilience_report, compliance_report = sharded.run(materials)
+        seconds = time.perf_counter() - start
+        self.sharding_stats = sharded.last_run
+        
+        # Both reports come from the same shard jobs, so their time is reported under resilience
+        return {
+            'resilience': (resilience_report, seconds),
+            'compliance': (compliance_report, 0.0),
+            'stress_test': run_timed_audit(self.stress_tester, 'generate_stress_test_report', materials)
+        }
+    
+    def run_audits_sampled(self, materials, sampling_auditor):
+        """Estimate the resilience and compliance results from a sample, with confidence intervals"""
+        sampling_auditor.resilience_auditor = self.resilience_auditor
+        sampling_auditor.compliance_validator = self.compliance_validator
+        start = time.perf_counter()
+        report = sampling_auditor.generate_sampling_report(materials)
+        seconds = time.perf_counter() - start
+        self.sampling_stats = dict(report['sampling'], estimates=report['estimates'])
+        
+        # Both reports come from one sampling pass, so its time is reported under resilience
+        return {
+            'resilience': (report['resilience'], seconds),
+            'compliance': (report['compliance'], 0.0),
+            'stress_test': run_timed_audit(self.stress_tester, 'generate_stress_test_report', materials)
+        }
+    
+    def run_comprehensive_audit(self, materials, parallel=False, fingerprint_store=None, full_audit=False,
+                                sampling_auditor=None, shards=None, workers=None):
+        """Run all audit tests and generate master report.
+        
+        parallel, fingerprint_store, sampling_auditor and shards each select
+        a different way of running the audits, so at most one may be given.
+        """
+        selected = {'parallel': parallel, 'fingerprint_store': fingerprint_store is not None,
+                    'sampling_auditor': sampling_auditor is not None, 'shards': bool(shards)}
+        modes = [name for name, chosen in selected.items() if chosen]
+        if len(modes) > 1:
+            raise ValueError(f"{' and '.join(modes)} cannot be combined")
         
         print("Running comprehensive procurement agent audit...")
         print("=" * 60)
         
         # Run all audits
-        resilience_report = self.resilience_auditor.generate_resilience_report(materials)
-        compliance_report = self.compliance_validator.generate_compliance_report(materials)
-        stress_report = self.stress_tester.generate_stress_test_report(materials)
+        start = time.perf_counter()
+        if sampling_auditor is not None:
+            results = self.run_audits_sampled(materials, sampling_auditor)
+            mode = 'sampled'
+        elif shards:
+            results = self.run_audits_sharded(materials, shards, workers)
+            mode = 'sharded'
+        elif fingerprint_store is not None:
+            results = self.run_audits_incremental(materials, fingerprint_store, full_audit)
+            mode = 'incremental'
+        elif parallel:
+            results = self.run_audits_parallel(materials)
+            mode = 'parallel'
+        else:
+            results = self.run_audits_sequential(materials)
+            mode = 'sequential'
+        total_seconds = time.perf_counter() - start
+        
+        resilience_report = results['resilience'][0]
+        compliance_report = results['compliance'][0]
+        stress_report = results['stress_test'][0]
         
         # Calculate overall agent health score
         resilience_score = resilience_report['resilience_score']
@@ -55,8 +215,20 @@ class MasterAuditor:
                 'stress_test': stress_report
             },
             'critical_findings': self.extract_critical_findings(resilience_report, compliance_report, stress_report),
-            'audit_summary': self.generate_audit_summary(resilience_report, compliance_report, stress_report)
+            'audit_summary': self.generate_audit_summary(resilience_report, compliance_report, stress_report),
+            'llm_cache': read_cache_stats(),
+            'audit_timings': {
+                'mode': mode,
+                'total_seconds': round(total_seconds, 4),
+                'audits': {name: round(seconds, 4) for name, (report, seconds) in results.items()}
+            }
         }
+        if fingerprint_store is not None:
+            master_report['audit_timings']['incremental'] = self.incremental_stats
+        if sampling_auditor is not None:
+            master_report['statistical_audit'] = self.sampling_stats
+        elif shards:
+            master_report['audit_timings']['sharding'] = self.sharding_stats
         
         return master_report
     
@@ -136,6 +308,11 @@ class MasterAuditor:
         print(f"  Stress Test Pass Rate: {summary['stress_test_pass_rate']}")
         print()
         
+        if report.get('llm_cache'):
+            cache = report['llm_cache']
+            print(f"LLM Response Cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.1%} hit rate)")
+            print()
+        
         if report['critical_findings']:
             print("Critical Findings:")
             for finding in report['critical_findings']:
@@ -144,14 +321,56 @@ class MasterAuditor:
         else:
             print("No critical findings identified.")
         
+        if report.get('statistical_audit'):
+            sampling = report['statistical_audit']
+            print(f"Statistical audit: {sampling['sampled_items']:,} of {sampling['total_items']:,} items sampled, "
+                  f"{sampling['confidence']:.0%} confidence intervals:")
+            for name, result in sampling['estimates'].items():
+                print(f"  {name}: {result['rate']:.2%} [{result['ci_low']:.2%}, {result['ci_high']:.2%}]")
+            print()
+        
+        timings = report['audit_timings']
+        print(f"Audit wall time ({timings['mode']}): {timings['total_seconds']:.2f}s")
+        for name, seconds in timings['audits'].items():
+            print(f"  {name}: {seconds:.2f}s")
+        
         print(f"\nNext audit recommended: {summary['next_audit_recommended']}")
 
 if __name__ == "__main__":
-    with open('raw_materials.json', 'r') as f:
-        materials = json.load(f)
+    parser = argparse.ArgumentParser(description='Run the comprehensive procurement agent audit')
+    parser.add_argument('--materials', default=DEFAULT_INVENTORY_PATH, help='Catalog as a JSON array or NDJSON')
+    parser.add_argument('--compact', action='store_true',
+                        help='Load materials as compact Material records (shared specs, interned strings)')
+    parser.add_argument('--parallel', action='store_true', help='Run the three audits on a process pool')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'Reuse results for unchanged SKUs from the fingerprint store ({DEFAULT_STORE_PATH})')
+    parser.add_argument('--full-audit', action='store_true',
+                        help='With --incremental, re-validate everything and rebuild the fingerprint store')
+    parser.add_argument('--sample-margin', type=float,
+                        help='Audit a seeded sample sized so each estimated violation rate is within this margin, '
+                             'e.g. 0.01, instead of the whole catalog')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help='Confidence level for --sample-margin intervals')
+    parser.add_argument('--seed', type=int, default=0, help='Sampling seed for --sample-margin')
+    parser.add_argument('--shards', type=int,
+                        help='Map-reduce the resilience and compliance checks over this many shards '
+                             '(by SKU hash and spec group) on worker processes')
+    parser.add_argument('--workers', type=int, help='Worker processes for --shards (default: all cores)')
+    args = parser.parse_args()
+    if sum((args.parallel, args.sample_margin is not None, args.incremental, bool(args.shards))) > 1:
+        parser.error('--parallel, --sample-margin, --incremental and --shards cannot be combined')
+    
+    materials = load_compact_materials(args.materials) if args.compact else load_materials(args.materials)
     
     master_auditor = MasterAuditor()
-    master_report = master_auditor.run_comprehensive_audit(materials)
+    fingerprint_store = FingerprintStore() if args.incremental else None
+    sampling_auditor = (SamplingAuditor(args.sample_margin, args.confidence, args.seed)
+                        if args.sample_margin is not None else None)
+    master_report = master_auditor.run_comprehensive_audit(materials, parallel=args.parallel,
+                                                           fingerprint_store=fingerprint_store,
+                                                           full_audit=args.full_audit,
+                                                           sampling_auditor=sampling_auditor,
+                                                           shards=args.shards, workers=args.workers)
     
     # Print executive summary
     master_auditor.print_executive_summary(master_report)
@@ -0,0 +1,228 @@
+import json
+import sys
+import weakref
+from collections.abc import Mapping
+from inventory_loader import iter_materials, DEFAULT_INVENTORY_PATH
+
+FIELDS = ('SKU', 'SupplierName', 'Price', 'LeadTime', 'DaysOnHand', 'TechnicalSpecs')
+
+# Interned specs by their dict hash, as weak references (a list when several specs share a hash), so an
+# entry goes away with the last record using it
+_specs = {}
+# Distinct key orders seen so far; there are few, one per spec layout
+_key_orders = {}
+
+
+class _SpecRef(weakref.ref):
+    __slots__ = ('key',)
+
+
+def _forget(ref):
+    """Drop a dead spec's registry entry"""
+    entry = _specs.get(ref.key)
+    if entry is ref:
+        del _specs[ref.key]
+    elif type(entry) is list and ref in entry:
+        entry.remove(ref)
+        if len(entry) == 1:
+            _specs[ref.key] = entry[0]
+
+
+class Spec(Mapping):
+    """Immutable, hashable TechnicalSpecs; intern_spec returns one shared instance per distinct spec"""
+    __slots__ = ('_keys', '_values', 'equality', '__weakref__')
+
+    def __init__(self, keys, values, equality=None):
+        self._keys = keys
+        self._values = values
+        # The first interned spec of this spec's dict-equality class; variants like 2.0 for 2 keep it alive
+        self.equality = self if equality is None else equality
+
+    def __getitem__(self, key):
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __hash__(self):
+        # Order-independent, like dict equality; not cached since specs are hashed once, when interned
+        return hash(frozenset(zip(self._keys, self._values)))
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is Spec:
+            # Equal exactly when the dicts are ({'grade': 2} == {'grade': 2.0}); interned dict-equal
+            # specs share their equality class
+            return self.equality is other.equality
+        return Mapping.__eq__(self, other)
+
+    def __ne__(self, other):
+        # Defined directly, so != in the compiled procurement rules costs a single call
+        if self is other:
+            return False
+        if type(other) is Spec:
+            return self.equality is not other.equality
+        equal = Mapping.__eq__(self, other)
+        return equal if equal is NotImplemented else not equal
+
+    def __reduce__(self):
+        # Copies and unpickled specs go back through the registry, keeping identity comparisons valid
+        return intern_spec, (dict(self),)
+
+    def __repr__(self):
+        return f"Spec({dict(self)!r})"
+
+
+def intern_spec(technical_specs):
+    """Return the shared Spec equal to a TechnicalSpecs mapping, or the mapping itself if it has unhashable values"""
+    if type(technical_specs) is Spec:
+        return technical_specs
+    keys = tuple(sys.intern(k) if isinstance(k, str) else k for k in technical_specs)
+    keys = _key_orders.setdefault(keys, keys)
+    values = tuple(sys.intern(v) if isinstance(v, str) else v for v in technical_specs.values())
+    try:
+        key = hash(frozenset(zip(keys, values)))
+    except TypeError:
+        return technical_specs
+
+    items = dict(zip(keys, values))
+    typed = dict(zip(keys, zip(map(type, values), values)))
+    entry = _specs.get(key)
+    equality = None
+    for ref in (entry,) if type(entry) is _SpecRef else tuple(entry or ()):
+        spec = ref()
+        if spec is None or dict(zip(spec._keys, spec._values)) != items:
+            continue
+        # Types are compared too, so 2 and 2.0 stay distinct specs and round-trip unchanged
+        if dict(zip(spec._keys, zip(map(type, spec._values), spec._values))) == typed:
+            return spec
+        equality = spec.equality
+
+    spec = Spec(keys, values, equality)
+    ref = _SpecRef(spec, _forget)
+    ref.key = key
+    entry = _specs.get(key)
+    if entry is None:
+        _specs[key] = ref
+    elif type(entry) is list:
+        entry.append(ref)
+    else:
+        _specs[key] = [entry, ref]
+    return spec
+
+
+def spec_count():
+    """Number of distinct specs currently interned"""
+    return sum(len(entry) if type(entry) is list else 1 for entry in _specs.values())
+
+
+class Material:
+    """Compact material record with slots, an interned supplier name and a shared Spec.
+
+    Supports the item['Field'] access used throughout the codebase, so
+    Materials can be passed wherever material dicts are expected.
+    """
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, sku, supplier_name, price, lead_time, days_on_hand, technical_specs, extra=None):
+        self.SKU = sku
+        self.SupplierName = sys.intern(supplier_name) if isinstance(supplier_name, str) else supplier_name
+        self.Price = price
+        self.LeadTime = lead_time
+        self.DaysOnHand = days_on_hand
+        self.TechnicalSpecs = intern_spec(technical_specs)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, record):
+        extra = {key: value for key, value in record.items() if key not in FIELDS} or None
+        return cls(record['SKU'], record['SupplierName'], record['Price'], record['LeadTime'],
+                   record['DaysOnHand'], record['TechnicalSpecs'], extra)
+
+    def to_dict(self):
+        """Return the record as the original JSON dict"""
+        record = {field: getattr(self, field) for field in FIELDS if hasattr(self, field)}
+        if 'TechnicalSpecs' in record:
+            record['TechnicalSpecs'] = dict(record['TechnicalSpecs'])
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    def __getitem__(self, key):
+        if key in FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'TechnicalSpecs':
+            value = intern_spec(value)
+        elif key == 'SupplierName' and isinstance(value, str):
+            value = sys.intern(value)
+        if key in FIELDS:
+            setattr(self, key, value)
+        else:
+            self.extra = dict(self.extra or {}, **{key: value})
+
+    def __delitem__(self, key):
+        try:
+            if key in FIELDS:
+                delattr(self, key)
+            else:
+                del self.extra[key]
+        except (AttributeError, KeyError, TypeError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        if key in FIELDS:
+            return hasattr(self, key)
+        return bool(self.extra and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [field for field in FIELDS if hasattr(self, field)] + list(self.extra or ())
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __eq__(self, other):
+        if isinstance(other, Material):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Material({self.to_dict()!r})"
+
+
+def load_compact_materials(path=DEFAULT_INVENTORY_PATH):
+    """Stream a JSON or NDJSON catalog into a list of compact Material records"""
+    return [Material.from_dict(record) for record in iter_materials(path)]
+
+
+def to_records(materials):
+    """Convert Material records back to the JSON dicts they were loaded from"""
+    return [material.to_dict() for material in materials]
+
+
+def dump_materials(materials, path):
+    """Write Material records in the same format as raw_materials.json"""
+    with open(path, 'w') as f:
+        json.dump(to_records(materials), f, indent=2)
@@ -0,0 +1,174 @@
+import json
+import numpy as np
+from substitute_index import spec_key
+from inventory_loader import LOW_STOCK_DAYS, CRITICAL_STOCK_DAYS
+
+
+def _numeric(values):
+    """Integer column when every value is an integer, float otherwise, so fractional days are not truncated"""
+    column = np.asarray(values)
+    return column.astype(np.int64 if column.dtype.kind in 'iub' else np.float64)
+
+
+def _encode(values):
+    """Dictionary-encode a sequence of strings into integer codes and a vocabulary"""
+    vocabulary = {}
+    codes = np.fromiter((vocabulary.setdefault(v, len(vocabulary)) for v in values),
+                        dtype=np.int32, count=len(values))
+    return codes, list(vocabulary)
+
+
+class MaterialTable:
+    """Columnar, NumPy-backed view of the raw materials inventory.
+
+    Price, LeadTime and DaysOnHand are numeric arrays (integer unless a
+    value is fractional), SupplierName and grade are dictionary-encoded,
+    and each row carries the integer id of its TechnicalSpecs group. Indexing and iteration yield plain material
+    dicts so existing per-item code keeps working on a table.
+    """
+
+    def __init__(self, skus, supplier_codes, suppliers, price, lead_time, days_on_hand,
+                 spec_group, specs):
+        self.skus = np.asarray(skus, dtype=str)
+        self.supplier_codes = np.asarray(supplier_codes, dtype=np.int32)
+        self.suppliers = list(suppliers)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.lead_time = _numeric(lead_time)
+        self.days_on_hand = _numeric(days_on_hand)
+        self.spec_group = np.asarray(spec_group, dtype=np.int32)
+        self.specs = list(specs)
+
+        group_grades, self.grades = _encode([str(spec.get('grade', '')) for spec in self.specs])
+        self.grade_codes = group_grades[self.spec_group]
+        self._sku_positions = None
+
+    @classmethod
+    def from_records(cls, materials):
+        """Build a table from a list of material dicts"""
+        if isinstance(materials, MaterialTable):
+            return materials
+        materials = list(materials)
+
+        group_ids = {}
+        specs = []
+        spec_group = np.empty(len(materials), dtype=np.int32)
+        for i, item in enumerate(materials):
+            key = spec_key(item['TechnicalSpecs'])
+            group = group_ids.get(key)
+            if group is None:
+                group = group_ids[key] = len(specs)
+                specs.append(dict(item['TechnicalSpecs']))
+            spec_group[i] = group
+
+        supplier_codes, suppliers = _encode([item['SupplierName'] for item in materials])
+        return cls(
+            skus=[item['SKU'] for item in materials],
+            supplier_codes=supplier_codes,
+            suppliers=suppliers,
+            price=[item['Price'] for item in materials],
+            lead_time=[item['LeadTime'] for item in materials],
+            days_on_hand=[item['DaysOnHand'] for item in materials],
+            spec_group=spec_group,
+            specs=specs
+        )
+
+    @classmethod
+    def from_json(cls, path='raw_materials.json'):
+        """Load a table from a raw materials JSON file"""
+        with open(path, 'r') as f:
+            return cls.from_records(json.load(f))
+
+    def __len__(self):
+        return len(self.skus)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('MaterialTable index out of range')
+        return self.record(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.record(i)
+
+    def record(self, i):
+        """Return row i as a material dict"""
+        return {
+            'SKU': str(self.skus[i]),
+            'SupplierName': self.suppliers[self.supplier_codes[i]],
+            'Price': float(self.price[i]),
+            'LeadTime': self.lead_time[i].item(),
+            'DaysOnHand': self.days_on_hand[i].item(),
+            'TechnicalSpecs': dict(self.specs[self.spec_group[i]])
+        }
+
+    def to_records(self):
+        """Return the table as a list of material dicts"""
+        return list(self)
+
+    def copy(self):
+        """Return a copy whose columns can be modified independently"""
+        return MaterialTable(self.skus.copy(), self.supplier_codes.copy(), self.suppliers,
+                             self.price.copy(), self.lead_time.copy(), self.days_on_hand.copy(),
+                             self.spec_group.copy(), self.specs)
+
+    def tile(self, repetitions):
+        """Return a table with every row repeated, like materials * repetitions on a list"""
+        return MaterialTable(np.tile(self.skus, repetitions), np.tile(self.supplier_codes, repetitions),
+                             self.suppliers, np.tile(self.price, repetitions),
+                             np.tile(self.lead_time, repetitions), np.tile(self.days_on_hand, repetitions),
+                             np.tile(self.spec_group, repetitions), self.specs)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the column arrays"""
+        return sum(column.nbytes for column in (self.skus, self.supplier_codes, self.price, self.lead_time,
+                                                self.days_on_hand, self.spec_group, self.grade_codes))
+
+    def index_of(self, sku):
+        """Return the row of the first occurrence of a SKU, or None"""
+        if self._sku_positions is None:
+            self._sku_positions = {}
+            for i, value in enumerate(self.skus.tolist()):
+                self._sku_positions.setdefault(value, i)
+        return self._sku_positions.get(sku)
+
+    def set_days_on_hand(self, sku, days):
+        """Set DaysOnHand for a SKU, returning False if the SKU is unknown"""
+        i = self.index_of(sku)
+        if i is None:
+            return False
+        if self.days_on_hand.dtype.kind == 'i' and days != int(days):
+            self.days_on_hand = self.days_on_hand.astype(np.float64)
+        self.days_on_hand[i] = days
+        return True
+
+    def low_stock_mask(self, threshold=LOW_STOCK_DAYS):
+        """Boolean mask of rows with DaysOnHand below the threshold"""
+        return self.days_on_hand < threshold
+
+    def critical_mask(self, threshold=CRITICAL_STOCK_DAYS):
+        """Boolean mask of rows with DaysOnHand at or below the threshold"""
+        return self.days_on_hand <= threshold
+
+    def count_low_stock(self, threshold=LOW_STOCK_DAYS):
+        return int(np.count_nonzero(self.low_stock_mask(threshold)))
+
+    def low_stock_percentage(self, threshold=LOW_STOCK_DAYS):
+        return self.count_low_stock(threshold) / len(self) * 100
+
+    def skus_where(self, mask):
+        """Return the SKUs of the rows selected by a boolean mask"""
+        return self.skus[mask].tolist()
+
+    def substitute_mask(self):
+        """Boolean mask of rows whose spec group contains another supplier"""
+        group_count = len(self.specs)
+        lowest = np.full(group_count, np.iinfo(np.int32).max, dtype=np.int32)
+        highest = np.full(group_count, -1, dtype=np.int32)
+        np.minimum.at(lowest, self.spec_group, self.supplier_codes)
+        np.maximum.at(highest, self.spec_group, self.supplier_codes)
+        return (lowest != highest)[self.spec_group]
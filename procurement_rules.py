@@ -0,0 +1,203 @@
+import json
+import math
+import os
+
+DEFAULT_RULES_PATH = os.environ.get('PROCUREMENT_RULES_PATH')
+
+APPROVED = 'APPROVED'
+SPECS_MISMATCH = 'REJECTED: Specs Mismatch'
+PENDING_MANAGER = 'PENDING MANAGER'
+SUPPLIER_REJECTED = 'REJECTED: Supplier Not Approved'
+LEAD_TIME_REJECTED = 'REJECTED: Lead Time Exceeded'
+
+# Decision codes index into DECISIONS; the first three are the original evaluate_purchase outcomes
+DECISION_APPROVED = 0
+DECISION_REJECTED = 1
+DECISION_PENDING = 2
+DECISION_SUPPLIER_REJECTED = 3
+DECISION_LEAD_TIME_REJECTED = 4
+DECISIONS = (APPROVED, SPECS_MISMATCH, PENDING_MANAGER, SUPPLIER_REJECTED, LEAD_TIME_REJECTED)
+
+# The rule set evaluate_purchase has always applied
+DEFAULT_RULES = {'approval_threshold': 1000}
+
+RULE_KEYS = {'approval_threshold', 'max_lead_time', 'lead_time_action', 'category_key', 'categories', 'suppliers'}
+CATEGORY_KEYS = {'approval_threshold', 'max_lead_time'}
+LEAD_TIME_ACTIONS = {'pending': DECISION_PENDING, 'reject': DECISION_LEAD_TIME_REJECTED}
+
+
+def load_rules(path=DEFAULT_RULES_PATH):
+    """Read a rule set from a JSON or YAML file"""
+    with open(path, 'r') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('PyYAML is required for YAML rule files; use JSON or pip install pyyaml') from None
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def _check_number(value, name):
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+
+
+class ProcurementRules:
+    """A declarative procurement rule set, compiled once into a decision function.
+
+    Rules apply in a fixed order: specs must match, the proposed supplier
+    must pass the allow/deny lists, its lead time must be within the limit,
+    and it is approved below the price threshold, otherwise it goes to a
+    manager. Thresholds and lead-time limits can be set per category (a
+    TechnicalSpecs field, 'grade' by default). decide is generated Python
+    with the rule constants inlined and disabled checks left out, so the
+    default rule set costs no more than the original hardcoded function.
+    """
+
+    def __init__(self, rules=None):
+        rules = DEFAULT_RULES if rules is None else rules
+        unknown = set(rules) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Unknown procurement rule(s): {', '.join(sorted(unknown))}")
+
+        self.approval_threshold = rules.get('approval_threshold', DEFAULT_RULES['approval_threshold'])
+        self.max_lead_time = rules.get('max_lead_time')
+        _check_number(self.approval_threshold, 'approval_threshold')
+        _check_number(self.max_lead_time, 'max_lead_time')
+        self.lead_time_action = rules.get('lead_time_action', 'pending')
+        if self.lead_time_action not in LEAD_TIME_ACTIONS:
+            raise ValueError(f"lead_time_action must be one of {sorted(LEAD_TIME_ACTIONS)}")
+
+        self.category_key = rules.get('category_key', 'grade')
+        self.categories = {}
+        for category, limits in (rules.get('categories') or {}).items():
+            unknown = set(limits) - CATEGORY_KEYS
+            if unknown:
+                raise ValueError(f"Unknown rule(s) for category {category!r}: {', '.join(sorted(unknown))}")
+            threshold = limits.get('approval_threshold', self.approval_threshold)
+            max_lead_time = limits.get('max_lead_time', self.max_lead_time)
+            _check_number(threshold, f"categories.{category}.approval_threshold")
+            _check_number(max_lead_time, f"categories.{category}.max_lead_time")
+            self.categories[str(category)] = (threshold, max_lead_time)
+
+        suppliers = rules.get('suppliers') or {}
+        allow = suppliers.get('allow')
+        self.allowed_suppliers = frozenset(allow) if allow is not None else None
+        self.denied_suppliers = frozenset(suppliers.get('deny') or ())
+
+        self.uses_categories = bool(self.categories)
+        self.uses_lead_time = self.max_lead_time is not None or any(
+            max_lead is not None for threshold, max_lead in self.categories.values())
+        self.uses_suppliers = self.allowed_suppliers is not None or bool(self.denied_suppliers)
+        self.decide = self._compile()
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_rules(path))
+
+    def to_dict(self):
+        """The rule set in canonical form, as accepted by the constructor"""
+        rules = {'approval_threshold': self.approval_threshold, 'lead_time_action': self.lead_time_action,
+                 'category_key': self.category_key}
+        if self.max_lead_time is not None:
+            rules['max_lead_time'] = self.max_lead_time
+        if self.categories:
+            rules['categories'] = {category: {'approval_threshold': threshold, 'max_lead_time': max_lead_time}
+                                   for category, (threshold, max_lead_time) in sorted(self.categories.items())}
+        if self.uses_suppliers:
+            rules['suppliers'] = {'deny': sorted(self.denied_suppliers)}
+            if self.allowed_suppliers is not None:
+                rules['suppliers']['allow'] = sorted(self.allowed_suppliers)
+        return rules
+
+    def category_limits(self, technical_specs):
+        """(approval threshold, max lead time or None) for an item's TechnicalSpecs"""
+        return self.categories.get(str(technical_specs.get(self.category_key, '')),
+                                   (self.approval_threshold, self.max_lead_time))
+
+    def supplier_allowed(self, supplier_name):
+        if supplier_name in self.denied_suppliers:
+            return False
+        return self.allowed_suppliers is None or supplier_name in self.allowed_suppliers
+
+    def _compile(self):
+        """Generate the scalar decision function for this rule set"""
+        self.constants = {
+            'APPROVED': APPROVED,
+            'SPECS_MISMATCH': SPECS_MISMATCH,
+            'PENDING_MANAGER': PENDING_MANAGER,
+            'SUPPLIER_REJECTED': SUPPLIER_REJECTED,
+            'LEAD_TIME_DECISION': DECISIONS[LEAD_TIME_ACTIONS[self.lead_time_action]],
+            'APPROVAL_THRESHOLD': self.approval_threshold,
+            'MAX_LEAD_TIME': self.max_lead_time,
+            'CATEGORIES': self.categories,
+            'CATEGORY_KEY': self.category_key,
+            'DEFAULT_LIMITS': (self.approval_threshold, self.max_lead_time),
+            'ALLOWED_SUPPLIERS': self.allowed_suppliers,
+            'DENIED_SUPPLIERS': self.denied_suppliers,
+        }
+        # Scalar constants are written into the source as literals, like the original hardcoded function;
+        # the supplier sets and category table are globals of its own namespace, kept alive by self.decide
+        literal = self._literal
+        lines = [
+            "def decide(proposed_item, current_inventory_item):",
+            '    """Decide on buying proposed_item in place of current_inventory_item under this rule set"""',
+            # A plain != like the original function; interned material.Spec values compare like dicts
+            "    if proposed_item['TechnicalSpecs'] != current_inventory_item['TechnicalSpecs']:",
+            f"        return {literal('SPECS_MISMATCH')}",
+        ]
+        if self.denied_suppliers:
+            lines += ["    if proposed_item['SupplierName'] in DENIED_SUPPLIERS:",
+                      f"        return {literal('SUPPLIER_REJECTED')}"]
+        if self.allowed_suppliers is not None:
+            lines += ["    if proposed_item['SupplierName'] not in ALLOWED_SUPPLIERS:",
+                      f"        return {literal('SUPPLIER_REJECTED')}"]
+        if self.uses_categories:
+            lines += ["    threshold, max_lead_time = CATEGORIES.get(",
+                      f"        str(proposed_item['TechnicalSpecs'].get({literal('CATEGORY_KEY')}, '')), DEFAULT_LIMITS)"]
+            if self.uses_lead_time:
+                lines += ["    if max_lead_time is not None and proposed_item['LeadTime'] > max_lead_time:",
+                          f"        return {literal('LEAD_TIME_DECISION')}"]
+            lines += ["    if proposed_item['Price'] < threshold:"]
+        else:
+            if self.max_lead_time is not None:
+                lines += [f"    if proposed_item['LeadTime'] > {literal('MAX_LEAD_TIME')}:",
+                          f"        return {literal('LEAD_TIME_DECISION')}"]
+            lines += [f"    if proposed_item['Price'] < {literal('APPROVAL_THRESHOLD')}:"]
+        lines += [f"        return {literal('APPROVED')}",
+                  f"    return {literal('PENDING_MANAGER')}"]
+
+        self.source = '\n'.join(lines) + '\n'
+        namespace = dict(self.constants)
+        exec(compile(self.source, '<procurement rules>', 'exec'), namespace)
+        return namespace['decide']
+
+    def _literal(self, name):
+        """A constant as an exact Python literal when it has one, otherwise its name in the generated namespace"""
+        value = self.constants[name]
+        if value is None or isinstance(value, (str, int)) or isinstance(value, float) and math.isfinite(value):
+            return repr(value)
+        return name
+
+    def decide_codes(self, specs_match, prices, thresholds=None, lead_times=None, max_lead_times=None,
+                     supplier_ok=None):
+        """Vectorized decisions from aligned arrays, in the same rule order as decide.
+
+        thresholds and max_lead_times are per-pair limits (NaN for no lead
+        time limit); they default to the global rules when not given.
+        """
+        import numpy as np
+        prices = np.asarray(prices, dtype=np.float64)
+        if thresholds is None:
+            thresholds = self.approval_threshold
+        codes = np.where(prices < thresholds, DECISION_APPROVED, DECISION_PENDING).astype(np.int8)
+        if lead_times is not None:
+            if max_lead_times is None:
+                max_lead_times = np.nan if self.max_lead_time is None else self.max_lead_time
+            # NaN limits never compare greater, so items without a limit pass
+            codes[np.asarray(lead_times) > max_lead_times] = LEAD_TIME_ACTIONS[self.lead_time_action]
+        if supplier_ok is not None:
+            codes[~np.asarray(supplier_ok, dtype=bool)] = DECISION_SUPPLIER_REJECTED
+        codes[~np.asarray(specs_match, dtype=bool)] = DECISION_REJECTED
+        return codes
@@ -1,75 +1,218 @@
+import argparse
 import json
+import math
 import random
+import sys
 from datetime import datetime
-from evaluate_purchase import evaluate_purchase
+import evaluate_purchase
+from substitute_index import SubstituteIndex, spec_key
+from material_table import MaterialTable
+from inventory_loader import load_materials, iter_chunks, DEFAULT_INVENTORY_PATH, DEFAULT_CHUNK_SIZE
 
 class ResilienceAuditor:
-    def __init__(self):
+    def __init__(self, spec_matching_mode='exhaustive', pair_sample_size=200, seed=None):
         self.test_results = []
         self.compliance_violations = []
+        self.spec_matching_mode = spec_matching_mode
+        self.pair_sample_size = pair_sample_size
+        self.seed = seed
         
-    def test_spec_matching_accuracy(self, materials):
+    def spec_pair_violation(self, item1, item2):
+        """Return a violation if the decision for a pair disagrees with its specs, else None"""
+        specs_match = item1['TechnicalSpecs'] == item2['TechnicalSpecs']
+        decision = evaluate_purchase.evaluate_purchase(item1, item2)
+        
+        if specs_match and 'REJECTED' not in decision:
+            return None
+        if not specs_match and 'REJECTED' in decision:
+            return None
+        
+        return {
+            'type': 'spec_mismatch_error',
+            'item1': item1['SKU'],
+            'item2': item2['SKU'],
+            'expected_match': specs_match,
+            'decision': decision
+        }
+    
+    def check_spec_pair(self, item1, item2):
+        """Evaluate one pair and record a violation if the decision disagrees with the specs"""
+        violation = self.spec_pair_violation(item1, item2)
+        if violation is None:
+            return True
+        self.compliance_violations.append(violation)
+        return False
+    
+    def test_spec_matching_accuracy(self, materials, mode=None):
         """Test accuracy of technical specification matching"""
+        mode = mode or self.spec_matching_mode
+        if mode == 'grouped':
+            return self.test_grouped_spec_matching(materials)
+        if mode != 'exhaustive':
+            raise ValueError(f"Unknown spec matching mode: {mode}")
+        if isinstance(materials, MaterialTable):
+            materials = materials.to_records()
+        
         correct_matches = 0
         total_tests = 0
         
         for i, item1 in enumerate(materials):
             for j, item2 in enumerate(materials[i+1:], i+1):
                 total_tests += 1
-                specs_match = item1['TechnicalSpecs'] == item2['TechnicalSpecs']
-                decision = evaluate_purchase(item1, item2)
-                
-                if specs_match and 'REJECTED' not in decision:
+                if self.check_spec_pair(item1, item2):
                     correct_matches += 1
-                elif not specs_match and 'REJECTED' in decision:
-                    correct_matches += 1
-                else:
-                    self.compliance_violations.append({
-                        'type': 'spec_mismatch_error',
-                        'item1': item1['SKU'],
-                        'item2': item2['SKU'],
-                        'expected_match': specs_match,
-                        'decision': decision
-                    })
         
         accuracy = correct_matches / total_tests if total_tests > 0 else 0
         return {'accuracy': accuracy, 'total_tests': total_tests, 'correct': correct_matches}
     
+    def test_grouped_spec_matching(self, materials):
+        """Test spec matching from spec-group sizes, verifying a sample of pairs"""
+        materials = list(materials)
+        
+        groups = {}
+        for position, item in enumerate(materials):
+            groups.setdefault(spec_key(item['TechnicalSpecs']), []).append(position)
+        
+        plan = self.plan_grouped_pairs(materials, list(groups.values()), len(groups))
+        within_correct = sum(self.check_spec_pair(materials[a], materials[b]) for a, b in plan['within_pairs'])
+        cross_correct = sum(self.check_spec_pair(materials[a], materials[b]) for a, b in plan['cross_pairs'])
+        return self.grouped_spec_result(plan, within_correct, cross_correct)
+    
+    def plan_grouped_pairs(self, materials, groups, group_count):
+        """Choose the pairs to verify for grouped spec matching.
+        
+        groups holds each spec group's positions, in order of first appearance
+        in the catalog; single-item groups may be left out. group_count counts
+        every spec group, single-item ones included. At most pair_sample_size
+        pairs are checked within groups in total, and as many across groups.
+        """
+        rng = random.Random(self.seed)
+        sample_size = self.pair_sample_size
+        n = len(materials)
+        
+        # Every pair within a group should match, every pair across groups should be rejected
+        total_tests = n * (n - 1) // 2
+        expected_matches = sum(len(g) * (len(g) - 1) // 2 for g in groups)
+        expected_rejects = total_tests - expected_matches
+        
+        within_pairs = []
+        if expected_matches <= sample_size:
+            for positions in groups:
+                within_pairs.extend((a, b) for k, a in enumerate(positions) for b in positions[k+1:])
+        else:
+            # One budget for all groups, split in proportion to their pair counts (largest remainder first)
+            counts = [len(g) * (len(g) - 1) // 2 for g in groups]
+            shares = [sample_size * count for count in counts]
+            quotas = [share // expected_matches for share in shares]
+            by_remainder = sorted(range(len(groups)), key=lambda k: (-(shares[k] % expected_matches), k))
+            for k in by_remainder[:sample_size - sum(quotas)]:
+                quotas[k] += 1
+            for positions, count, quota in zip(groups, counts, quotas):
+                # Distinct pairs, drawn by index into the group's (a, b) pairs ordered by b
+                for index in sorted(rng.sample(range(count), quota)):
+                    b = (1 + math.isqrt(1 + 8 * index)) // 2
+                    within_pairs.append((positions[index - b * (b - 1) // 2], positions[b]))
+        
+        cross_pairs = []
+        if group_count > 1 and expected_rejects:
+            attempts = 0
+            while len(cross_pairs) < min(sample_size, expected_rejects) and attempts < sample_size * 20:
+                attempts += 1
+                a, b = sorted(rng.sample(range(n), 2))
+                if spec_key(materials[a]['TechnicalSpecs']) != spec_key(materials[b]['TechnicalSpecs']):
+                    cross_pairs.append((a, b))
+        
+        return {
+            'total_tests': total_tests,
+            'spec_groups': group_count,
+            'expected_matches': expected_matches,
+            'expected_rejects': expected_rejects,
+            'within_pairs': within_pairs,
+            'cross_pairs': cross_pairs
+        }
+    
+    def grouped_spec_result(self, plan, within_correct, cross_correct):
+        """Scale the verified pairs of a grouped spec matching plan up to the whole catalog"""
+        within_pairs = plan['within_pairs']
+        cross_pairs = plan['cross_pairs']
+        total_tests = plan['total_tests']
+        
+        # Scale sampled accuracy of each stratum up to its closed-form pair count
+        within_accuracy = within_correct / len(within_pairs) if within_pairs else 1
+        cross_accuracy = cross_correct / len(cross_pairs) if cross_pairs else 1
+        correct = round(within_accuracy * plan['expected_matches'] + cross_accuracy * plan['expected_rejects'])
+        
+        accuracy = correct / total_tests if total_tests > 0 else 0
+        return {
+            'accuracy': accuracy,
+            'total_tests': total_tests,
+            'correct': correct,
+            'mode': 'grouped',
+            'spec_groups': plan['spec_groups'],
+            'expected_matches': plan['expected_matches'],
+            'expected_rejects': plan['expected_rejects'],
+            'sampled_pairs': len(within_pairs) + len(cross_pairs)
+        }
+    
+    def item_price_violations(self, item):
+        """Return the price threshold violations for a single item"""
+        violations = []
+        
+        # Test with matching specs item
+        test_item = {
+            'SKU': 'TEST-001',
+            'Price': item['Price'],
+            'TechnicalSpecs': item['TechnicalSpecs'],
+            'SupplierName': item.get('SupplierName'),
+            'LeadTime': item.get('LeadTime', 0)
+        }
+        
+        decision = evaluate_purchase.evaluate_purchase(test_item, item)
+        threshold, max_lead_time = evaluate_purchase.get_procurement_rules().category_limits(item['TechnicalSpecs'])
+        if max_lead_time is not None and test_item['LeadTime'] > max_lead_time:
+            # The lead time rule decides before the price threshold applies
+            return violations
+        
+        if item['Price'] < threshold and 'APPROVED' not in decision and 'REJECTED' not in decision:
+            violations.append({
+                'type': 'price_threshold_violation',
+                'sku': item['SKU'],
+                'price': item['Price'],
+                'expected': 'APPROVED',
+                'actual': decision
+            })
+        elif item['Price'] >= threshold and 'PENDING MANAGER' not in decision and 'REJECTED' not in decision:
+            violations.append({
+                'type': 'price_threshold_violation',
+                'sku': item['SKU'],
+                'price': item['Price'],
+                'expected': 'PENDING MANAGER',
+                'actual': decision
+            })
+        
+        return violations
+    
     def test_price_threshold_compliance(self, materials):
         """Test compliance with price approval thresholds"""
         violations = []
         
         for item in materials:
-            # Test with matching specs item
-            test_item = {
-                'SKU': 'TEST-001',
-                'Price': item['Price'],
-                'TechnicalSpecs': item['TechnicalSpecs']
-            }
-            
-            decision = evaluate_purchase(test_item, item)
-            
-            if item['Price'] < 1000 and 'APPROVED' not in decision and 'REJECTED' not in decision:
-                violations.append({
-                    'type': 'price_threshold_violation',
-                    'sku': item['SKU'],
-                    'price': item['Price'],
-                    'expected': 'APPROVED',
-                    'actual': decision
-                })
-            elif item['Price'] >= 1000 and 'PENDING MANAGER' not in decision and 'REJECTED' not in decision:
-                violations.append({
-                    'type': 'price_threshold_violation',
-                    'sku': item['SKU'],
-                    'price': item['Price'],
-                    'expected': 'PENDING MANAGER',
-                    'actual': decision
-                })
+            violations.extend(self.item_price_violations(item))
         
         return violations
     
     def test_low_stock_detection(self, materials):
         """Test accuracy of low stock detection"""
+        if isinstance(materials, MaterialTable):
+            critical_mask = materials.critical_mask()
+            return {
+                'total_items': len(materials),
+                'low_stock_count': materials.count_low_stock(),
+                'critical_stock_count': int(critical_mask.sum()),
+                'low_stock_percentage': materials.low_stock_percentage(),
+                'critical_items': materials.skus_where(critical_mask)
+            }
+        
         low_stock_items = [item for item in materials if item['DaysOnHand'] < 5]
         critical_items = [item for item in materials if item['DaysOnHand'] <= 1]
         
@@ -81,18 +224,53 @@ class ResilienceAuditor:
             'critical_items': [item['SKU'] for item in critical_items]
         }
     
+    def test_low_stock_detection_from_chunks(self, chunks):
+        """Test accuracy of low stock detection over a stream of material chunks"""
+        total_items = 0
+        low_stock_count = 0
+        critical_items = []
+        for chunk in chunks:
+            if isinstance(chunk, MaterialTable):
+                critical_mask = chunk.critical_mask()
+                total_items += len(chunk)
+                low_stock_count += chunk.count_low_stock()
+                critical_items.extend(chunk.skus_where(critical_mask))
+                continue
+            for item in chunk:
+                total_items += 1
+                if item['DaysOnHand'] < 5:
+                    low_stock_count += 1
+                if item['DaysOnHand'] <= 1:
+                    critical_items.append(item['SKU'])
+        
+        return {
+            'total_items': total_items,
+            'low_stock_count': low_stock_count,
+            'critical_stock_count': len(critical_items),
+            'low_stock_percentage': low_stock_count / total_items * 100,
+            'critical_items': critical_items
+        }
+    
     def test_substitute_availability(self, materials):
         """Test availability of substitutes for critical items"""
+        if isinstance(materials, MaterialTable):
+            low_stock_mask = materials.low_stock_mask()
+            covered_mask = low_stock_mask & materials.substitute_mask()
+            low_stock_count = int(low_stock_mask.sum())
+            substitutes_found = int(covered_mask.sum())
+            return {
+                'substitutes_found': substitutes_found,
+                'items_without_substitutes': materials.skus_where(low_stock_mask & ~covered_mask),
+                'substitute_coverage': substitutes_found / low_stock_count * 100 if low_stock_count else 100
+            }
+        
         substitutes_found = 0
         critical_without_substitutes = []
+        substitute_index = SubstituteIndex(materials)
         
         for item in materials:
             if item['DaysOnHand'] < 5:
-                substitute = next((other for other in materials 
-                                if other['TechnicalSpecs'] == item['TechnicalSpecs'] 
-                                and other['SupplierName'] != item['SupplierName']), None)
-                
-                if substitute:
+                if substitute_index.has_substitute(item):
                     substitutes_found += 1
                 else:
                     critical_without_substitutes.append(item['SKU'])
@@ -114,6 +292,10 @@ class ResilienceAuditor:
             'compliance_violations': self.compliance_violations
         }
         
+        return self.score_resilience_report(report)
+    
+    def score_resilience_report(self, report):
+        """Add the overall resilience score to a report"""
         # Calculate overall resilience score
         spec_score = report['spec_matching']['accuracy'] * 100
         substitute_score = report['substitute_analysis']['substitute_coverage']
@@ -123,11 +305,33 @@ class ResilienceAuditor:
         
         return report
 
+def print_stock_analysis(stock):
+    """Print the low and critical stock counts of a stock analysis"""
+    print("Stock Analysis:")
+    print(f"  Low Stock Items: {stock['low_stock_count']}")
+    print(f"  Critical Items: {stock['critical_stock_count']}")
+    print(f"  Critical SKUs: {', '.join(stock['critical_items'])}")
+    print()
+
+
 if __name__ == "__main__":
-    with open('raw_materials.json', 'r') as f:
-        materials = json.load(f)
-    
+    parser = argparse.ArgumentParser(description='Resilience audit of the procurement decision logic')
+    parser.add_argument('--materials', default=DEFAULT_INVENTORY_PATH, help='Catalog as a JSON array or NDJSON')
+    parser.add_argument('--low-stock-only', action='store_true',
+                        help='Only detect low stock, streaming the catalog in chunks with constant memory')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
     auditor = ResilienceAuditor()
+    if args.low_stock_only:
+        stock = auditor.test_low_stock_detection_from_chunks(iter_chunks(args.materials, args.chunk_size))
+        print("=== LOW STOCK DETECTION ===")
+        print(f"Items: {stock['total_items']} ({stock['low_stock_percentage']:.1f}% low stock)")
+        print()
+        print_stock_analysis(stock)
+        sys.exit()
+
+    materials = load_materials(args.materials)
     report = auditor.generate_resilience_report(materials)
     
     print("=== PROCUREMENT AGENT RESILIENCE AUDIT ===")
@@ -140,11 +344,7 @@ if __name__ == "__main__":
     print(f"  Tests Run: {report['spec_matching']['total_tests']}")
     print()
     
-    print("Stock Analysis:")
-    print(f"  Low Stock Items: {report['stock_analysis']['low_stock_count']}")
-    print(f"  Critical Items: {report['stock_analysis']['critical_stock_count']}")
-    print(f"  Critical SKUs: {', '.join(report['stock_analysis']['critical_items'])}")
-    print()
+    print_stock_analysis(report['stock_analysis'])
     
     print("Substitute Coverage:")
     print(f"  Coverage: {report['substitute_analysis']['substitute_coverage']:.1f}%")
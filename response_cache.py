@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.environ.get('CLAUDE_CACHE_PATH', 'claude_response_cache.sqlite')
+
+
+class ResponseCache:
+    """Content-addressed cache of Claude responses.
+
+    Entries are keyed by a hash of model id, max_tokens and prompt. Lookups
+    hit an in-memory LRU tier first and then an on-disk SQLite tier; both
+    honour the TTL, and the disk tier evicts least recently used entries
+    once it grows past max_entries. Pass path=None for a memory-only cache.
+    clock returns the current time in seconds (time.time by default).
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_size=256, ttl=7 * 24 * 3600, max_entries=10000,
+                 clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)'
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model_id, prompt, max_tokens):
+        """Return the content address for a request"""
+        payload = json.dumps([model_id, max_tokens, prompt], separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def _remember(self, key, value, created):
+        self.memory[key] = (value, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached response for a key, or None on a miss"""
+        now = self.clock()
+        with self._lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self.memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return entry[0]
+                del self.memory[key]
+
+            if self._db is not None:
+                row = self._db.execute('SELECT value, created FROM responses WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+                        self._db.commit()
+                        self._remember(key, row[0], row[1])
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return row[0]
+                    self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """Store a response under a key, evicting old entries past the size cap"""
+        now = self.clock()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)',
+                (key, value, now, now)
+            )
+            count = self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                self._db.execute(
+                    'DELETE FROM responses WHERE key IN '
+                    '(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)',
+                    (excess,)
+                )
+                self.evictions += excess
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            if self._db is None:
+                return len(self.memory)
+            return self._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def clear(self):
+        """Drop every cached response and reset the counters"""
+        with self._lock:
+            self.memory.clear()
+            self.hits = self.misses = self.memory_hits = self.disk_hits = self.evictions = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM responses')
+                self._db.execute('DELETE FROM counters')
+                self._db.commit()
+
+    def stats(self):
+        """Return hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self)
+        }
+
+    def lifetime_stats(self):
+        """Return hit/miss counters accumulated on disk across runs, including this one"""
+        totals = {'hits': self.hits, 'misses': self.misses}
+        if self._db is not None:
+            with self._lock:
+                for name, value in self._db.execute('SELECT name, value FROM counters'):
+                    totals[name] = totals.get(name, 0) + value
+        lookups = totals['hits'] + totals['misses']
+        totals['hit_rate'] = totals['hits'] / lookups if lookups else 0.0
+        return totals
+
+    def close(self):
+        """Persist this run's counters and close the disk tier"""
+        with self._lock:
+            if self._db is None:
+                return
+            for name, value in (('hits', self.hits), ('misses', self.misses)):
+                self._db.execute(
+                    'INSERT INTO counters (name, value) VALUES (?, ?) '
+                    'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+                    (name, value)
+                )
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+
+def read_cache_stats(path=DEFAULT_CACHE_PATH):
+    """Return lifetime counters from an on-disk cache, or None if there is no cache file"""
+    if not path or not os.path.exists(path):
+        return None
+    cache = ResponseCache(path)
+    try:
+        return cache.lifetime_stats()
+    finally:
+        cache.close()
@@ -0,0 +1,331 @@
+import argparse
+import bisect
+import json
+import math
+import random
+from datetime import datetime
+from statistics import NormalDist
+from resilience_auditor import ResilienceAuditor
+from compliance_validator import ComplianceValidator, duplicate_skus
+from substitute_index import spec_key
+from material_table import MaterialTable
+from inventory_loader import load_materials, DEFAULT_INVENTORY_PATH, LOW_STOCK_DAYS
+
+DEFAULT_MARGIN = 0.01
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SAMPLING_REPORT_PATH = 'sampling_audit_report.json'
+
+_MIXED_SUPPLIERS = object()
+
+
+def z_score(confidence):
+    """Two-sided normal critical value for a confidence level"""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def sample_size(margin, confidence=DEFAULT_CONFIDENCE, population=None):
+    """Sample size whose confidence interval half-width is at most margin for any rate.
+
+    Uses the worst case p = 0.5, with the finite population correction when
+    sampling without replacement from population items.
+    """
+    if not 0 < margin < 1:
+        raise ValueError('margin must be between 0 and 1')
+    size = math.ceil(z_score(confidence) ** 2 * 0.25 / margin ** 2)
+    if population is not None:
+        size = min(population, math.ceil(size / (1 + (size - 1) / population))) if population else 0
+    return size
+
+
+def wilson_interval(violations, sampled, confidence=DEFAULT_CONFIDENCE, population=None):
+    """Wilson score interval for a rate, corrected for sampling without replacement from population"""
+    if not sampled:
+        return 0.0, 1.0
+    rate = violations / sampled
+    if population is not None and sampled >= population:
+        return rate, rate
+    # The finite population correction shrinks the variance, i.e. acts as a larger sample
+    n = sampled if population is None else sampled * (population - 1) / (population - sampled)
+    z = z_score(confidence)
+    denominator = 1 + z * z / n
+    centre = (rate + z * z / (2 * n)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def stratified_interval(strata, confidence=DEFAULT_CONFIDENCE):
+    """Combine (weight, violations, sampled, population) strata into (rate, low, high).
+
+    Each stratum's variance uses the Agresti-Coull adjusted rate, so strata
+    with no observed violations (or no samples) still contribute their
+    uncertainty instead of collapsing the interval. The finite population
+    correction then shrinks it, down to nothing for a stratum checked in full.
+    """
+    z2 = z_score(confidence) ** 2
+    rate = variance = 0.0
+    for weight, violations, sampled, population in strata:
+        if not weight:
+            continue
+        if sampled:
+            rate += weight * violations / sampled
+        adjusted = (violations + z2 / 2) / (sampled + z2)
+        correction = (population - sampled) / (population - 1) if population > 1 else 0.0
+        variance += weight * weight * adjusted * (1 - adjusted) / (sampled + z2) * correction
+    half_width = math.sqrt(z2 * variance)
+    return rate, max(0.0, rate - half_width), min(1.0, rate + half_width)
+
+
+def estimate(violations, sampled, population, confidence=DEFAULT_CONFIDENCE, finite=True):
+    """Estimated violation rate of one check, with its confidence interval"""
+    low, high = wilson_interval(violations, sampled, confidence, population if finite else None)
+    rate = violations / sampled if sampled else 0.0
+    return {
+        'rate': rate,
+        'ci_low': low,
+        'ci_high': high,
+        'violations': violations,
+        'sampled': sampled,
+        'population': population,
+        'estimated_violations': round(rate * population)
+    }
+
+
+class SamplingAuditor:
+    """Statistical audit over a seeded sample of items and item pairs.
+
+    Per-item checks run on a uniform sample sized so every estimated
+    violation rate is within margin at the given confidence. Spec matching
+    samples pairs stratified into same-spec and cross-spec pairs, each
+    sampled uniformly without replacement and sized to the margin on its
+    own; a stratum with no more pairs than that is checked in full.
+    Decision checks use uniformly random pairs instead of the first items
+    of the catalog.
+    Catalog-wide counts that are cheap to compute exactly (stock levels,
+    duplicate SKUs, spec group sizes) stay exact.
+    """
+
+    def __init__(self, margin=DEFAULT_MARGIN, confidence=DEFAULT_CONFIDENCE, seed=0,
+                 resilience_auditor=None, compliance_validator=None):
+        self.margin = margin
+        self.confidence = confidence
+        self.seed = seed
+        self.resilience_auditor = resilience_auditor or ResilienceAuditor()
+        self.compliance_validator = compliance_validator or ComplianceValidator()
+
+    def size_for(self, population=None):
+        return sample_size(self.margin, self.confidence, population)
+
+    def pair_indexes(self, population, rng):
+        """Indexes of the pairs to check in a stratum of population pairs.
+
+        Every pair when there are no more than one sample's worth, otherwise a
+        uniform sample without replacement, sized with the finite population correction.
+        """
+        if population <= self.size_for():
+            return range(population)
+        return sorted(rng.sample(range(population), self.size_for(population)))
+
+    def sample_within_pairs(self, groups, rng):
+        """Distinct pairs of items sharing a spec group, sampled uniformly"""
+        cumulative = []
+        total = 0
+        for positions in groups:
+            total += len(positions) * (len(positions) - 1) // 2
+            cumulative.append(total)
+        pairs = []
+        # Pair indexes run through each group's (a, b) pairs in turn, ordered by b within a group
+        for index in self.pair_indexes(total, rng):
+            g = bisect.bisect_right(cumulative, index)
+            index -= cumulative[g - 1] if g else 0
+            b = (1 + math.isqrt(1 + 8 * index)) // 2
+            pairs.append((groups[g][index - b * (b - 1) // 2], groups[g][b]))
+        return pairs
+
+    def sample_cross_pairs(self, groups, count, rng):
+        """Distinct pairs of items from different spec groups, sampled uniformly"""
+        order = [position for positions in groups for position in positions]
+        starts = []
+        cumulative = []
+        start = total = 0
+        for positions in groups:
+            starts.append(start)
+            start += len(positions)
+            # Each member pairs with the items of the groups after its own, so every cross pair is counted once
+            total += len(positions) * (count - start)
+            cumulative.append(total)
+        pairs = []
+        for index in self.pair_indexes(total, rng):
+            g = bisect.bisect_right(cumulative, index)
+            index -= cumulative[g - 1] if g else 0
+            later = starts[g] + len(groups[g])
+            member, other = divmod(index, count - later)
+            pairs.append((order[starts[g] + member], order[later + other]))
+        return pairs
+
+    def audit_spec_matching(self, materials, groups, rng):
+        """Stratified estimate of the spec matching error rate"""
+        n = len(materials)
+        total_tests = n * (n - 1) // 2
+        expected_matches = sum(len(g) * (len(g) - 1) // 2 for g in groups)
+        expected_rejects = total_tests - expected_matches
+        check_spec_pair = self.resilience_auditor.check_spec_pair
+
+        strata = []
+        sampled_pairs = 0
+        for population, pairs in ((expected_matches, self.sample_within_pairs(groups, rng)),
+                                  (expected_rejects, self.sample_cross_pairs(groups, n, rng))):
+            errors = sum(not check_spec_pair(materials[a], materials[b]) for a, b in pairs)
+            strata.append((population / total_tests if total_tests else 0, errors, len(pairs), population))
+            sampled_pairs += len(pairs)
+
+        rate, low, high = stratified_interval(strata, self.confidence)
+        spec_matching = {
+            'accuracy': 1 - rate if total_tests else 0,
+            'total_tests': total_tests,
+            'correct': round((1 - rate) * total_tests),
+            'mode': 'sampled',
+            'spec_groups': len(groups),
+            'expected_matches': expected_matches,
+            'expected_rejects': expected_rejects,
+            'sampled_pairs': sampled_pairs,
+            'confidence_interval': [1 - high, 1 - low]
+        }
+        return spec_matching, {
+            'rate': rate,
+            'ci_low': low,
+            'ci_high': high,
+            'violations': sum(errors for weight, errors, sampled, population in strata),
+            'sampled': sampled_pairs,
+            'population': total_tests,
+            'estimated_violations': round(rate * total_tests)
+        }
+
+    def generate_sampling_report(self, materials):
+        """Audit a sample of the catalog, returning resilience and compliance reports with estimates"""
+        if isinstance(materials, MaterialTable):
+            materials = materials.to_records()
+        n = len(materials)
+        rng = random.Random(self.seed)
+        resilience = self.resilience_auditor
+        compliance = self.compliance_validator
+
+        # One pass for spec group sizes and whether each group has more than one supplier
+        groups = {}
+        group_supplier = {}
+        for position, item in enumerate(materials):
+            key = spec_key(item['TechnicalSpecs'])
+            groups.setdefault(key, []).append(position)
+            if group_supplier.setdefault(key, item['SupplierName']) != item['SupplierName']:
+                group_supplier[key] = _MIXED_SUPPLIERS
+
+        # Per-item checks on one uniform sample without replacement
+        sample = [materials[i] for i in sorted(rng.sample(range(n), self.size_for(n)))]
+        integrity_items = rule_items = warning_items = price_items = 0
+        rule_violations = []
+        price_violations = []
+        for item in sample:
+            violations = compliance.item_integrity_violations(item)
+            compliance.violations.extend(violations)
+            integrity_items += bool(violations)
+            violations, warnings = compliance.item_rule_findings(item)
+            rule_violations.extend(violations)
+            compliance.warnings.extend(warnings)
+            rule_items += bool(violations)
+            warning_items += bool(warnings)
+            violations = resilience.item_price_violations(item)
+            price_violations.extend(violations)
+            price_items += bool(violations)
+        for sku in duplicate_skus(item['SKU'] for item in materials if 'SKU' in item):
+            compliance.violations.append({'type': 'duplicate_sku', 'sku': sku})
+        compliance.violations.extend(rule_violations)
+
+        # Decision checks on uniformly random pairs
+        decision_pairs = [rng.sample(range(n), 2) for _ in range(self.size_for())] if n > 1 else []
+        decision_errors = 0
+        for a, b in decision_pairs:
+            violation = compliance.pair_decision_violation(materials[a], materials[b])
+            if violation is not None:
+                compliance.violations.append(violation)
+                decision_errors += 1
+        compliance.validate_audit_trail()
+
+        # Substitute coverage on a uniform sample of the low-stock items
+        low_stock = [i for i, item in enumerate(materials) if item['DaysOnHand'] < LOW_STOCK_DAYS]
+        # An item has a substitute exactly when its spec group has another supplier (SubstituteIndex.has_substitute)
+        uncovered = [materials[i]['SKU'] for i in sorted(rng.sample(low_stock, self.size_for(len(low_stock))))
+                     if group_supplier[spec_key(materials[i]['TechnicalSpecs'])] is not _MIXED_SUPPLIERS]
+        missing = estimate(len(uncovered), self.size_for(len(low_stock)), len(low_stock), self.confidence)
+
+        spec_matching, spec_estimate = self.audit_spec_matching(materials, list(groups.values()), rng)
+        total_pairs = n * (n - 1) // 2
+        estimates = {
+            'spec_matching_errors': spec_estimate,
+            'price_threshold': estimate(price_items, len(sample), n, self.confidence),
+            'missing_substitutes': missing,
+            'data_integrity': estimate(integrity_items, len(sample), n, self.confidence),
+            'business_rules': estimate(rule_items, len(sample), n, self.confidence),
+            'lead_time_warnings': estimate(warning_items, len(sample), n, self.confidence),
+            'decision_logic': estimate(decision_errors, len(decision_pairs), total_pairs, self.confidence,
+                                       finite=False)
+        }
+
+        resilience_report = resilience.score_resilience_report({
+            'timestamp': datetime.now().isoformat(),
+            'spec_matching': spec_matching,
+            'price_compliance': price_violations,
+            'stock_analysis': resilience.test_low_stock_detection(materials),
+            'substitute_analysis': {
+                'substitutes_found': len(low_stock) - missing['estimated_violations'],
+                'items_without_substitutes': uncovered,
+                'substitute_coverage': (1 - missing['rate']) * 100 if low_stock else 100,
+                'confidence_interval': [(1 - missing['ci_high']) * 100, (1 - missing['ci_low']) * 100],
+                'sampled': missing['sampled']
+            },
+            'compliance_violations': resilience.compliance_violations,
+            'estimates': {name: estimates[name] for name in
+                          ('spec_matching_errors', 'price_threshold', 'missing_substitutes')}
+        })
+        compliance_report = compliance.build_compliance_report()
+        compliance_report['estimates'] = {name: estimates[name] for name in
+                                          ('data_integrity', 'business_rules', 'lead_time_warnings', 'decision_logic')}
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'sampling': {
+                'margin': self.margin,
+                'confidence': self.confidence,
+                'seed': self.seed,
+                'total_items': n,
+                'sampled_items': len(sample)
+            },
+            'estimates': estimates,
+            'resilience': resilience_report,
+            'compliance': compliance_report
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Statistical audit of a catalog sample with confidence intervals')
+    parser.add_argument('--materials', default=DEFAULT_INVENTORY_PATH, help='Catalog as a JSON array or NDJSON')
+    parser.add_argument('--margin', type=float, default=DEFAULT_MARGIN,
+                        help='Largest acceptable confidence interval half-width for each rate')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE, help='Confidence level')
+    parser.add_argument('--seed', type=int, default=0, help='Sampling seed; the same seed gives the same sample')
+    parser.add_argument('--output', default=DEFAULT_SAMPLING_REPORT_PATH)
+    args = parser.parse_args()
+
+    auditor = SamplingAuditor(args.margin, args.confidence, args.seed)
+    report = auditor.generate_sampling_report(load_materials(args.materials))
+
+    sampling = report['sampling']
+    print("=== STATISTICAL PROCUREMENT AUDIT ===")
+    print(f"Sampled {sampling['sampled_items']:,} of {sampling['total_items']:,} items "
+          f"(margin ±{args.margin:.1%} at {args.confidence:.0%} confidence, seed {args.seed})")
+    print()
+    for name, result in report['estimates'].items():
+        print(f"  {name:<22} {result['rate']:8.3%}  [{result['ci_low']:.3%}, {result['ci_high']:.3%}]"
+              f"  ~{result['estimated_violations']:,} of {result['population']:,}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nDetailed report saved to {args.output}")
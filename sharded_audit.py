@@ -0,0 +1,287 @@
+import gc
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from substitute_index import SubstituteIndex, spec_key
+from material_table import MaterialTable
+from inventory_loader import LOW_STOCK_DAYS, CRITICAL_STOCK_DAYS
+from compliance_validator import DECISION_SAMPLE_SIZE
+
+_ABSENT = object()
+
+# Catalog published by the parent before forking; workers inherit it copy-on-write
+_materials = None
+
+
+def shard_of(key, shards):
+    """Shard number for a key. Forked workers share the parent's hash seed, so this agrees across
+    one run's processes; string hashes are cached, which makes it nearly free for SKUs."""
+    return hash(key) % shards
+
+
+def _map_block(start, stop, shards):
+    """Map step: shard numbers by SKU and by spec group for positions start..stop"""
+    sku_shards = []
+    group_shards = []
+    # spec key -> shard, so each item costs one key lookup
+    group_shard = {}
+    for item in _materials[start:stop]:
+        key = spec_key(item['TechnicalSpecs'])
+        shard = group_shard.get(key)
+        if shard is None:
+            shard = group_shard[key] = shard_of(key, shards)
+        group_shards.append(shard)
+        sku_shards.append(shard_of(item.get('SKU'), shards))
+    return np.array(sku_shards, dtype=np.uint16), np.array(group_shards, dtype=np.uint16)
+
+
+def _audit_shard(resilience_auditor, compliance_validator, sku_positions, group_positions, rows):
+    """Reduce step for one shard: per-SKU checks, per-spec-group checks and, when exhaustive, its pair rows.
+
+    Every finding is returned with its catalog position (or pair) so the
+    parent can merge shards back into catalog order.
+    """
+    materials = _materials
+    item_price_violations = resilience_auditor.item_price_violations
+    item_findings = compliance_validator.item_findings
+
+    partial = {'price': [], 'low_stock': 0, 'critical': [], 'integrity': [], 'rule_violations': [],
+               'warnings': [], 'duplicates': [], 'substitutes_found': 0, 'without_substitutes': [],
+               'pair_correct': [0, 0], 'pair_violations': []}
+
+    # Per-SKU checks: every copy of a SKU hashes to this shard, so duplicates are complete
+    seen = set()
+    duplicates = set()
+    for position in sku_positions.tolist():
+        item = materials[position]
+        violations = item_price_violations(item)
+        if violations:
+            partial['price'].append((position, violations))
+        if item['DaysOnHand'] < LOW_STOCK_DAYS:
+            partial['low_stock'] += 1
+        if item['DaysOnHand'] <= CRITICAL_STOCK_DAYS:
+            partial['critical'].append(position)
+        integrity, rule_violations, warnings = item_findings(item)
+        if integrity:
+            partial['integrity'].append((position, integrity))
+        if rule_violations:
+            partial['rule_violations'].append((position, rule_violations))
+        if warnings:
+            partial['warnings'].append((position, warnings))
+        sku = item.get('SKU', _ABSENT)
+        if sku is not _ABSENT:
+            if sku not in seen:
+                seen.add(sku)
+            elif sku not in duplicates:
+                duplicates.add(sku)
+                partial['duplicates'].append((position, sku))
+
+    # Per-spec-group checks: whole spec groups live in one shard, so the shard's own index finds
+    # exactly the substitutes a catalog-wide index would, and its groups are complete
+    group_positions = group_positions.tolist()
+    group_items = [materials[position] for position in group_positions]
+    keys = [spec_key(item['TechnicalSpecs']) for item in group_items]
+    index = SubstituteIndex(group_items, keys)
+    groups = {}
+    for position, item, key in zip(group_positions, group_items, keys):
+        groups.setdefault(key, []).append(position)
+        if item['DaysOnHand'] < LOW_STOCK_DAYS:
+            if index.has_substitute(item):
+                partial['substitutes_found'] += 1
+            else:
+                partial['without_substitutes'].append(position)
+    # Single-item groups hold no within-group pairs, so only their number goes back to the parent
+    partial['groups'] = [positions for positions in groups.values() if len(positions) > 1]
+    partial['group_count'] = len(groups)
+
+    # Exhaustive spec matching: every pair (i, j > i) for this shard's rows
+    spec_pair_violation = resilience_auditor.spec_pair_violation
+    n = len(materials)
+    for i in rows.tolist():
+        item1 = materials[i]
+        for j in range(i + 1, n):
+            violation = spec_pair_violation(item1, materials[j])
+            if violation is None:
+                partial['pair_correct'][0] += 1
+            else:
+                partial['pair_violations'].append(((i, j), violation))
+    return partial
+
+
+def _check_pairs(resilience_auditor, pairs):
+    """Grouped spec matching for planned pairs (order, stratum, a, b), stratum 0 within groups, 1 across"""
+    materials = _materials
+    spec_pair_violation = resilience_auditor.spec_pair_violation
+    partial = {'pair_correct': [0, 0], 'pair_violations': []}
+    for order, stratum, a, b in pairs:
+        violation = spec_pair_violation(materials[a], materials[b])
+        if violation is None:
+            partial['pair_correct'][stratum] += 1
+        else:
+            partial['pair_violations'].append((order, violation))
+    return partial
+
+
+def _merged(partials, name):
+    """Concatenate one kind of (position, findings) across shards, back in catalog order"""
+    return sorted((entry for partial in partials for entry in partial[name]), key=lambda entry: entry[0])
+
+
+class ShardedAuditor:
+    """Map-reduce resilience and compliance audit over worker processes.
+
+    The map step assigns every catalog position to a shard by SKU hash and
+    to a shard by spec-group hash. Each reduce job runs the per-SKU checks
+    (price threshold, stock levels, data integrity, business rules,
+    duplicate SKUs) for its SKU shard and the per-group checks (substitute
+    availability, spec groups, exhaustive pair rows) for its spec-group
+    shard, so no duplicate or group spans two shards. In grouped mode the
+    parent then plans the sampled pairs exactly as ResilienceAuditor does
+    and the workers check them. Findings carry their catalog position and
+    are merged back in order, giving exactly the reports of a single
+    process run.
+    """
+
+    def __init__(self, resilience_auditor, compliance_validator, shards=None, workers=None):
+        self.resilience_auditor = resilience_auditor
+        self.compliance_validator = compliance_validator
+        self.workers = workers or os.cpu_count() or 1
+        self.shards = shards or self.workers
+        self.last_run = None
+
+    def run(self, materials):
+        """Audit the catalog, returning (resilience report, compliance report)"""
+        global _materials
+
+        if isinstance(materials, MaterialTable):
+            materials = materials.to_records()
+        n = len(materials)
+        grouped = self.resilience_auditor.spec_matching_mode == 'grouped'
+        if self.resilience_auditor.spec_matching_mode not in ('grouped', 'exhaustive'):
+            raise ValueError(f"Unknown spec matching mode: {self.resilience_auditor.spec_matching_mode}")
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError('Sharded audits need the fork start method to share the catalog with workers')
+
+        _materials = materials
+        # Frozen objects are left alone by the collector, so forked workers do not copy the catalog's
+        # pages just by running a collection. The workers themselves only build acyclic partial
+        # results and exit, so they run without the cyclic collector, which otherwise rescans the
+        # catalog-sized heap again and again.
+        gc.freeze()
+        timings = {}
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('fork'),
+                                     initializer=gc.disable) as pool:
+                # Map: contiguous blocks, one per worker
+                start = time.perf_counter()
+                bounds = [n * k // self.workers for k in range(self.workers + 1)]
+                mapped = list(pool.map(_map_block, bounds[:-1], bounds[1:], [self.shards] * self.workers))
+                sku_shards = np.concatenate([m[0] for m in mapped]) if n else np.empty(0, dtype=np.uint16)
+                group_shards = np.concatenate([m[1] for m in mapped]) if n else np.empty(0, dtype=np.uint16)
+                del mapped
+                timings['map_seconds'] = time.perf_counter() - start
+
+                # Reduce: one job per shard
+                start = time.perf_counter()
+                no_rows = np.empty(0, dtype=np.int64)
+                futures = []
+                for shard in range(self.shards):
+                    group_positions = np.flatnonzero(group_shards == shard)
+                    futures.append(pool.submit(_audit_shard, self.resilience_auditor, self.compliance_validator,
+                                               np.flatnonzero(sku_shards == shard), group_positions,
+                                               no_rows if grouped else group_positions))
+                partials = [future.result() for future in futures]
+                timings['reduce_seconds'] = time.perf_counter() - start
+
+                # Grouped spec matching: the sample is planned in one place, over the groups in order of
+                # first appearance, so it is the one a single process draws; each planned pair is then
+                # checked on the shard of its first item's spec group
+                pair_partials = partials
+                plan = None
+                if grouped:
+                    start = time.perf_counter()
+                    groups = sorted((positions for p in partials for positions in p['groups']),
+                                    key=lambda positions: positions[0])
+                    plan = self.resilience_auditor.plan_grouped_pairs(
+                        materials, groups, sum(p['group_count'] for p in partials))
+                    del groups
+                    pairs = [[] for _ in range(self.shards)]
+                    order = 0
+                    for stratum, planned in enumerate((plan['within_pairs'], plan['cross_pairs'])):
+                        for a, b in planned:
+                            pairs[group_shards[a]].append((order, stratum, a, b))
+                            order += 1
+                    futures = [pool.submit(_check_pairs, self.resilience_auditor, shard_pairs)
+                               for shard_pairs in pairs if shard_pairs]
+                    pair_partials = [future.result() for future in futures]
+                    timings['pairs_seconds'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            reports = (self.resilience_report(materials, partials, pair_partials, plan),
+                       self.compliance_report(materials, partials))
+            timings['merge_seconds'] = time.perf_counter() - start
+        finally:
+            _materials = None
+            gc.unfreeze()
+
+        self.last_run = dict({'shards': self.shards, 'workers': self.workers, 'items': n},
+                             **{name: round(seconds, 4) for name, seconds in timings.items()})
+        return reports
+
+    def resilience_report(self, materials, partials, pair_partials, plan):
+        """Merge the shards' partial results into the ResilienceAuditor report"""
+        auditor = self.resilience_auditor
+        n = len(materials)
+        violations = [violation for order, violation in _merged(pair_partials, 'pair_violations')]
+        auditor.compliance_violations.extend(violations)
+        if plan is not None:
+            spec_matching = auditor.grouped_spec_result(plan, sum(p['pair_correct'][0] for p in pair_partials),
+                                                        sum(p['pair_correct'][1] for p in pair_partials))
+        else:
+            total_tests = n * (n - 1) // 2
+            correct = sum(p['pair_correct'][0] for p in pair_partials)
+            spec_matching = {'accuracy': correct / total_tests if total_tests > 0 else 0,
+                             'total_tests': total_tests, 'correct': correct}
+
+        low_stock_count = sum(p['low_stock'] for p in partials)
+        critical = sorted(position for p in partials for position in p['critical'])
+        substitutes_found = sum(p['substitutes_found'] for p in partials)
+        without = sorted(position for p in partials for position in p['without_substitutes'])
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'spec_matching': spec_matching,
+            'price_compliance': [v for position, found in _merged(partials, 'price') for v in found],
+            'stock_analysis': {
+                'total_items': n,
+                'low_stock_count': low_stock_count,
+                'critical_stock_count': len(critical),
+                'low_stock_percentage': low_stock_count / n * 100,
+                'critical_items': [materials[position]['SKU'] for position in critical]
+            },
+            'substitute_analysis': {
+                'substitutes_found': substitutes_found,
+                'items_without_substitutes': [materials[position]['SKU'] for position in without],
+                'substitute_coverage': substitutes_found / low_stock_count * 100 if low_stock_count else 100
+            },
+            'compliance_violations': auditor.compliance_violations
+        }
+        return auditor.score_resilience_report(report)
+
+    def compliance_report(self, materials, partials):
+        """Merge the shards' partial results into the ComplianceValidator report"""
+        validator = self.compliance_validator
+        # Same order as a single pass: integrity, duplicates, business rules, decisions, audit trail
+        validator.violations.extend(v for position, found in _merged(partials, 'integrity') for v in found)
+        for position, sku in _merged(partials, 'duplicates'):
+            validator.violations.append({
+                'type': 'duplicate_sku',
+                'sku': sku
+            })
+        validator.violations.extend(v for position, found in _merged(partials, 'rule_violations') for v in found)
+        validator.warnings.extend(w for position, found in _merged(partials, 'warnings') for w in found)
+        validator.validate_procurement_decisions(materials[:DECISION_SAMPLE_SIZE])
+        validator.validate_audit_trail()
+        return validator.build_compliance_report()
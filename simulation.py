@@ -1,47 +1,76 @@
+import argparse
 import json
-from ask_claude import ask_claude
-
-# Load JSON data
-with open('raw_materials.json', 'r') as f:
-    materials = json.load(f)
-
-# Create scenario: Set one of the interchangeable items to low stock
-for item in materials:
-    if item['SKU'] == 'SKU-5895-agS':  # 6061-T6 aluminum
-        item['DaysOnHand'] = 3
-        break
-
-# Find item with DaysOnHand < 5 that has a substitute
-low_stock_item = None
-for item in materials:
-    if item['DaysOnHand'] < 5:
-        # Check if substitute exists
-        substitute = next((other for other in materials 
-                          if other['TechnicalSpecs'] == item['TechnicalSpecs'] 
-                          and other['SupplierName'] != item['SupplierName']), None)
-        if substitute:
-            low_stock_item = item
-            break
+import sys
+from datetime import datetime
+from ask_claude import ask_claude, set_response_cache
+from response_cache import ResponseCache
+from substitute_index import SubstituteIndex
+from inventory_loader import load_materials, iter_chunks, DEFAULT_INVENTORY_PATH, LOW_STOCK_DAYS
+
+# numpy and MaterialTable are imported inside the forecasting functions so the email scenario starts fast
+
+# Stockout forecast defaults; DaysOnHand is stock in days of average consumption
+FORECAST_HORIZON_DAYS = 30
+FORECAST_TRIALS = 10_000
+DEMAND_CV = 0.3
+LEAD_TIME_CV = 0.25
+# SKU-trials simulated at once: two float32 buffers of this size, about 16 MiB
+FORECAST_CHUNK_ELEMENTS = 1 << 21
+HIGH_RISK_PROBABILITY = 0.5
+DEFAULT_FORECAST_REPORT_PATH = 'stockout_forecast.json'
+
+
+def is_material_table(materials):
+    """Check for a MaterialTable without importing material_table (and numpy) when no table can exist"""
+    module = sys.modules.get('material_table')
+    return module is not None and isinstance(materials, module.MaterialTable)
+
 
-if not low_stock_item:
-    print("No items found with DaysOnHand < 5")
-    exit()
+def set_days_on_hand(materials, sku, days):
+    """Set DaysOnHand for a SKU in a material list or MaterialTable"""
+    if is_material_table(materials):
+        return materials.set_days_on_hand(sku, days)
+    for item in materials:
+        if item['SKU'] == sku:
+            item['DaysOnHand'] = days
+            return True
+    return False
 
-print(f"Low stock item found: {low_stock_item['SKU']} ({low_stock_item['DaysOnHand']} days)")
 
-# Search for substitute (same specs, different supplier)
-substitute = next((item for item in materials 
-                  if item['TechnicalSpecs'] == low_stock_item['TechnicalSpecs'] 
-                  and item['SupplierName'] != low_stock_item['SupplierName']), None)
+def iter_low_stock(materials, threshold=LOW_STOCK_DAYS):
+    """Yield low-stock items, using a vectorized scan for a MaterialTable and the low-stock index for an InventoryRepository"""
+    if hasattr(materials, 'query_low_stock'):
+        yield from materials.query_low_stock(threshold)
+    elif is_material_table(materials):
+        for i in materials.low_stock_mask(threshold).nonzero()[0].tolist():
+            yield materials.record(i)
+    else:
+        for item in materials:
+            if item['DaysOnHand'] < threshold:
+                yield item
 
-if not substitute:
-    print("No substitute found with matching specs")
-    exit()
 
-print(f"Substitute found: {substitute['SKU']} from {substitute['SupplierName']}")
+def build_substitute_index(materials):
+    """Index a material list, MaterialTable or InventoryRepository (scanned once) by technical specs"""
+    if hasattr(materials, 'query_low_stock'):
+        materials = materials.scan()
+    return SubstituteIndex(materials)
 
-# Generate email using Claude
-prompt = f"""Write a short professional email to the R&D department proposing a supplier switch. 
+
+def find_low_stock_with_substitute(materials, substitute_index=None):
+    """Return the first low-stock item that has a substitute, and that substitute"""
+    if substitute_index is None:
+        substitute_index = build_substitute_index(materials)
+    for item in iter_low_stock(materials):
+        substitute = substitute_index.find_substitute(item)
+        if substitute:
+            return item, substitute
+    return None, None
+
+
+def build_switch_prompt(low_stock_item, substitute):
+    """Build the supplier switch email prompt for Claude"""
+    return f"""Write a short professional email to the R&D department proposing a supplier switch.
 
 Current item: {low_stock_item['SKU']} from {low_stock_item['SupplierName']} at ${low_stock_item['Price']} (only {low_stock_item['DaysOnHand']} days remaining)
 
@@ -51,12 +80,241 @@ Both items have identical technical specifications: {low_stock_item['TechnicalSp
 
 Focus on the price difference and supply continuity. Keep it under 150 words."""
 
-email = ask_claude(prompt)
-print("\nGenerated Email:")
-print("=" * 50)
-print(email)
 
-# Store the email
-with open('supplier_switch_email.txt', 'w') as f:
-    f.write(email)
-print("\nEmail saved to supplier_switch_email.txt")
\ No newline at end of file
+def simulate_stockouts(days_on_hand, lead_time, horizon=FORECAST_HORIZON_DAYS, trials=FORECAST_TRIALS,
+                       demand_cv=DEMAND_CV, lead_time_cv=LEAD_TIME_CV, seed=0,
+                       chunk_elements=FORECAST_CHUNK_ELEMENTS):
+    """Monte Carlo probability that each item runs out of stock within the horizon.
+
+    Every trial reorders today. The delivery arrives after a lognormal lead
+    time with mean LeadTime, and until then (or until the horizon) the item
+    consumes a day of stock per day on average, with coefficient of variation
+    demand_cv per day. A trial is a stockout when that consumption exceeds
+    DaysOnHand. Items are simulated a chunk at a time, so memory is bounded
+    by chunk_elements whatever the catalog size; lead times and demand come
+    from separate streams in item order, so the chunk size does not change
+    the result.
+    """
+    import numpy as np
+    stock = np.asarray(days_on_hand, dtype=np.float32)
+    lead_time = np.asarray(lead_time, dtype=np.float64)
+    n = len(stock)
+
+    # Lognormal lead time with mean LeadTime; a lead time of zero or less means delivery is immediate
+    sigma = np.sqrt(np.log1p(lead_time_cv ** 2))
+    mu = np.log(np.maximum(lead_time, 1e-9)) - sigma ** 2 / 2
+    # Consumption over the exposure T = min(lead time, horizon) is T + cv*sqrt(T)*z, i.e. u*(cv*z + u)
+    # for u = sqrt(T) = min(exp((mu + sigma*z')/2), sqrt(horizon)), so only u is ever materialized
+    half_mu = (mu / 2).astype(np.float32)[:, None]
+    half_sigma = np.float32(sigma / 2)
+    root_horizon = np.float32(np.sqrt(horizon))
+    lead_rng, demand_rng = (np.random.default_rng(stream) for stream in np.random.SeedSequence(seed).spawn(2))
+
+    rows = max(1, min(n, chunk_elements // trials))
+    exposure = np.empty((rows, trials), dtype=np.float32)
+    consumption = np.empty((rows, trials), dtype=np.float32)
+    stockouts = np.empty(n, dtype=np.int64)
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        u = exposure[:stop - start]
+        lead_rng.standard_normal(out=u, dtype=np.float32)
+        u *= half_sigma
+        u += half_mu[start:stop]
+        np.exp(u, out=u)
+        np.minimum(u, root_horizon, out=u)
+        used = consumption[:stop - start]
+        demand_rng.standard_normal(out=used, dtype=np.float32)
+        used *= np.float32(demand_cv)
+        used += u
+        used *= u
+        stockouts[start:stop] = np.count_nonzero(used > stock[start:stop, None], axis=1)
+
+    probability = stockouts / trials
+    # Items with no stock left are out already
+    probability[stock <= 0] = 1.0
+    return probability
+
+
+def best_substitutes(spec_group, supplier_codes, risk):
+    """Position of each item's lowest-risk substitute (same spec group, other supplier), or -1 if it has none.
+
+    Ties go to the earliest position.
+    """
+    import numpy as np
+    spec_group = np.asarray(spec_group)
+    supplier_codes = np.asarray(supplier_codes)
+    risk = np.asarray(risk)
+    n = len(risk)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    positions = np.arange(n)
+
+    # The lowest-risk item of every (spec group, supplier)
+    order = np.lexsort((positions, risk, supplier_codes, spec_group))
+    first = np.ones(n, dtype=bool)
+    first[1:] = ((spec_group[order][1:] != spec_group[order][:-1])
+                 | (supplier_codes[order][1:] != supplier_codes[order][:-1]))
+    candidates = order[first]
+
+    # Per spec group, the best and runner-up of those; the runner-up is from another supplier by construction
+    candidates = candidates[np.lexsort((candidates, risk[candidates], spec_group[candidates]))]
+    groups = spec_group[candidates]
+    heads = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    best = np.full(spec_group.max() + 1, -1)
+    runner_up = np.full(spec_group.max() + 1, -1)
+    best[groups[heads]] = candidates[heads]
+    heads = heads[heads + 1 < len(candidates)]
+    heads = heads[groups[heads + 1] == groups[heads]]
+    runner_up[groups[heads]] = candidates[heads + 1]
+
+    substitutes = best[spec_group]
+    own_supplier = supplier_codes[substitutes] == supplier_codes
+    substitutes[own_supplier] = runner_up[spec_group[own_supplier]]
+    return substitutes
+
+
+def forecast_stockouts(materials, horizon=FORECAST_HORIZON_DAYS, trials=FORECAST_TRIALS, demand_cv=DEMAND_CV,
+                       lead_time_cv=LEAD_TIME_CV, seed=0, chunk_elements=FORECAST_CHUNK_ELEMENTS):
+    """Forecast each item's stockout probability and whether switching to a substitute lowers it.
+
+    Switching means sourcing from the lowest-risk item with identical specs
+    from another supplier, whose own stock and lead time are simulated
+    alongside.
+    """
+    import numpy as np
+    from material_table import MaterialTable
+    table = MaterialTable.from_records(materials)
+
+    probability = simulate_stockouts(table.days_on_hand, table.lead_time, horizon, trials, demand_cv,
+                                     lead_time_cv, seed, chunk_elements)
+    substitutes = best_substitutes(table.spec_group, table.supplier_codes, probability)
+    has_substitute = substitutes >= 0
+    substitute_probability = np.where(has_substitute, probability[substitutes], np.nan)
+    lowers_risk = has_substitute & (substitute_probability < probability)
+
+    skus = table.skus.tolist()
+    items = [{
+        'sku': sku,
+        'days_on_hand': days,
+        'lead_time': lead,
+        'stockout_probability': p,
+        'substitute_sku': skus[substitute] if substitute >= 0 else None,
+        'substitute_stockout_probability': p_substitute if substitute >= 0 else None,
+        'switch_lowers_risk': lowers
+    } for sku, days, lead, p, substitute, p_substitute, lowers in zip(
+        skus, table.days_on_hand.tolist(), table.lead_time.tolist(), probability.tolist(),
+        substitutes.tolist(), substitute_probability.tolist(), lowers_risk.tolist())]
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'parameters': {
+            'horizon_days': horizon,
+            'trials': trials,
+            'demand_cv': demand_cv,
+            'lead_time_cv': lead_time_cv,
+            'seed': seed
+        },
+        'summary': {
+            'total_items': len(items),
+            'expected_stockouts': float(probability.sum()),
+            'high_risk_items': int(np.count_nonzero(probability >= HIGH_RISK_PROBABILITY)),
+            'items_with_substitutes': int(np.count_nonzero(has_substitute)),
+            'switches_lowering_risk': int(np.count_nonzero(lowers_risk))
+        },
+        'items': items
+    }
+
+
+def print_forecast(report, top=10):
+    """Print the forecast summary and the riskiest items"""
+    summary = report['summary']
+    parameters = report['parameters']
+    print("=== STOCKOUT FORECAST ===")
+    print(f"{summary['total_items']:,} items, {parameters['trials']:,} trials over {parameters['horizon_days']} days")
+    print(f"Expected stockouts: {summary['expected_stockouts']:,.1f}")
+    print(f"High risk (>= {HIGH_RISK_PROBABILITY:.0%}): {summary['high_risk_items']:,} items")
+    print(f"Switching to a substitute lowers the risk for {summary['switches_lowering_risk']:,} items")
+    print(f"\nTop {top} stockout risks:")
+    for item in sorted(report['items'], key=lambda item: -item['stockout_probability'])[:top]:
+        advice = ''
+        if item['switch_lowers_risk']:
+            advice = f" -> {item['substitute_sku']} ({item['substitute_stockout_probability']:.1%})"
+        print(f"  {item['sku']:<16} {item['stockout_probability']:6.1%}  "
+              f"({item['days_on_hand']} days on hand, lead time {item['lead_time']} days){advice}")
+
+
+def run_forecast(args):
+    report = forecast_stockouts(load_materials(args.materials), args.horizon, args.trials, args.demand_cv,
+                                args.lead_time_cv, args.seed)
+    print_forecast(report)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nForecast saved to {args.output}")
+
+
+def run_low_stock_scan(args):
+    # The auditor pulls in numpy through MaterialTable, so it is only imported for this mode
+    from resilience_auditor import ResilienceAuditor, print_stock_analysis
+    stock = ResilienceAuditor().test_low_stock_detection_from_chunks(iter_chunks(args.materials))
+    print("=== LOW STOCK SCAN ===")
+    print(f"{stock['total_items']:,} items streamed, {stock['low_stock_percentage']:.1f}% below {LOW_STOCK_DAYS} days")
+    print_stock_analysis(stock)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Supplier switch simulation and Monte Carlo stockout forecast')
+    parser.add_argument('--forecast', action='store_true',
+                        help='Forecast stockout probabilities for the whole catalog instead of drafting a switch email')
+    parser.add_argument('--low-stock', action='store_true',
+                        help='Report low and critical stock by streaming the catalog in chunks, without loading it')
+    parser.add_argument('--materials', default=DEFAULT_INVENTORY_PATH, help='Catalog as a JSON array or NDJSON')
+    parser.add_argument('--horizon', type=int, default=FORECAST_HORIZON_DAYS, help='Forecast horizon in days')
+    parser.add_argument('--trials', type=int, default=FORECAST_TRIALS, help='Monte Carlo trials per item')
+    parser.add_argument('--demand-cv', type=float, default=DEMAND_CV,
+                        help='Coefficient of variation of daily consumption')
+    parser.add_argument('--lead-time-cv', type=float, default=LEAD_TIME_CV,
+                        help='Coefficient of variation of supplier lead times')
+    parser.add_argument('--seed', type=int, default=0, help='Simulation seed; the same seed gives the same forecast')
+    parser.add_argument('--output', default=DEFAULT_FORECAST_REPORT_PATH)
+    args = parser.parse_args()
+    if args.forecast:
+        run_forecast(args)
+        sys.exit()
+    if args.low_stock:
+        run_low_stock_scan(args)
+        sys.exit()
+
+    # Load JSON or NDJSON data
+    materials = load_materials(args.materials)
+
+    # Create scenario: Set one of the interchangeable items to low stock
+    set_days_on_hand(materials, 'SKU-5895-agS', 3)  # 6061-T6 aluminum
+
+    # Index materials by technical specs once for substitute lookups
+    substitute_index = SubstituteIndex(materials)
+
+    # Find item with DaysOnHand < 5 that has a substitute
+    low_stock_item, substitute = find_low_stock_with_substitute(materials, substitute_index)
+
+    if not low_stock_item:
+        print("No items found with DaysOnHand < 5")
+        exit()
+
+    print(f"Low stock item found: {low_stock_item['SKU']} ({low_stock_item['DaysOnHand']} days)")
+    print(f"Substitute found: {substitute['SKU']} from {substitute['SupplierName']}")
+
+    # Generate email using Claude, reusing cached replies for repeated prompts
+    cache = ResponseCache()
+    set_response_cache(cache)
+    email = ask_claude(build_switch_prompt(low_stock_item, substitute))
+    cache_stats = cache.stats()
+    cache.close()
+    print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+    print("\nGenerated Email:")
+    print("=" * 50)
+    print(email)
+
+    # Store the email
+    with open('supplier_switch_email.txt', 'w') as f:
+        f.write(email)
+    print("\nEmail saved to supplier_switch_email.txt")
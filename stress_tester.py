@@ -1,7 +1,42 @@
 import json
+import os
 import random
 import copy
+import tempfile
+import tracemalloc
+import numpy as np
 from datetime import datetime
+from material_table import MaterialTable
+from inventory_loader import load_materials
+from load_tester import run_load
+from substitute_index import SubstituteIndex
+from resilience_auditor import ResilienceAuditor
+from compliance_validator import ComplianceValidator
+from material import Material, load_compact_materials
+
+def allocation_totals():
+    """Return {(file, line): (bytes, blocks)} for everything tracemalloc currently traces"""
+    return {(stat.traceback[0].filename, stat.traceback[0].lineno): (stat.size, stat.count)
+            for stat in tracemalloc.take_snapshot().statistics('lineno')}
+
+_BOOKKEEPING_LINES = {line for _, _, line in allocation_totals.__code__.co_lines()}
+
+def allocation_sites(after, before, top_n=5):
+    """Return the source lines that allocated the most memory between two allocation_totals() calls"""
+    growth = []
+    for (filename, lineno), (size, count) in after.items():
+        # Skip the profiler's own bookkeeping
+        if filename == tracemalloc.__file__ or (filename == __file__ and lineno in _BOOKKEEPING_LINES):
+            continue
+        previous_size, previous_count = before.get((filename, lineno), (0, 0))
+        if size > previous_size:
+            growth.append((size - previous_size, count - previous_count, filename, lineno))
+    growth.sort(reverse=True)
+    return [{
+        'site': f"{os.path.basename(filename)}:{lineno}",
+        'size_bytes': size,
+        'count': count
+    } for size, count, filename, lineno in growth[:top_n]]
 
 class StressTester:
     def __init__(self):
@@ -67,52 +102,148 @@ class StressTester:
         
         return results
     
-    def test_concurrent_decisions(self, materials):
-        """Simulate concurrent decision making"""
+    def test_concurrent_decisions(self, materials, workers=4, requests=200, target_rate=None,
+                                  pools=('thread', 'process'), max_p99_ms=None):
+        """Drive the substitute lookup and decision path concurrently from thread and process pools"""
         results = []
+        if isinstance(materials, MaterialTable):
+            materials = materials.to_records()
         
-        # Test same item evaluated multiple times
-        item1 = materials[0]
-        item2 = materials[1]
-        
-        decisions = []
-        for i in range(5):
+        outcomes = []
+        for kind in pools:
             try:
-                from evaluate_purchase import evaluate_purchase
-                decision = evaluate_purchase(item1, item2)
-                decisions.append(decision)
+                load = run_load(materials, kind, workers, requests, target_rate)
             except Exception as e:
-                results.append({'test': f'concurrent_decision_{i}', 'status': 'failed', 'error': str(e)})
-        
-        # Check consistency
-        if len(set(decisions)) == 1:
-            results.append({'test': 'decision_consistency', 'status': 'passed', 'decisions': decisions})
-        else:
-            results.append({'test': 'decision_consistency', 'status': 'failed', 'decisions': decisions})
+                results.append({'test': f'{kind}_pool_load', 'status': 'failed', 'error': str(e)})
+                continue
+            outcomes.append(load)
+            
+            failed = load['errors'] or load['consistency_violations']
+            too_slow = max_p99_ms is not None and load['latency']['p99_ms'] > max_p99_ms
+            results.append({'test': f'{kind}_pool_load', 'status': 'failed' if failed or too_slow else 'passed', **load})
+        
+        # Check consistency across every concurrent request
+        violations = sum(load['consistency_violations'] for load in outcomes)
+        results.append({
+            'test': 'decision_consistency',
+            'status': 'passed' if outcomes and violations == 0 else 'failed',
+            'requests': sum(load['requests'] for load in outcomes),
+            'consistency_violations': violations
+        })
         
         return results
     
-    def test_memory_usage(self, materials):
-        """Test memory usage with large datasets"""
-        import sys
-        
-        # Simulate large dataset
-        large_dataset = materials * 100  # 5000 items
-        
-        initial_size = sys.getsizeof(large_dataset)
-        
-        # Process dataset
-        low_stock_count = len([item for item in large_dataset if item['DaysOnHand'] < 5])
-        
-        final_size = sys.getsizeof(large_dataset)
+    def test_memory_usage(self, materials, scales=(1, 10, 100), max_items=10_000, top_n=5,
+                          projected_sizes=(100_000, 1_000_000)):
+        """Profile memory per pipeline stage with tracemalloc at several dataset sizes"""
+        base = max(1, min(len(materials), max_items // max(scales)))
+        sizes = sorted({base * scale for scale in scales})
+        
+        # Grouping snapshots by line is slow, so allocation sites come from one mid-sized run
+        # and are skipped when an outer tracer (e.g. the benchmark) makes them meaningless
+        sites_at = None if tracemalloc.is_tracing() else sizes[len(sizes) // 2]
+        profiles = [self.profile_memory(materials, size, top_n if size == sites_at else 0) for size in sizes]
+        
+        # Fit peak = fixed + per_item * items to extrapolate to larger catalogs
+        peaks = [p['peak_bytes'] for p in profiles]
+        if len(profiles) > 1 and None not in peaks:
+            per_item, fixed = np.polyfit(sizes, peaks, 1)
+        else:
+            per_item, fixed = (peaks[0] or profiles[0]['retained_bytes']) / sizes[0], 0.0
         
+        # Super-linear growth shows up as bytes per item rising with dataset size
+        first, last = profiles[0]['bytes_per_item'], profiles[-1]['bytes_per_item']
         return {
             'test': 'memory_usage',
-            'dataset_size': len(large_dataset),
-            'initial_memory': initial_size,
-            'final_memory': final_size,
-            'low_stock_processed': low_stock_count,
-            'status': 'passed' if final_size <= initial_size * 1.1 else 'warning'
+            'dataset_size': sizes[-1],
+            'sizes': sizes,
+            'profiles': profiles,
+            'bytes_per_item': round(float(per_item), 1),
+            'fixed_overhead_bytes': max(0, int(fixed)),
+            'projected_peak_mb': {size: round((fixed + per_item * size) / 2**20, 1) for size in projected_sizes},
+            'status': 'passed' if last <= first * 1.5 else 'warning'
+        }
+    
+    def profile_memory(self, materials, size, top_n=5):
+        """Trace load, low-stock filter, substitute search and audits over `size` items"""
+        as_table = isinstance(materials, MaterialTable)
+        as_compact = isinstance(materials[0], Material)
+        was_tracing = tracemalloc.is_tracing()
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            # Write the scaled catalog as NDJSON so the load stage parses real, distinct records
+            path = os.path.join(tmp, 'materials.ndjson')
+            with open(path, 'w') as f:
+                for i in range(size):
+                    item = materials[i % len(materials)]
+                    f.write(json.dumps(item.to_dict() if as_compact else item) + '\n')
+            
+            if not was_tracing:
+                tracemalloc.start()
+            try:
+                stages = []
+                state = {}
+                
+                def load():
+                    state['data'] = load_compact_materials(path) if as_compact else load_materials(path)
+                    if as_table:
+                        state['data'] = MaterialTable.from_records(state['data'])
+                
+                def low_stock_filter():
+                    data = state['data']
+                    if as_table:
+                        state['low_stock'] = data.low_stock_mask()
+                    else:
+                        state['low_stock'] = [item for item in data if item['DaysOnHand'] < 5]
+                
+                def substitute_search():
+                    data = state['data']
+                    if as_table:
+                        state['substitutes'] = data.substitute_mask() & state['low_stock']
+                    else:
+                        index = SubstituteIndex(data)
+                        state['substitutes'] = [index.find_substitute(item) for item in state['low_stock']]
+                
+                def audits():
+                    data = state['data']
+                    state['resilience'] = ResilienceAuditor(spec_matching_mode='grouped', seed=0).generate_resilience_report(data)
+                    state['compliance'] = ComplianceValidator().generate_compliance_report_from_chunks([data])
+                
+                # Grouping a snapshot is costly, so each one is reused as the next stage's baseline
+                totals = allocation_totals() if top_n else None
+                for name, stage in (('load', load), ('low_stock_filter', low_stock_filter),
+                                    ('substitute_search', substitute_search), ('audits', audits)):
+                    before = totals
+                    start_bytes = tracemalloc.get_traced_memory()[0]
+                    if not was_tracing:
+                        tracemalloc.reset_peak()
+                    stage()
+                    current, peak = tracemalloc.get_traced_memory()
+                    totals = allocation_totals() if top_n else None
+                    stages.append({
+                        'stage': name,
+                        'retained_bytes': current - start_bytes,
+                        # An outer tracer owns the peak, so it cannot be attributed to this stage
+                        'peak_bytes': None if was_tracing else peak - start_bytes,
+                        'top_allocations': allocation_sites(totals, before, top_n) if top_n else []
+                    })
+                state.clear()
+            finally:
+                if not was_tracing:
+                    tracemalloc.stop()
+        
+        retained = sum(stage['retained_bytes'] for stage in stages)
+        peaks = [stage['peak_bytes'] for stage in stages]
+        peak = None
+        if None not in peaks:
+            # Peak of the pipeline: everything retained by earlier stages plus the worst transient
+            peak = max(sum(s['retained_bytes'] for s in stages[:k]) + stages[k]['peak_bytes'] for k in range(len(stages)))
+        return {
+            'items': size,
+            'retained_bytes': retained,
+            'peak_bytes': peak,
+            'bytes_per_item': round((peak if peak is not None else retained) / size, 1),
+            'stages': stages
         }
     
     def test_edge_cases(self, materials):
@@ -152,11 +283,16 @@ class StressTester:
         scenarios = []
         
         # Scenario 1: All items low stock
-        crisis_materials = copy.deepcopy(materials)
-        for item in crisis_materials:
-            item['DaysOnHand'] = random.randint(0, 2)
-        
-        low_stock_count = len([item for item in crisis_materials if item['DaysOnHand'] < 5])
+        if isinstance(materials, MaterialTable):
+            crisis_materials = materials.copy()
+            crisis_materials.days_on_hand = np.random.randint(0, 3, size=len(crisis_materials))
+            low_stock_count = crisis_materials.count_low_stock()
+        else:
+            crisis_materials = copy.deepcopy(materials)
+            for item in crisis_materials:
+                item['DaysOnHand'] = random.randint(0, 2)
+            
+            low_stock_count = len([item for item in crisis_materials if item['DaysOnHand'] < 5])
         scenarios.append({
             'scenario': 'supply_chain_crisis',
             'low_stock_items': low_stock_count,
@@ -168,7 +304,8 @@ class StressTester:
         unique_materials = []
         for i, item in enumerate(materials[:10]):
             unique_item = copy.deepcopy(item)
-            unique_item['TechnicalSpecs']['grade'] = f"UNIQUE_{i}"
+            # Replace rather than mutate, since compact Material specs are immutable
+            unique_item['TechnicalSpecs'] = dict(unique_item['TechnicalSpecs'], grade=f"UNIQUE_{i}")
             unique_materials.append(unique_item)
         
         scenarios.append({
@@ -205,8 +342,7 @@ class StressTester:
         return report
 
 if __name__ == "__main__":
-    with open('raw_materials.json', 'r') as f:
-        materials = json.load(f)
+    materials = load_materials()
     
     tester = StressTester()
     report = tester.generate_stress_test_report(materials)
@@ -229,8 +365,11 @@ if __name__ == "__main__":
     
     print(f"\nMemory Usage Test:")
     mem_test = report['memory_usage_test']
-    print(f"  Dataset Size: {mem_test['dataset_size']} items")
-    print(f"  Memory Usage: {mem_test['final_memory']} bytes")
+    for profile in mem_test['profiles']:
+        stages = ', '.join(f"{s['stage']} {s['retained_bytes'] / 2**20:.1f} MiB" for s in profile['stages'])
+        print(f"  {profile['items']:,} items: {profile['bytes_per_item']:,.0f} bytes/item ({stages})")
+    for size, megabytes in mem_test['projected_peak_mb'].items():
+        print(f"  Projected peak for {size:,} items: {megabytes:,.1f} MiB")
     print(f"  Status: {mem_test['status']}")
     
     # Save detailed report
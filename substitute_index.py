@@ -0,0 +1,69 @@
+import json
+
+
+def spec_key(technical_specs):
+    """Return a canonical, hashable key for a TechnicalSpecs dict"""
+    try:
+        key = tuple(sorted(technical_specs.items()))
+        hash(key)
+        return key
+    except TypeError:
+        # Unhashable or mixed-type values fall back to a canonical JSON form
+        return json.dumps(technical_specs, sort_keys=True, default=str)
+
+
+class SubstituteIndex:
+    """Hash index of materials grouped by identical TechnicalSpecs.
+
+    Built once per run. For every spec group the index remembers the first
+    item and the first item from a different supplier than that one, which
+    is enough to answer "a substitute from another supplier" in O(1) with
+    the same result as a linear scan over the material list.
+    """
+
+    def __init__(self, materials, keys=None):
+        """keys optionally gives each item's spec_key, when the caller has already computed them"""
+        self.groups = {}
+        self.by_sku = {}
+        self._first = {}
+        self._first_other_supplier = {}
+
+        if keys is None:
+            keys = (spec_key(item['TechnicalSpecs']) for item in materials)
+        for item, key in zip(materials, keys):
+            self.groups.setdefault(key, []).append(item)
+            self.by_sku.setdefault(item['SKU'], item)
+
+            first = self._first.setdefault(key, item)
+            if (key not in self._first_other_supplier
+                    and item['SupplierName'] != first['SupplierName']):
+                self._first_other_supplier[key] = item
+
+    def __len__(self):
+        return len(self.by_sku)
+
+    def find_substitute(self, item):
+        """Return the first item with identical specs from a different supplier, or None"""
+        key = spec_key(item['TechnicalSpecs'])
+        first = self._first.get(key)
+        if first is None:
+            return None
+        if first['SupplierName'] != item['SupplierName']:
+            return first
+        return self._first_other_supplier.get(key)
+
+    def find_substitute_for_sku(self, sku):
+        """Return a substitute for the given SKU, or None if the SKU or a substitute is unknown"""
+        item = self.by_sku.get(sku)
+        if item is None:
+            return None
+        return self.find_substitute(item)
+
+    def substitutes_for(self, item):
+        """Return every item with identical specs from a different supplier"""
+        group = self.groups.get(spec_key(item['TechnicalSpecs']), [])
+        return [other for other in group if other['SupplierName'] != item['SupplierName']]
+
+    def has_substitute(self, item):
+        """Check whether any item with identical specs comes from a different supplier"""
+        return self.find_substitute(item) is not None
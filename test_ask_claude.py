@@ -1,4 +1,30 @@
+import sys
+import pytest
 from ask_claude import ask_claude
+from fake_bedrock import FakeBedrockClient
+
+
+class RaisingClient(FakeBedrockClient):
+    def __init__(self, error):
+        super().__init__()
+        self.error = error
+
+    def invoke_model(self, modelId, body, **kwargs):
+        raise self.error
+
+
+def test_client_errors_become_error_text():
+    from botocore.exceptions import ClientError
+    error = ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'InvokeModel')
+    assert ask_claude('prompt', RaisingClient(error)).startswith('Error: ')
+
+
+def test_other_errors_propagate_without_botocore(monkeypatch):
+    # Blocking botocore makes any import of it inside the handler fail
+    monkeypatch.setitem(sys.modules, 'botocore', None)
+    monkeypatch.setitem(sys.modules, 'botocore.exceptions', None)
+    with pytest.raises(RuntimeError, match='throttled'):
+        ask_claude('prompt', RaisingClient(RuntimeError('throttled')))
 
 # Example usage (requires AWS credentials and Bedrock access)
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+import random
+from evaluate_purchase import (evaluate_purchase, evaluate_purchase_batch, evaluate_purchase_pairs,
+                               decision_strings)
+from material_table import MaterialTable
+
+
+def random_catalog(size, spec_count, seed):
+    """Build a random catalog where several items share each spec"""
+    rng = random.Random(seed)
+    specs = [
+        {"density": round(rng.uniform(0.5, 10.0), 2),
+         "tensile_strength": rng.randint(50, 800),
+         "grade": f"G{k}"}
+        for k in range(spec_count)
+    ]
+    return [
+        {
+            "SKU": f"SKU-{i:04d}-abc",
+            "SupplierName": f"Supplier {rng.randint(1, 5)}",
+            # Prices straddle the $1000 approval threshold, including the boundary
+            "Price": rng.choice([round(rng.uniform(10.0, 2000.0), 2), 1000, 999.99]),
+            "LeadTime": rng.randint(5, 60),
+            "DaysOnHand": rng.randint(1, 30),
+            "TechnicalSpecs": dict(rng.choice(specs))
+        }
+        for i in range(size)
+    ]
+
+
+def test_batch_matches_scalar_on_random_catalogs():
+    for seed in range(5):
+        catalog = random_catalog(200, spec_count=8, seed=seed)
+        rng = random.Random(seed)
+        proposed_index = [rng.randrange(len(catalog)) for _ in range(2000)]
+        current_index = [rng.randrange(len(catalog)) for _ in range(2000)]
+
+        expected = [evaluate_purchase(catalog[p], catalog[c]) for p, c in zip(proposed_index, current_index)]
+
+        proposed = [catalog[p] for p in proposed_index]
+        current = [catalog[c] for c in current_index]
+        assert decision_strings(evaluate_purchase_batch(proposed, current)) == expected
+        assert decision_strings(evaluate_purchase_pairs(catalog, proposed_index, current_index)) == expected
+
+        table = MaterialTable.from_records(catalog)
+        assert decision_strings(evaluate_purchase_pairs(table, proposed_index, current_index)) == expected
+
+
+if __name__ == "__main__":
+    print("Testing batch evaluate_purchase against the scalar function:\n")
+    test_batch_matches_scalar_on_random_catalogs()
+    print("Result: batch decisions identical to evaluate_purchase on 5 random catalogs")
@@ -0,0 +1,58 @@
+from benchmark import run_benchmarks, compare_to_baseline, synthetic_catalog, compare_decision_speed
+
+
+def test_synthetic_catalog_is_deterministic():
+    assert synthetic_catalog(500, seed=3) == synthetic_catalog(500, seed=3)
+    assert len({item['SKU'] for item in synthetic_catalog(500)}) == 500
+
+
+def test_benchmarks_record_time_throughput_and_memory():
+    names = ['evaluate_purchase', 'substitute_search', 'resilience_audit', 'compliance_audit']
+    results = run_benchmarks(sizes=[300], names=names, log=lambda message: None)
+    assert [r['benchmark'] for r in results] == names
+    for result in results:
+        assert result['size'] == 300
+        assert result['seconds'] >= 0
+        assert result['peak_traced_bytes'] is not None
+
+
+def test_size_limits_skip_quadratic_benchmarks():
+    results = run_benchmarks(sizes=[1_500], names=['spec_matching_exhaustive'], measure_memory=False,
+                             log=lambda message: None)
+    assert 'skipped' in results[0]
+
+
+def test_decision_speed_compares_against_the_original_function():
+    # Only the decisions are asserted here; the speed check itself runs with the benchmark
+    result = compare_decision_speed(synthetic_catalog(300), rounds=2)
+    assert result['pairs'] == 300 and result['same_decisions']
+    assert result['compiled_ns'] > 0 and result['original_ns'] > 0
+
+
+def test_regressions_flagged_against_baseline():
+    baseline = {'results': [
+        {'benchmark': 'resilience_audit', 'size': 1000, 'seconds': 1.0, 'peak_traced_bytes': 1000},
+        {'benchmark': 'compliance_audit', 'size': 1000, 'seconds': 1.0, 'peak_traced_bytes': 1000},
+        {'benchmark': 'evaluate_purchase', 'size': 1000, 'seconds': 0.001, 'peak_traced_bytes': None},
+    ]}
+    results = [
+        {'benchmark': 'resilience_audit', 'size': 1000, 'seconds': 1.2, 'peak_traced_bytes': 2000},
+        {'benchmark': 'compliance_audit', 'size': 1000, 'seconds': 2.0, 'peak_traced_bytes': 900},
+        {'benchmark': 'evaluate_purchase', 'size': 1000, 'seconds': 0.005, 'peak_traced_bytes': None},
+        {'benchmark': 'master_audit', 'size': 1000, 'seconds': 9.0, 'peak_traced_bytes': 9000},
+    ]
+    regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+    assert [(r['benchmark'], r['metric']) for r in regressions] == [
+        ('resilience_audit', 'peak_traced_bytes'),
+        ('compliance_audit', 'seconds'),
+    ]
+
+
+if __name__ == "__main__":
+    print("Testing the benchmark harness:\n")
+    test_synthetic_catalog_is_deterministic()
+    test_benchmarks_record_time_throughput_and_memory()
+    test_size_limits_skip_quadratic_benchmarks()
+    test_decision_speed_compares_against_the_original_function()
+    test_regressions_flagged_against_baseline()
+    print("Result: timings, throughput, memory peaks and baseline regressions recorded as expected")
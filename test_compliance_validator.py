@@ -0,0 +1,73 @@
+import copy
+import random
+from benchmark import synthetic_catalog
+from compliance_validator import ComplianceValidator, duplicate_skus
+
+
+def dirty_catalog(count=2_000, seed=5):
+    materials = synthetic_catalog(count, seed)
+    rng = random.Random(seed)
+    for item in rng.sample(materials, count // 10):
+        kind = rng.randrange(6)
+        if kind == 0:
+            del item['SupplierName']
+        elif kind == 1:
+            item['SKU'] = 'BAD-' + item['SKU']
+        elif kind == 2:
+            item['Price'] = -1
+        elif kind == 3:
+            item['TechnicalSpecs'] = {k: v for k, v in item['TechnicalSpecs'].items() if k != 'grade'}
+        elif kind == 4:
+            item['LeadTime'] = 400
+        else:
+            item['DaysOnHand'] = -2
+    return materials + copy.deepcopy(materials[10:25])
+
+
+def multi_pass_report(materials):
+    validator = ComplianceValidator()
+    validator.validate_data_integrity(materials)
+    validator.validate_business_rules(materials)
+    validator.validate_procurement_decisions(materials)
+    validator.validate_audit_trail()
+    return validator.build_compliance_report()
+
+
+def without_timestamp(report):
+    return {key: value for key, value in report.items() if key != 'timestamp'}
+
+
+def test_single_pass_matches_separate_passes():
+    materials = dirty_catalog()
+    single = ComplianceValidator().generate_compliance_report(materials)
+    assert without_timestamp(single) == without_timestamp(multi_pass_report(materials))
+    assert single['summary']['business_rules'] == 15 + single['rule_counts']['violations']['negative_inventory']
+
+
+def test_chunked_report_matches_list_report():
+    materials = dirty_catalog()
+    chunks = [materials[i:i + 300] for i in range(0, len(materials), 300)]
+    assert without_timestamp(ComplianceValidator().generate_compliance_report_from_chunks(chunks)) == \
+        without_timestamp(ComplianceValidator().generate_compliance_report(materials))
+
+
+def test_rule_counts_match_findings():
+    report = ComplianceValidator().generate_compliance_report(dirty_catalog())
+    counts = report['rule_counts']
+    assert sum(counts['violations'].values()) == report['total_violations']
+    assert sum(counts['warnings'].values()) == report['total_warnings']
+    assert counts['warnings']['excessive_lead_time'] == len(
+        [w for w in report['warnings'] if w['type'] == 'excessive_lead_time'])
+
+
+def test_duplicates_in_first_repeat_order():
+    assert duplicate_skus(['a', 'b', 'c', 'b', 'a', 'b']) == ['b', 'a']
+
+
+if __name__ == "__main__":
+    print("Testing the single-pass compliance validator:\n")
+    test_single_pass_matches_separate_passes()
+    test_chunked_report_matches_list_report()
+    test_rule_counts_match_findings()
+    test_duplicates_in_first_repeat_order()
+    print("Result: single-pass, chunked and multi-pass validation produce the same report")
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import pytest
+from email_pipeline import generate_emails, parse_batch_response, run_pipeline, email_filename
+from fake_bedrock import FakeBedrockClient
+from test_fake_bedrock import proposals
+
+
+class FailingClient(FakeBedrockClient):
+    """Fake client whose calls fail for prompts mentioning one of the given SKUs"""
+
+    def __init__(self, failing_skus, **kwargs):
+        super().__init__(**kwargs)
+        self.failing_skus = failing_skus
+
+    def invoke_model(self, modelId, body, **kwargs):
+        if any(sku in body for sku in self.failing_skus):
+            raise RuntimeError('throttled')
+        return super().invoke_model(modelId, body, **kwargs)
+
+
+def switch_catalog():
+    materials = []
+    for k in range(6):
+        specs = {'grade': f'G-{k}', 'density': 2.7}
+        materials.append({'SKU': f'SKU-{k}', 'SupplierName': 'Acme', 'Price': 100.0, 'LeadTime': 10,
+                          'DaysOnHand': 2, 'TechnicalSpecs': specs})
+        materials.append({'SKU': f'SUB-{k}', 'SupplierName': 'Other', 'Price': 90.0, 'LeadTime': 10,
+                          'DaysOnHand': 20, 'TechnicalSpecs': dict(specs)})
+    # A repeated SKU, a SKU that is not a safe file name, and a low-stock item without a substitute
+    materials.append(dict(materials[0]))
+    materials.append(dict(materials[2], SKU='../outside/SKU-1'))
+    materials.append({'SKU': 'LONE-1', 'SupplierName': 'Acme', 'Price': 5.0, 'LeadTime': 10, 'DaysOnHand': 1,
+                      'TechnicalSpecs': {'grade': 'unique'}})
+    return materials
+
+
+def test_semaphore_caps_concurrent_calls():
+    client = FakeBedrockClient(latency=0.03)
+    results = asyncio.run(generate_emails(proposals(12), concurrency=3, client=client))
+    assert len(results) == 12 and client.calls == 12
+    assert client.max_in_flight == 3
+
+
+def test_batches_split_and_parse():
+    client = FakeBedrockClient()
+    results = asyncio.run(generate_emails(proposals(10), concurrency=2, client=client, batch_size=4))
+    assert client.calls == 3
+    assert all(result['batched'] for result in results)
+    assert [result['sku'] for result in results] == [f'SKU-{k}' for k in range(10)]
+    assert 'SKU-7 -> SUB-7' in results[7]['email']
+
+
+def test_malformed_batches_fall_back_to_single_calls():
+    with pytest.raises(ValueError):
+        parse_batch_response('[{"id": 0, "email": "truncated', 1)
+    with pytest.raises(ValueError):
+        parse_batch_response('[{"id": 0, "email": "only one"}]', 2)
+    client = FakeBedrockClient(response_text='single', malformed_batches=True)
+    results = asyncio.run(generate_emails(proposals(10), concurrency=2, client=client, batch_size=4))
+    assert client.calls == 3 + 10
+    assert not any(result['batched'] for result in results)
+    assert {result['email'] for result in results} == {'single'}
+
+
+def test_error_counts_and_manifest(tmp_path):
+    output_dir = str(tmp_path / 'emails')
+    manifest = run_pipeline(switch_catalog(), output_dir, concurrency=2,
+                            client=FailingClient(['SKU-3', 'SKU-4'], response_text='email body'))
+    assert manifest['emails_generated'] == 6
+    assert manifest['errors'] == 2
+    assert manifest['items_without_substitutes'] == ['LONE-1']
+    assert len(manifest['items']) == 8
+
+    files = [entry['file'] for entry in manifest['items']]
+    assert len(set(files)) == len(files)
+    assert sorted(os.listdir(output_dir)) == sorted(files + ['manifest.json'])
+    assert 'SKU-0-2.txt' in files and 'SKU-1-2.txt' in files
+    with open(os.path.join(output_dir, 'manifest.json')) as f:
+        assert json.load(f)['items'] == manifest['items']
+    for entry in manifest['items']:
+        with open(os.path.join(output_dir, entry['file'])) as f:
+            assert (f.read() == 'email body') == (entry['status'] == 'generated')
+        assert 'email' not in entry
+
+
+def test_email_filename_is_safe_and_unique():
+    used = set()
+    assert email_filename('SKU-1', used) == 'SKU-1.txt'
+    assert email_filename('SKU-1', used) == 'SKU-1-2.txt'
+    assert email_filename('../../etc/passwd', used) == 'passwd.txt'
+    assert email_filename('a b/c:d?', used) == 'c_d_.txt'
+    assert email_filename('..', used) == 'item.txt'
+
+
+if __name__ == "__main__":
+    import tempfile
+    print("Testing the email pipeline against the offline Bedrock client:\n")
+    test_semaphore_caps_concurrent_calls()
+    test_batches_split_and_parse()
+    test_malformed_batches_fall_back_to_single_calls()
+    with tempfile.TemporaryDirectory() as directory:
+        import pathlib
+        test_error_counts_and_manifest(pathlib.Path(directory))
+    test_email_filename_is_safe_and_unique()
+    print("Result: concurrency, batching, fallback and manifest behave as expected")
@@ -0,0 +1,43 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from ask_claude import ask_claude
+from email_pipeline import build_batch_prompt
+from fake_bedrock import FakeBedrockClient
+
+
+def proposals(count):
+    def item(sku, supplier):
+        return {'SKU': sku, 'SupplierName': supplier, 'Price': 10.0, 'DaysOnHand': 2,
+                'TechnicalSpecs': {'grade': 'AB-1'}}
+    return [(item(f'SKU-{k}', 'Acme'), item(f'SUB-{k}', 'Other')) for k in range(count)]
+
+
+def test_single_prompt_gets_canned_reply():
+    client = FakeBedrockClient(response_text='hello')
+    assert ask_claude('ping', client=client) == 'hello'
+    assert client.calls == 1
+
+
+def test_batch_prompt_gets_one_email_per_proposal():
+    reply = json.loads(ask_claude(build_batch_prompt(proposals(3)), client=FakeBedrockClient()))
+    assert [entry['id'] for entry in reply] == [0, 1, 2]
+    assert 'SKU-1 -> SUB-1' in reply[1]['email']
+    broken = ask_claude(build_batch_prompt(proposals(3)), client=FakeBedrockClient(malformed_batches=True))
+    assert broken.startswith('[') and not broken.endswith(']')
+
+
+def test_counts_overlapping_calls():
+    client = FakeBedrockClient(latency=0.05)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda k: ask_claude(f'ping {k}', client=client), range(8)))
+    assert client.calls == 8
+    assert 1 < client.max_in_flight <= 4
+    assert client.in_flight == 0
+
+
+if __name__ == "__main__":
+    print("Testing the offline Bedrock client:\n")
+    test_single_prompt_gets_canned_reply()
+    test_batch_prompt_gets_one_email_per_proposal()
+    test_counts_overlapping_calls()
+    print("Result: the fake client answers single and batched prompts and tracks concurrency")
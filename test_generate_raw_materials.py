@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+from generate_raw_materials import build_config, write_catalog
+from inventory_loader import load_materials
+
+
+def catalog_config(count=2_500, seed=11):
+    return build_config(count, groups=40, size_distribution='uniform', min_group_size=2, max_group_size=6,
+                        low_stock_fraction=0.2, suppliers=50, seed=seed)
+
+
+def test_output_does_not_depend_on_workers_or_chunk_size(tmp_path):
+    config = catalog_config()
+    outputs = []
+    for workers, chunk_size in ((1, 50_000), (1, 333), (3, 1_000), (4, 7)):
+        path = tmp_path / f'catalog-{workers}-{chunk_size}.json'
+        write_catalog(str(path), config, 'json', workers, chunk_size)
+        outputs.append(path.read_text())
+    assert all(output == outputs[0] for output in outputs)
+
+    materials = json.loads(outputs[0])
+    assert len(materials) == 2_500
+    assert len({item['SKU'] for item in materials}) == len(materials)
+
+
+def test_ndjson_matches_json(tmp_path):
+    config = catalog_config(count=700)
+    write_catalog(str(tmp_path / 'catalog.json'), config, 'json', workers=1)
+    write_catalog(str(tmp_path / 'catalog.ndjson'), config, 'ndjson', workers=2, chunk_size=64)
+    assert load_materials(str(tmp_path / 'catalog.ndjson')) == load_materials(str(tmp_path / 'catalog.json'))
+
+
+def test_cli_is_deterministic_across_workers(tmp_path):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generate_raw_materials.py')
+    outputs = []
+    for workers, chunk_size in (('1', '50000'), ('3', '97')):
+        output = str(tmp_path / f'catalog-{workers}.json')
+        subprocess.run([sys.executable, script, '--count', '1000', '--groups', '20', '--seed', '5',
+                        '--workers', workers, '--chunk-size', chunk_size, '--output', output],
+                       check=True, capture_output=True)
+        with open(output) as f:
+            outputs.append(f.read())
+    assert outputs[0] == outputs[1]
+    assert len({item['SKU'] for item in json.loads(outputs[0])}) == 1_000
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    print("Testing catalog generation:\n")
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+        test_output_does_not_depend_on_workers_or_chunk_size(directory)
+        test_ndjson_matches_json(directory)
+        test_cli_is_deterministic_across_workers(directory)
+    print("Result: the same seed gives the same catalog with unique SKUs for any workers and chunk size")
@@ -0,0 +1,63 @@
+import copy
+import json
+import os
+import tracemalloc
+from html_report_generator import HTMLReportGenerator
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'master_audit_report.json')) as f:
+    REPORT = json.load(f)
+
+
+def report_with_violations(count):
+    report = copy.deepcopy(REPORT)
+    report['detailed_reports']['compliance']['violations'] = [
+        {'type': 'invalid_price', 'sku': f'SKU-{i:04d}-ABC', 'price': -i} for i in range(count)]
+    return report
+
+
+def test_violation_tables_are_paginated():
+    report = report_with_violations(1_205)
+    report['detailed_reports']['compliance']['violations'][0]['note'] = '<script>'
+    html = HTMLReportGenerator(report=report).generate_html_report(page_size=500)
+    assert 'Compliance Violations (1,205)' in html
+    assert 'Page 1 of 3' in html
+    # Three violation pages, plus one each for critical items and items without substitutes
+    assert html.count('<div class="page" data-page=') == 3 + 2
+    assert 'SKU-1204-ABC' in html
+    assert '&lt;script&gt;' in html and 'note=<script>' not in html
+
+
+def test_split_sections_are_written_to_page_files(tmp_path):
+    output = str(tmp_path / 'report.html')
+    stats = HTMLReportGenerator(report=report_with_violations(1_000)).write_html_report(
+        output, page_size=400, split_sections=True)
+    pages = sorted(os.listdir(os.path.join(stats['sections_dir'], 'compliance_violations')))
+    assert pages == ['page-0001.html', 'page-0002.html', 'page-0003.html']
+    with open(output) as f:
+        main = f.read()
+    assert 'SKU-0999-ABC' not in main and 'data-base="report_sections/compliance_violations/page-"' in main
+    with open(os.path.join(stats['sections_dir'], 'compliance_violations', 'page-0003.html')) as f:
+        assert 'SKU-0999-ABC' in f.read()
+
+
+def test_streaming_memory_stays_bounded(tmp_path):
+    generator = HTMLReportGenerator(report=report_with_violations(50_000))
+    tracemalloc.start()
+    try:
+        stats = generator.write_html_report(str(tmp_path / 'report.html'))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert stats['rows'] >= 50_000
+    assert peak < stats['bytes'] / 10
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    print("Testing streaming HTML report output:\n")
+    test_violation_tables_are_paginated()
+    for test in (test_split_sections_are_written_to_page_files, test_streaming_memory_stays_bounded):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Result: finding tables are streamed page by page, optionally into per-section files")
@@ -0,0 +1,35 @@
+from import_budget import check_import_budgets, loaded_heavy_modules, import_time_us, IMPORT_BUDGETS_MS
+
+# Wall-clock budgets depend on the machine, so they are checked by running import_budget.py as a
+# benchmark; these tests only assert on what gets imported
+
+
+def test_core_decision_path_skips_heavy_imports():
+    for module in ('evaluate_purchase', 'ask_claude', 'simulation', 'visual_report_generator'):
+        assert loaded_heavy_modules(module) == [], module
+
+
+def test_heavy_imports_are_detected():
+    assert loaded_heavy_modules('numpy') == ['numpy']
+    assert loaded_heavy_modules('material_table') == ['numpy']
+
+
+def test_import_time_is_measured():
+    assert import_time_us('evaluate_purchase') > 0
+
+
+def test_budget_check_covers_every_core_module():
+    results = check_import_budgets(runs=1)
+    assert [r['module'] for r in results] == list(IMPORT_BUDGETS_MS)
+    assert all(r['heavy_modules'] == [] for r in results)
+    # A zero budget always fails, whatever the machine
+    assert [r['status'] for r in check_import_budgets({'material': 0}, runs=1)] == ['fail']
+
+
+if __name__ == "__main__":
+    print("Testing import-time budgets:\n")
+    test_core_decision_path_skips_heavy_imports()
+    test_heavy_imports_are_detected()
+    test_import_time_is_measured()
+    test_budget_check_covers_every_core_module()
+    print("Result: core modules import without numpy, boto3 or matplotlib")
@@ -0,0 +1,81 @@
+import copy
+import json
+import os
+import tempfile
+from master_auditor import MasterAuditor
+from incremental_audit import FingerprintStore
+
+# Fields that legitimately differ between two runs of the same audit
+VOLATILE_KEYS = ('audit_timestamp', 'audit_timings', 'llm_cache')
+LOAD_TEST_MEASUREMENTS = ('latency', 'achieved_rate', 'elapsed_seconds')
+
+
+def comparable(report):
+    """Strip timestamps, timings and load and memory measurements so two master reports can be compared"""
+    report = json.loads(json.dumps(report))
+    for key in VOLATILE_KEYS:
+        report.pop(key, None)
+    for detailed in report['detailed_reports'].values():
+        detailed.pop('timestamp', None)
+    report['detailed_reports']['stress_test'].pop('memory_usage_test')
+    for test in report['detailed_reports']['stress_test']['concurrent_decision_tests']:
+        for key in LOAD_TEST_MEASUREMENTS:
+            test.pop(key, None)
+    return report
+
+
+def full_report(materials):
+    return comparable(MasterAuditor().run_comprehensive_audit(materials))
+
+
+def incremental_report(materials, store_path):
+    auditor = MasterAuditor()
+    report = auditor.run_comprehensive_audit(materials, fingerprint_store=FingerprintStore(store_path))
+    return comparable(report), auditor.incremental_stats
+
+
+def test_incremental_matches_full_audit():
+    with open('raw_materials.json', 'r') as f:
+        materials = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = os.path.join(tmp, 'fingerprints.json')
+
+        # First run has no store and audits everything
+        report, stats = incremental_report(materials, store_path)
+        assert stats['mode'] == 'full'
+        assert report == full_report(materials)
+
+        # Overnight changes: stock moves, a price rise, new specs, a broken record, an added and a removed SKU
+        changed = copy.deepcopy(materials)
+        changed[3]['DaysOnHand'] = 0
+        changed[7]['DaysOnHand'] = -2
+        changed[9]['Price'] = 1500.0
+        changed[11]['TechnicalSpecs'] = dict(changed[12]['TechnicalSpecs'])
+        changed[15]['SKU'] = 'BAD-SKU'
+        # Low-stock items gain a substitute whose specs are equal as dicts but spelled 786.0 instead of 786
+        for low, other in ((1, 4), (2, 6)):
+            specs = changed[other]['TechnicalSpecs']
+            changed[low]['TechnicalSpecs'] = dict(specs, tensile_strength=float(specs['tensile_strength']))
+        changed.append(dict(copy.deepcopy(changed[20]), SKU='SKU-0001-New', SupplierName='New Supplier'))
+        del changed[30]
+
+        report, stats = incremental_report(changed, store_path)
+        assert stats['mode'] == 'incremental'
+        # The renamed SKU counts as one removal plus one addition
+        assert stats['changed_or_added'] == 8
+        assert stats['removed'] == 2
+        n = len(changed)
+        assert stats['pairs_evaluated'] < n * (n - 1) // 2
+        assert report == full_report(changed)
+
+        # Unchanged catalog reuses everything
+        report, stats = incremental_report(changed, store_path)
+        assert stats['changed_or_added'] == 0 and stats['pairs_evaluated'] == 0
+        assert report == full_report(changed)
+
+
+if __name__ == "__main__":
+    print("Testing incremental audit against a full re-audit:\n")
+    test_incremental_matches_full_audit()
+    print("Result: incremental and full master reports are identical")
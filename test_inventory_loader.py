@@ -0,0 +1,93 @@
+import io
+import json
+import pytest
+from inventory_loader import iter_materials, iter_chunks, load_materials, _iter_json_array
+
+
+def catalog(count):
+    return [{'SKU': f'SKU-{k}', 'SupplierName': 'Acme', 'Price': 10.5 + k, 'LeadTime': k % 7,
+             'DaysOnHand': k, 'TechnicalSpecs': {'grade': f'G-{k % 3}', 'notes': 'a, [b] {c}'}}
+            for k in range(count)]
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_json_array_streams_across_block_boundaries(tmp_path):
+    materials = catalog(40) + [7, -1.5e3, 'text', None]
+    path = write(tmp_path / 'catalog.json', '\n  ' + json.dumps(materials, indent=2) + '\n')
+    for block_size in (1, 2, 7, 64, 1 << 16):
+        assert list(iter_materials(path, block_size=block_size)) == materials
+    path = write(tmp_path / 'compact.json', json.dumps(materials, separators=(',', ':')))
+    for block_size in (1, 3, 50):
+        assert list(iter_materials(path, block_size=block_size)) == materials
+
+
+@pytest.mark.parametrize('text', [
+    '[{"a": 1} {"a": 2}]',
+    '[{"a": 1},, {"a": 2}]',
+    '[, {"a": 1}]',
+    '[{"a": 1},]',
+    '[{"a": 1},',
+    '[{"a": 1}',
+    '[{"a": 1} ; {"a": 2}]',
+])
+def test_malformed_arrays_are_rejected(tmp_path, text):
+    path = write(tmp_path / 'catalog.json', text)
+    for block_size in (1, 4, 1 << 16):
+        with pytest.raises(ValueError):
+            list(iter_materials(path, block_size=block_size))
+
+
+def test_malformed_element_fails_without_reading_on(tmp_path):
+    text = '[{"SKU": "bad" "SupplierName": "Acme"},\n' + json.dumps(catalog(5_000))[1:]
+    f = io.StringIO(text)
+    with pytest.raises(ValueError, match='offset 15'):
+        list(_iter_json_array(f, 4_096))
+    # Raised from the first block instead of after buffering the rest of the file
+    assert f.tell() == 4_096 < len(text)
+    path = write(tmp_path / 'catalog.json', text)
+    with pytest.raises(ValueError, match='offset 15'):
+        list(iter_materials(path, block_size=4_096))
+
+
+def test_empty_array(tmp_path):
+    assert load_materials(write(tmp_path / 'catalog.json', ' [ \n ] ')) == []
+
+
+def test_ndjson_is_detected(tmp_path):
+    materials = catalog(5)
+    text = '\n\n' + '\n'.join(json.dumps(item) for item in materials) + '\n\n'
+    path = write(tmp_path / 'catalog.ndjson', text)
+    assert load_materials(path) == materials
+    # Detection looks past leading whitespace longer than a block
+    assert list(iter_materials(path, block_size=1)) == materials
+    path = write(tmp_path / 'indented.json', ' ' * 10 + json.dumps(materials))
+    assert list(iter_materials(path, block_size=4)) == materials
+
+
+def test_iter_chunks_sizes(tmp_path):
+    path = write(tmp_path / 'catalog.json', json.dumps(catalog(25)))
+    assert [len(chunk) for chunk in iter_chunks(path, chunk_size=10)] == [10, 10, 5]
+    assert [len(chunk) for chunk in iter_chunks(path, chunk_size=25)] == [25]
+    assert [len(chunk) for chunk in iter_chunks(path, chunk_size=5)] == [5] * 5
+    assert [item for chunk in iter_chunks(path, chunk_size=10) for item in chunk] == catalog(25)
+    assert list(iter_chunks(write(tmp_path / 'empty.json', '[]'), chunk_size=10)) == []
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    print("Testing the streaming inventory loader:\n")
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+        test_json_array_streams_across_block_boundaries(directory)
+        for text in ('[{"a": 1} {"a": 2}]', '[{"a": 1},, {"a": 2}]', '[{"a": 1},]', '[{"a": 1},'):
+            test_malformed_arrays_are_rejected(directory, text)
+        test_malformed_element_fails_without_reading_on(directory)
+        test_empty_array(directory)
+        test_ndjson_is_detected(directory)
+        test_iter_chunks_sizes(directory)
+    print("Result: JSON arrays and NDJSON stream correctly and malformed arrays are rejected")
@@ -0,0 +1,99 @@
+import pytest
+from fake_dynamodb import FakeDynamoDBResource
+from inventory_repository import open_repository, create_dynamodb_table, DynamoDBBackend, InventoryRepository
+from benchmark import synthetic_catalog
+from simulation import iter_low_stock, find_low_stock_with_substitute
+from email_pipeline import find_switch_proposals
+
+MATERIALS = synthetic_catalog(1_000, seed=4)
+
+
+def repositories(tmp_path):
+    yield open_repository('json', str(tmp_path / 'inventory.json'))
+    yield open_repository('sqlite', str(tmp_path / 'inventory.sqlite'))
+    yield open_repository('local-dynamodb')
+
+
+def test_backends_round_trip_and_agree(tmp_path):
+    expected_low = sorted(item['SKU'] for item in MATERIALS if item['DaysOnHand'] < 5)
+    for repository in repositories(tmp_path):
+        with repository:
+            assert repository.put_materials(MATERIALS) == 40
+            for segments in (1, 3, 8):
+                scanned = repository.scan(segments)
+                assert sorted(scanned, key=lambda item: item['SKU']) == sorted(MATERIALS, key=lambda item: item['SKU'])
+            low = repository.query_low_stock()
+            assert sorted(item['SKU'] for item in low) == expected_low
+            assert [item['DaysOnHand'] for item in low] == sorted(item['DaysOnHand'] for item in low)
+            assert [item['SKU'] for item in iter_low_stock(repository)] == [item['SKU'] for item in low]
+            assert repository.get(MATERIALS[7]['SKU']) == MATERIALS[7]
+            # Above LOW_STOCK_DAYS the index can't answer, so JSON and DynamoDB read everything
+            wide = repository.query_low_stock(31)
+            assert [(item['DaysOnHand'], item['SKU']) for item in wide] == sorted(
+                (item['DaysOnHand'], item['SKU']) for item in MATERIALS if item['DaysOnHand'] < 31)
+
+
+def test_updates_move_items_in_and_out_of_the_low_stock_index(tmp_path):
+    for repository in repositories(tmp_path):
+        with repository:
+            repository.put_materials(MATERIALS)
+            healthy = next(item for item in MATERIALS if item['DaysOnHand'] >= 5)
+            low = next(item for item in MATERIALS if item['DaysOnHand'] < 5)
+            repository.put_materials([dict(healthy, DaysOnHand=2), dict(low, DaysOnHand=30)])
+            skus = {item['SKU'] for item in repository.query_low_stock()}
+            assert healthy['SKU'] in skus and low['SKU'] not in skus
+            assert {item['SKU'] for item in repository.query_low_stock(31)} >= {healthy['SKU'], low['SKU']}
+
+
+def test_json_backend_persists(tmp_path):
+    path = str(tmp_path / 'inventory.json')
+    with open_repository('json', path) as repository:
+        repository.put_materials(MATERIALS[:30])
+    with open_repository('json', path) as repository:
+        assert repository.scan(1) == MATERIALS[:30]
+
+
+def test_dynamodb_batches_are_capped_and_low_stock_reads_the_index():
+    resource = FakeDynamoDBResource(page_size=64)
+    table = create_dynamodb_table(resource)
+    repository = InventoryRepository(DynamoDBBackend(resource))
+    repository.put_materials(MATERIALS)
+    assert resource.batch_requests == 40
+    with pytest.raises(ValueError):
+        resource.batch_write_item(RequestItems={table.name: [{'PutRequest': {'Item': {'SKU': str(i)}}}
+                                                             for i in range(26)]})
+    with pytest.raises(TypeError):
+        table.put_item(Item={'SKU': 'x', 'Price': 1.5})
+
+    requests = table.requests
+    low = repository.query_low_stock()
+    low_count = sum(item['DaysOnHand'] < 5 for item in MATERIALS)
+    # Paged through the sparse index only, not the whole table
+    assert len(low) == low_count
+    assert table.requests - requests == low_count // 64 + 1
+
+
+def test_substitute_search_reads_a_repository(tmp_path):
+    for repository in repositories(tmp_path):
+        with repository:
+            repository.put_materials(MATERIALS)
+            item, substitute = find_low_stock_with_substitute(repository)
+            assert item['DaysOnHand'] < 5
+            assert substitute['TechnicalSpecs'] == item['TechnicalSpecs']
+            assert substitute['SupplierName'] != item['SupplierName']
+            proposals, without_substitute = find_switch_proposals(repository)
+            assert len(proposals) + len(without_substitute) == len([m for m in MATERIALS if m['DaysOnHand'] < 5])
+            assert {low['SKU'] for low, sub in proposals} == \
+                {low['SKU'] for low, sub in find_switch_proposals(MATERIALS)[0]}
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    print("Testing the inventory repository backends:\n")
+    for test in (test_backends_round_trip_and_agree, test_updates_move_items_in_and_out_of_the_low_stock_index,
+                 test_json_backend_persists, test_substitute_search_reads_a_repository):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_dynamodb_batches_are_capped_and_low_stock_reads_the_index()
+    print("Result: JSON, SQLite and local DynamoDB backends agree on scans and low-stock queries")
@@ -0,0 +1,58 @@
+import json
+import threading
+import load_tester
+from load_tester import run_load, latency_summary, handle_request
+from stress_tester import StressTester
+
+with open('raw_materials.json', 'r') as f:
+    MATERIALS = json.load(f)
+
+
+def test_thread_and_process_pools_give_consistent_decisions():
+    for kind in ('thread', 'process'):
+        result = run_load(MATERIALS, kind, workers=4, requests=300)
+        assert result['errors'] == 0
+        assert result['consistency_violations'] == 0
+        latency = result['latency']
+        assert latency['p50_ms'] <= latency['p95_ms'] <= latency['p99_ms'] <= latency['max_ms']
+
+
+def test_target_rate_paces_requests():
+    result = run_load(MATERIALS, 'thread', workers=2, requests=100, target_rate=200)
+    # 100 requests at 200/s take about half a second
+    assert result['elapsed_seconds'] >= 0.45
+    assert result['achieved_rate'] <= 220
+
+
+def test_inconsistent_decisions_are_reported(monkeypatch):
+    def flaky(sku):
+        sku, substitute, decision = handle_request(sku)
+        # The sequential reference run happens on the main thread; corrupt only pool answers
+        if threading.current_thread() is not threading.main_thread():
+            decision = 'APPROVED' if decision != 'APPROVED' else 'PENDING MANAGER'
+        return sku, substitute, decision
+
+    monkeypatch.setattr(load_tester, 'handle_request', flaky)
+    result = run_load(MATERIALS, 'thread', workers=4, requests=100)
+    assert result['consistency_violations'] > 0
+
+
+def test_latency_summary_percentiles():
+    summary = latency_summary([k / 1000 for k in range(1, 101)])
+    assert summary['p50_ms'] == 50.5
+    assert summary['max_ms'] == 100.0
+
+
+def test_stress_tester_reports_concurrency_results():
+    results = StressTester().test_concurrent_decisions(MATERIALS, workers=2, requests=50)
+    assert [r['test'] for r in results] == ['thread_pool_load', 'process_pool_load', 'decision_consistency']
+    assert all(r['status'] == 'passed' for r in results)
+
+
+if __name__ == "__main__":
+    print("Testing the concurrent load generator:\n")
+    test_thread_and_process_pools_give_consistent_decisions()
+    test_target_rate_paces_requests()
+    test_latency_summary_percentiles()
+    test_stress_tester_reports_concurrency_results()
+    print("Result: thread and process pools return consistent decisions with latency percentiles")
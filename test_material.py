@@ -0,0 +1,125 @@
+import copy
+import gc
+import json
+import os
+import pickle
+import random
+import tempfile
+import tracemalloc
+from material import Material, Spec, intern_spec, spec_count, load_compact_materials, to_records, dump_materials
+from inventory_loader import load_materials
+from evaluate_purchase import evaluate_purchase
+from generate_raw_materials import build_config, generate_items
+
+
+def test_round_trip_matches_original_json():
+    materials = load_compact_materials('raw_materials.json')
+    assert to_records(materials) == load_materials('raw_materials.json')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'materials.json')
+        dump_materials(materials, path)
+        with open('raw_materials.json', 'r') as f:
+            original = json.load(f)
+        with open(path, 'r') as f:
+            assert json.load(f) == original
+
+
+def test_equal_specs_and_suppliers_are_shared():
+    materials = load_compact_materials('raw_materials.json')
+    by_grade = {}
+    for item in materials:
+        by_grade.setdefault(item['TechnicalSpecs']['grade'], []).append(item)
+    aluminium = by_grade['6061-T6']
+    assert len(aluminium) > 1
+    assert all(item.TechnicalSpecs is aluminium[0].TechnicalSpecs for item in aluminium)
+    assert intern_spec(dict(aluminium[0].TechnicalSpecs)) is aluminium[0].TechnicalSpecs
+
+    a = Material.from_dict(dict(materials[0].to_dict(), SKU='SKU-0000-aaa'))
+    assert a.SupplierName is materials[0].SupplierName
+
+
+def test_spec_behaves_like_an_immutable_dict():
+    spec = intern_spec({'density': 2.7, 'tensile_strength': 310, 'grade': '6061-T6'})
+    assert spec == {'density': 2.7, 'tensile_strength': 310, 'grade': '6061-T6'}
+    assert spec is intern_spec({'grade': '6061-T6', 'density': 2.7, 'tensile_strength': 310})
+    assert intern_spec({'density': 2}) is not intern_spec({'density': 2.0})
+    assert intern_spec({'density': 2}) == intern_spec({'density': 2.0}) == {'density': 2.0}
+    assert intern_spec({'density': 2}) != intern_spec({'density': 3})
+    assert isinstance(intern_spec({'density': [1, 2]}), dict)
+    assert copy.deepcopy(spec) is spec
+    assert pickle.loads(pickle.dumps(spec)) is spec
+    try:
+        spec['grade'] = 'A36'
+        assert False, 'Spec should be immutable'
+    except TypeError:
+        pass
+
+
+def test_evaluate_purchase_matches_dict_records():
+    records = load_materials('raw_materials.json')
+    materials = load_compact_materials('raw_materials.json')
+    rng = random.Random(0)
+    for _ in range(2000):
+        i, j = rng.randrange(len(records)), rng.randrange(len(records))
+        expected = evaluate_purchase(records[i], records[j])
+        assert evaluate_purchase(materials[i], materials[j]) == expected
+        assert evaluate_purchase(materials[i], records[j]) == expected
+
+
+def test_numerically_equal_specs_decide_like_dicts():
+    integer = Material('SKU-1', 'Acme', 10, 5, 3, {'grade': 'A', 'width': 2})
+    fractional = Material('SKU-2', 'Bolt', 10, 5, 3, {'grade': 'A', 'width': 2.0})
+    assert dict(fractional.TechnicalSpecs)['width'] == 2.0 and type(fractional['TechnicalSpecs']['width']) is float
+    expected = evaluate_purchase(integer.to_dict(), fractional.to_dict())
+    assert expected == 'APPROVED'
+    assert evaluate_purchase(integer, fractional) == expected
+
+
+def test_unused_specs_are_released():
+    gc.collect()
+    before = spec_count()
+    spec = intern_spec({'grade': 'released-only-here', 'width': 1})
+    assert spec_count() == before + 1
+    del spec
+    gc.collect()
+    assert spec_count() == before
+
+
+def test_material_supports_dict_style_access():
+    item = load_compact_materials('raw_materials.json')[0]
+    item['DaysOnHand'] = 3
+    assert item['DaysOnHand'] == 3 and item.get('Missing') is None
+    del item['Price']
+    assert 'Price' not in item and 'Price' not in item.to_dict()
+
+
+def test_compact_records_use_a_third_of_the_memory():
+    config = build_config(20_000, 5_000, 'uniform', 2, 5, 0.1, 500, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'materials.ndjson')
+        with open(path, 'w') as f:
+            for item in generate_items(0, 20_000, config):
+                f.write(json.dumps(item) + '\n')
+
+        usage = []
+        for loader in (load_materials, load_compact_materials):
+            tracemalloc.start()
+            materials = loader(path)
+            usage.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            del materials
+    assert usage[0] >= 3 * usage[1]
+
+
+if __name__ == "__main__":
+    print("Testing compact Material records:\n")
+    test_round_trip_matches_original_json()
+    test_equal_specs_and_suppliers_are_shared()
+    test_spec_behaves_like_an_immutable_dict()
+    test_evaluate_purchase_matches_dict_records()
+    test_numerically_equal_specs_decide_like_dicts()
+    test_unused_specs_are_released()
+    test_material_supports_dict_style_access()
+    test_compact_records_use_a_third_of_the_memory()
+    print("Result: compact records round-trip, share specs and decide like dict records")
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import pytest
+import master_auditor
+from master_auditor import MasterAuditor
+from incremental_audit import FingerprintStore
+from sampling_audit import SamplingAuditor
+from material_table import MaterialTable
+from test_sharded_audit import master_report
+from test_sampling_audit import auditable_catalog
+
+
+def test_forked_parallel_report_matches_sequential():
+    materials = auditable_catalog()[:2_000]
+    assert master_report(materials, 'grouped', parallel=True) == master_report(materials, 'grouped')
+
+
+def test_shared_memory_parallel_report_matches_sequential(monkeypatch):
+    materials = auditable_catalog()[:2_000]
+    sequential = master_report(materials, 'grouped')
+    # Without fork the materials travel to the workers as JSON in a shared-memory buffer
+    monkeypatch.setattr(master_auditor.multiprocessing, 'get_all_start_methods', lambda: ['spawn'])
+    assert master_report(materials, 'grouped', parallel=True) == sequential
+    table = MaterialTable.from_records([item for item in materials if item['SupplierName'] is not None])
+    assert master_report(table, 'grouped', parallel=True) == master_report(table, 'grouped')
+
+
+@pytest.mark.parametrize('mode', [{'shards': 2}, {'fingerprint_store': FingerprintStore(None)},
+                                  {'sampling_auditor': SamplingAuditor()}])
+def test_parallel_exclusive_with_other_modes(mode):
+    # Otherwise the other mode would run and the report would not say parallel was ignored
+    with pytest.raises(ValueError, match='cannot be combined'):
+        MasterAuditor().run_comprehensive_audit(auditable_catalog()[:10], parallel=True, **mode)
+
+
+def test_parallel_flag_exclusive_with_other_modes():
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'master_auditor.py')
+    result = subprocess.run([sys.executable, script, '--parallel', '--shards', '2'], capture_output=True, text=True)
+    assert result.returncode == 2
+    assert 'cannot be combined' in result.stderr
+
+
+if __name__ == "__main__":
+    print("Testing the parallel audit:\n")
+    test_forked_parallel_report_matches_sequential()
+    print("Result: forked parallel and sequential audits produce the same master report")
@@ -0,0 +1,128 @@
+import json
+import pytest
+from benchmark import synthetic_catalog, decision_pairs
+import evaluate_purchase
+from evaluate_purchase import (evaluate_purchase_batch, evaluate_purchase_pairs, decision_strings,
+                               set_procurement_rules, get_procurement_rules)
+from procurement_rules import ProcurementRules, load_rules
+from material_table import MaterialTable
+
+RULES = {
+    'approval_threshold': 1000,
+    'max_lead_time': 60,
+    'lead_time_action': 'reject',
+    'categories': {'AB-1': {'approval_threshold': 50}, 'CD-2': {'max_lead_time': 5}},
+    'suppliers': {'deny': ['Blocked Ltd']},
+}
+
+
+def item(price, grade='AB-1', lead_time=10, supplier='Acme'):
+    return {'Price': price, 'LeadTime': lead_time, 'SupplierName': supplier,
+            'TechnicalSpecs': {'grade': grade, 'density': 1.0}}
+
+
+@pytest.fixture
+def rules():
+    previous = get_procurement_rules()
+    yield set_procurement_rules
+    set_procurement_rules(previous)
+
+
+def test_default_rules_match_original_decisions():
+    decide = evaluate_purchase.evaluate_purchase
+    assert decide(item(999), item(5)) == 'APPROVED'
+    assert decide(item(1000), item(5)) == 'PENDING MANAGER'
+    assert decide(item(5, 'AB-1'), item(5, 'XY-9')) == 'REJECTED: Specs Mismatch'
+
+
+def test_rule_order_and_category_limits(rules):
+    rules(RULES)
+    # set_procurement_rules rebinds the module's function, so it is looked up after each change
+    decide = evaluate_purchase.evaluate_purchase
+    assert decide(item(60), item(5)) == 'PENDING MANAGER'
+    assert decide(item(60, 'EF-3'), item(5, 'EF-3')) == 'APPROVED'
+    assert decide(item(1, 'CD-2', lead_time=6), item(5, 'CD-2')) == 'REJECTED: Lead Time Exceeded'
+    assert decide(item(1, lead_time=61), item(5)) == 'REJECTED: Lead Time Exceeded'
+    assert decide(item(1, lead_time=61, supplier='Blocked Ltd'), item(5)) == 'REJECTED: Supplier Not Approved'
+    assert decide(item(1, supplier='Blocked Ltd'), item(5, 'XY-9')) == 'REJECTED: Specs Mismatch'
+
+    rules({'suppliers': {'allow': ['Acme']}, 'max_lead_time': 20})
+    decide = evaluate_purchase.evaluate_purchase
+    assert decide(item(1, supplier='Other'), item(5)) == 'REJECTED: Supplier Not Approved'
+    assert decide(item(1, lead_time=30), item(5)) == 'PENDING MANAGER'
+
+
+def test_batch_and_pairs_match_scalar_under_rules(rules):
+    materials = synthetic_catalog(2_000, seed=3)
+    grades = sorted({m['TechnicalSpecs']['grade'] for m in materials})
+    rules({'max_lead_time': 20, 'lead_time_action': 'reject',
+           'categories': {grade: {'approval_threshold': 300, 'max_lead_time': 10} for grade in grades[::3]},
+           'suppliers': {'deny': [materials[0]['SupplierName']]}})
+    pairs = decision_pairs(materials)
+    expected = [evaluate_purchase.evaluate_purchase(p, c) for p, c in pairs]
+    assert len(set(expected)) == 5
+    assert decision_strings(evaluate_purchase_batch([p for p, c in pairs], [c for p, c in pairs])) == expected
+
+    position = {id(m): i for i, m in enumerate(materials)}
+    table = MaterialTable.from_records(materials)
+    codes = evaluate_purchase_pairs(table, [position[id(p)] for p, c in pairs], [position[id(c)] for p, c in pairs])
+    assert decision_strings(codes) == expected
+
+
+def test_module_function_is_the_compiled_rule_set(rules):
+    rules({'approval_threshold': 10})
+    # Bound directly, with no wrapper call per decision
+    assert evaluate_purchase.evaluate_purchase is get_procurement_rules().decide
+    assert evaluate_purchase.evaluate_purchase(item(50), item(5)) == 'PENDING MANAGER'
+
+
+def test_rule_constants_stay_on_the_rule_set(rules):
+    rules(RULES)
+    rules(None)
+    assert 'DENIED_SUPPLIERS' not in vars(evaluate_purchase)
+    assert evaluate_purchase.evaluate_purchase(item(50, supplier='Blocked Ltd'), item(5)) == 'APPROVED'
+
+
+def test_price_audit_follows_active_rules(rules):
+    from resilience_auditor import ResilienceAuditor
+    materials = synthetic_catalog(1_000, seed=4)
+    rules({'approval_threshold': 200, 'max_lead_time': 10,
+           'suppliers': {'deny': [materials[0]['SupplierName']]}})
+    assert ResilienceAuditor().test_price_threshold_compliance(materials) == []
+
+
+def test_invalid_rules_rejected():
+    with pytest.raises(ValueError):
+        ProcurementRules({'approval_limit': 5})
+    with pytest.raises(ValueError):
+        ProcurementRules({'categories': {'A': {'threshold': 5}}})
+    with pytest.raises(ValueError):
+        ProcurementRules({'lead_time_action': 'ignore'})
+    with pytest.raises(ValueError):
+        ProcurementRules({'approval_threshold': '1000'})
+
+
+def test_load_json_and_yaml(tmp_path):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps(RULES))
+    assert ProcurementRules.from_file(str(path)).to_dict() == ProcurementRules(RULES).to_dict()
+    pytest.importorskip('yaml')
+    example = ProcurementRules.from_file('procurement_rules.example.yaml')
+    assert example.categories['HDPE'] == (500, 30)
+    assert load_rules('procurement_rules.example.yaml')['approval_threshold'] == 1000
+
+
+if __name__ == "__main__":
+    print("Testing configurable procurement rules:\n")
+    test_default_rules_match_original_decisions()
+    test_invalid_rules_rejected()
+    previous = get_procurement_rules()
+    try:
+        test_rule_order_and_category_limits(set_procurement_rules)
+        test_batch_and_pairs_match_scalar_under_rules(set_procurement_rules)
+        test_module_function_is_the_compiled_rule_set(set_procurement_rules)
+        test_rule_constants_stay_on_the_rule_set(set_procurement_rules)
+        test_price_audit_follows_active_rules(set_procurement_rules)
+    finally:
+        set_procurement_rules(previous)
+    print("Result: compiled rules agree across scalar, batch and pair evaluation")
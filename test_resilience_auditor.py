@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+from benchmark import synthetic_catalog
+from resilience_auditor import ResilienceAuditor
+from substitute_index import spec_key
+from inventory_loader import iter_chunks, load_materials
+from material_table import MaterialTable
+
+
+def test_grouped_counts_match_exhaustive():
+    materials = synthetic_catalog(400, seed=2)
+    exhaustive = ResilienceAuditor('exhaustive').test_spec_matching_accuracy(materials)
+    grouped = ResilienceAuditor('grouped', pair_sample_size=50, seed=1).test_spec_matching_accuracy(materials)
+    assert grouped['mode'] == 'grouped'
+    assert grouped['total_tests'] == exhaustive['total_tests']
+    assert grouped['correct'] == exhaustive['correct']
+    same_specs = sum(spec_key(a['TechnicalSpecs']) == spec_key(b['TechnicalSpecs'])
+                     for k, a in enumerate(materials) for b in materials[k + 1:])
+    assert grouped['expected_matches'] == same_specs
+
+
+def test_within_group_sample_is_bounded():
+    # Many groups of three: a per-group budget would check every one of their pairs
+    materials = [dict(item, TechnicalSpecs={'grade': f'G-{k // 3}'}) for k, item in
+                 enumerate(synthetic_catalog(3_000, seed=3))]
+    auditor = ResilienceAuditor('grouped', pair_sample_size=100, seed=4)
+    groups = {}
+    for position, item in enumerate(materials):
+        groups.setdefault(spec_key(item['TechnicalSpecs']), []).append(position)
+    plan = auditor.plan_grouped_pairs(materials, list(groups.values()), len(groups))
+    assert plan['expected_matches'] == 3_000
+    assert len(plan['within_pairs']) == 100
+    assert len(set(plan['within_pairs'])) == 100
+    assert all(a < b and spec_key(materials[a]['TechnicalSpecs']) == spec_key(materials[b]['TechnicalSpecs'])
+               for a, b in plan['within_pairs'])
+    assert len(plan['cross_pairs']) <= 100
+
+
+def test_streamed_low_stock_detection_matches_loaded(tmp_path):
+    path = str(tmp_path / 'catalog.json')
+    with open(path, 'w') as f:
+        json.dump(synthetic_catalog(1_000, seed=5), f)
+    auditor = ResilienceAuditor()
+    expected = auditor.test_low_stock_detection(load_materials(path))
+    assert expected['critical_stock_count'] > 0
+    for chunk_size in (1, 7, 1_000, 5_000):
+        assert auditor.test_low_stock_detection_from_chunks(iter_chunks(path, chunk_size)) == expected
+        tables = (MaterialTable.from_records(chunk) for chunk in iter_chunks(path, chunk_size))
+        assert auditor.test_low_stock_detection_from_chunks(tables) == expected
+
+
+def test_low_stock_cli_streams_the_catalog(tmp_path):
+    path = str(tmp_path / 'catalog.json')
+    with open(path, 'w') as f:
+        json.dump(synthetic_catalog(300, seed=6), f)
+    expected = ResilienceAuditor().test_low_stock_detection(load_materials(path))
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for script, flag in (('resilience_auditor.py', '--low-stock-only'), ('simulation.py', '--low-stock')):
+        result = subprocess.run([sys.executable, os.path.join(directory, script), flag, '--materials', path],
+                                capture_output=True, text=True, check=True, cwd=tmp_path)
+        assert f"Low Stock Items: {expected['low_stock_count']}" in result.stdout
+        assert f"Critical Items: {expected['critical_stock_count']}" in result.stdout
+    assert os.listdir(tmp_path) == ['catalog.json']
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    print("Testing grouped spec matching and low-stock detection:\n")
+    test_grouped_counts_match_exhaustive()
+    test_within_group_sample_is_bounded()
+    with tempfile.TemporaryDirectory() as directory:
+        test_streamed_low_stock_detection_matches_loaded(pathlib.Path(directory))
+    with tempfile.TemporaryDirectory() as directory:
+        test_low_stock_cli_streams_the_catalog(pathlib.Path(directory))
+    print("Result: grouped mode agrees with exhaustive counts, and streamed low-stock detection matches the loaded catalog")
@@ -0,0 +1,114 @@
+from ask_claude import ask_claude, set_response_cache, MODEL_ID
+from fake_bedrock import FakeBedrockClient
+from response_cache import ResponseCache, read_cache_stats
+
+
+class Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def tick(self, seconds=1.0):
+        self.now += seconds
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = ResponseCache(path=None, ttl=60, clock=clock)
+    cache.set('k', 'v')
+    clock.tick(60)
+    assert cache.get('k') == 'v'
+    clock.tick(1)
+    assert cache.get('k') is None
+    assert 'k' not in cache.memory
+
+
+def test_disk_tier_honours_ttl(tmp_path):
+    clock = Clock()
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), memory_size=0, ttl=60, clock=clock)
+    cache.set('k', 'v')
+    clock.tick(61)
+    assert cache.get('k') is None
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_memory_tier_is_lru():
+    cache = ResponseCache(path=None, memory_size=2, clock=Clock())
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert list(cache.memory) == ['a', 'c']
+    assert cache.get('b') is None
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    clock = Clock()
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'), memory_size=0, max_entries=3, clock=clock)
+    for key in 'abc':
+        cache.set(key, key.upper())
+        clock.tick()
+    assert cache.get('a') == 'A'
+    clock.tick()
+    cache.set('d', 'D')
+    assert len(cache) == 3
+    assert cache.evictions == 1
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['A', 'C', 'D']
+    cache.close()
+
+
+def test_persists_entries_and_counters_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = ResponseCache(path)
+    cache.set('k', 'v')
+    assert cache.get('k') == 'v'
+    assert cache.get('missing') is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['memory_hits'] == 1
+    cache.close()
+
+    cache = ResponseCache(path)
+    assert cache.get('k') == 'v'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['disk_hits'], stats['memory_hits']) == (1, 0, 1, 0)
+    assert stats['hit_rate'] == 1.0
+    assert cache.get('k') == 'v'
+    assert cache.stats()['memory_hits'] == 1
+    cache.close()
+    assert read_cache_stats(path) == {'hits': 3, 'misses': 1, 'hit_rate': 0.75}
+
+
+def test_ask_claude_returns_cached_response():
+    client = FakeBedrockClient(response_text='fresh')
+    cache = ResponseCache(path=None)
+    set_response_cache(cache)
+    try:
+        assert ask_claude('prompt', client) == 'fresh'
+        client.response_text = 'changed'
+        assert ask_claude('prompt', client) == 'fresh'
+        assert client.calls == 1
+        assert ask_claude('prompt', client, max_tokens=10) == 'changed'
+        assert client.calls == 2
+    finally:
+        set_response_cache(None)
+    assert cache.get(cache.make_key(MODEL_ID, 'prompt', 1000)) == 'fresh'
+    assert cache.stats()['hits'] == 2
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    print("Testing the response cache:\n")
+    test_entries_expire_after_ttl()
+    test_memory_tier_is_lru()
+    with tempfile.TemporaryDirectory() as directory:
+        for test in (test_disk_tier_honours_ttl, test_disk_tier_evicts_least_recently_used,
+                     test_persists_entries_and_counters_across_instances):
+            subdirectory = pathlib.Path(directory) / test.__name__
+            subdirectory.mkdir()
+            test(subdirectory)
+    test_ask_claude_returns_cached_response()
+    print("Result: TTL, LRU, eviction, persistence and the ask_claude hook behave as expected")
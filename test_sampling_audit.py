@@ -0,0 +1,117 @@
+import contextlib
+import io
+import json
+from test_compliance_validator import dirty_catalog
+from compliance_validator import ComplianceValidator
+from resilience_auditor import ResilienceAuditor
+from master_auditor import MasterAuditor
+from sampling_audit import SamplingAuditor, sample_size, wilson_interval
+from substitute_index import spec_key
+
+
+def auditable_catalog():
+    # The resilience audit needs a SupplierName key on every record
+    materials = dirty_catalog(6_000, seed=9)
+    for item in materials:
+        item.setdefault('SupplierName', None)
+    return materials
+
+
+def test_sample_size_and_interval():
+    assert sample_size(0.01) == 9604
+    assert sample_size(0.01, population=1_000) < 1_000
+    assert sample_size(0.5, population=3) <= 3
+    low, high = wilson_interval(5, 100)
+    assert low < 0.05 < high
+    assert wilson_interval(5, 100, population=100) == (0.05, 0.05)
+    assert wilson_interval(5, 100, population=200)[1] < high
+
+
+def test_estimates_cover_true_rates():
+    materials = auditable_catalog()
+    report = SamplingAuditor(margin=0.02, seed=1).generate_sampling_report(materials)
+    estimates = report['estimates']
+    assert report['sampling']['sampled_items'] < len(materials)
+
+    validator = ComplianceValidator()
+    true_rates = {
+        'data_integrity': sum(bool(validator.item_integrity_violations(item)) for item in materials),
+        'business_rules': sum(bool(validator.item_rule_findings(item)[0]) for item in materials),
+        'lead_time_warnings': sum(bool(validator.item_rule_findings(item)[1]) for item in materials),
+    }
+    for name, violations in true_rates.items():
+        assert estimates[name]['ci_low'] <= violations / len(materials) <= estimates[name]['ci_high'], name
+        assert estimates[name]['ci_high'] - estimates[name]['ci_low'] <= 2 * 0.02
+
+    coverage = ResilienceAuditor().test_substitute_availability(materials)['substitute_coverage']
+    low, high = report['resilience']['substitute_analysis']['confidence_interval']
+    assert low <= coverage <= high
+    assert estimates['spec_matching_errors']['violations'] == 0
+
+
+def test_pair_strata_are_uniform_within_their_stratum():
+    import random
+    materials = auditable_catalog()
+    groups = {}
+    for position, item in enumerate(materials):
+        groups.setdefault(spec_key(item['TechnicalSpecs']), []).append(position)
+    group_of = {p: key for key, positions in groups.items() for p in positions}
+    auditor = SamplingAuditor(margin=0.05)
+    within = auditor.sample_within_pairs(list(groups.values()), random.Random(0))
+    cross = auditor.sample_cross_pairs(list(groups.values()), len(materials), random.Random(0))
+    assert within and all(group_of[a] == group_of[b] and a != b for a, b in within)
+    assert cross and all(group_of[a] != group_of[b] for a, b in cross)
+    # Drawn without replacement, sized with the finite population correction
+    cross_population = len(materials) * (len(materials) - 1) // 2 - sum(
+        len(g) * (len(g) - 1) // 2 for g in groups.values())
+    assert len(set(map(frozenset, cross))) == len(cross) == auditor.size_for(cross_population)
+    assert len(set(map(frozenset, within))) == len(within)
+
+
+def test_small_strata_are_enumerated_exactly():
+    import random
+    materials = auditable_catalog()[:120]
+    groups = {}
+    for position, item in enumerate(materials):
+        groups.setdefault(spec_key(item['TechnicalSpecs']), []).append(position)
+    group_of = {p: key for key, positions in groups.items() for p in positions}
+    all_pairs = [(a, b) for a in range(len(materials)) for b in range(a + 1, len(materials))]
+
+    auditor = SamplingAuditor(margin=0.01)
+    within = auditor.sample_within_pairs(list(groups.values()), random.Random(0))
+    cross = auditor.sample_cross_pairs(list(groups.values()), len(materials), random.Random(0))
+    assert sorted(map(sorted, within)) == [list(pair) for pair in all_pairs if group_of[pair[0]] == group_of[pair[1]]]
+    assert sorted(map(sorted, cross)) == [list(pair) for pair in all_pairs if group_of[pair[0]] != group_of[pair[1]]]
+
+    spec_matching, errors = auditor.audit_spec_matching(materials, list(groups.values()), random.Random(0))
+    assert spec_matching['sampled_pairs'] == spec_matching['total_tests'] == len(all_pairs)
+    assert spec_matching['confidence_interval'] == [spec_matching['accuracy']] * 2
+    assert errors['ci_low'] == errors['rate'] == errors['ci_high']
+
+
+def test_seeded_sample_is_reproducible():
+    materials = auditable_catalog()
+    first = SamplingAuditor(margin=0.05, seed=3).generate_sampling_report(materials)
+    second = SamplingAuditor(margin=0.05, seed=3).generate_sampling_report(materials)
+    assert first['estimates'] == second['estimates']
+
+
+def test_master_audit_sampled_mode():
+    with open('raw_materials.json', 'r') as f:
+        materials = json.load(f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = MasterAuditor().run_comprehensive_audit(materials, sampling_auditor=SamplingAuditor(margin=0.05))
+    assert report['audit_timings']['mode'] == 'sampled'
+    assert report['statistical_audit']['total_items'] == len(materials)
+    assert 'decision_logic' in report['detailed_reports']['compliance']['estimates']
+
+
+if __name__ == "__main__":
+    print("Testing the sampling audit mode:\n")
+    test_sample_size_and_interval()
+    test_estimates_cover_true_rates()
+    test_pair_strata_are_uniform_within_their_stratum()
+    test_small_strata_are_enumerated_exactly()
+    test_seeded_sample_is_reproducible()
+    test_master_audit_sampled_mode()
+    print("Result: sampled estimates and their confidence intervals cover the exact audit results")
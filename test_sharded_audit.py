@@ -0,0 +1,49 @@
+import collections
+import os
+import subprocess
+import sys
+from master_auditor import MasterAuditor
+from resilience_auditor import ResilienceAuditor
+from evaluate_purchase import set_procurement_rules
+from test_incremental_audit import comparable
+from test_sampling_audit import auditable_catalog
+
+
+def master_report(materials, spec_matching_mode, **kwargs):
+    auditor = MasterAuditor()
+    auditor.resilience_auditor = ResilienceAuditor(spec_matching_mode, seed=3)
+    return comparable(auditor.run_comprehensive_audit(materials, **kwargs))
+
+
+def test_grouped_sharded_report_matches_sequential():
+    materials = auditable_catalog()
+    # Denying a supplier makes matching pairs disagree with their decisions, so pair violations are merged too
+    supplier = collections.Counter(item['SupplierName'] for item in materials).most_common(1)[0][0]
+    set_procurement_rules({'suppliers': {'deny': [supplier]}})
+    try:
+        sharded = master_report(materials, 'grouped', shards=5, workers=2)
+        assert sharded == master_report(materials, 'grouped')
+    finally:
+        set_procurement_rules(None)
+    assert sharded['detailed_reports']['resilience']['compliance_violations']
+    assert sharded['detailed_reports']['compliance']['total_violations']
+
+
+def test_exhaustive_sharded_report_matches_sequential():
+    materials = auditable_catalog()[:300]
+    assert master_report(materials, 'exhaustive', shards=3, workers=2) == master_report(materials, 'exhaustive')
+
+
+def test_shards_exclusive_with_other_modes():
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'master_auditor.py')
+    result = subprocess.run([sys.executable, script, '--shards', '4', '--incremental'],
+                            capture_output=True, text=True)
+    assert result.returncode == 2
+    assert 'cannot be combined' in result.stderr
+
+
+if __name__ == "__main__":
+    print("Testing the sharded audit:\n")
+    test_grouped_sharded_report_matches_sequential()
+    test_exhaustive_sharded_report_matches_sequential()
+    print("Result: sharded and single-process audits produce the same master report")
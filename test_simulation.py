@@ -0,0 +1,64 @@
+import math
+import random
+import numpy as np
+from benchmark import synthetic_catalog
+from simulation import simulate_stockouts, best_substitutes, forecast_stockouts
+
+
+def test_matches_normal_tail_without_lead_time_variability():
+    # Deliveries after the horizon: consumption over 30 days is normal, mean 30 and sd 0.3 * sqrt(30)
+    probability = simulate_stockouts([33] * 20, [60] * 20, horizon=30, trials=20_000, demand_cv=0.3,
+                                     lead_time_cv=0, seed=1)
+    expected = 0.5 * math.erfc((33 - 30) / (0.3 * math.sqrt(30)) / math.sqrt(2))
+    assert abs(probability.mean() - expected) < 0.005
+
+
+def test_risk_ordering_and_edge_cases():
+    probability = simulate_stockouts([2, 10, 40, 10, 0], [30, 30, 30, 3, 30], trials=5_000, seed=2)
+    assert probability[0] > probability[1] > probability[2]
+    assert probability[3] < probability[1]
+    assert probability[4] == 1.0
+
+
+def test_chunk_size_does_not_change_result():
+    days, lead = np.arange(50), np.arange(50) + 5
+    small = simulate_stockouts(days, lead, trials=2_000, seed=3, chunk_elements=5_000)
+    assert np.array_equal(small, simulate_stockouts(days, lead, trials=2_000, seed=3, chunk_elements=10 ** 7))
+
+
+def test_best_substitutes_match_linear_scan():
+    rng = random.Random(4)
+    groups = [rng.randrange(30) for _ in range(500)]
+    suppliers = [rng.randrange(4) for _ in range(500)]
+    risk = [rng.choice((0.0, 0.1, 0.5, 1.0)) for _ in range(500)]
+    substitutes = best_substitutes(np.array(groups), np.array(suppliers), np.array(risk)).tolist()
+    for i in range(500):
+        others = [j for j in range(500) if groups[j] == groups[i] and suppliers[j] != suppliers[i]]
+        assert substitutes[i] == (min(others, key=lambda j: (risk[j], j)) if others else -1)
+
+
+def test_forecast_reports_switches():
+    materials = synthetic_catalog(2_000, seed=5)
+    report = forecast_stockouts(materials, trials=500, seed=6)
+    items = report['items']
+    assert report['summary']['total_items'] == len(items) == len(materials)
+    assert report['summary']['switches_lowering_risk'] == sum(item['switch_lowers_risk'] for item in items)
+    by_sku = {item['SKU']: item for item in materials}
+    for item in items:
+        if item['substitute_sku'] is None:
+            assert not item['switch_lowers_risk']
+            continue
+        substitute = by_sku[item['substitute_sku']]
+        assert substitute['TechnicalSpecs'] == by_sku[item['sku']]['TechnicalSpecs']
+        assert substitute['SupplierName'] != by_sku[item['sku']]['SupplierName']
+        assert item['switch_lowers_risk'] == (item['substitute_stockout_probability'] < item['stockout_probability'])
+
+
+if __name__ == "__main__":
+    print("Testing the stockout forecast:\n")
+    test_matches_normal_tail_without_lead_time_variability()
+    test_risk_ordering_and_edge_cases()
+    test_chunk_size_does_not_change_result()
+    test_best_substitutes_match_linear_scan()
+    test_forecast_reports_switches()
+    print("Result: Monte Carlo stockout probabilities and substitute switches check out")
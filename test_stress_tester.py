@@ -0,0 +1,55 @@
+import json
+import tracemalloc
+from stress_tester import StressTester
+from material_table import MaterialTable
+
+with open('raw_materials.json', 'r') as f:
+    MATERIALS = json.load(f)
+
+STAGES = ['load', 'low_stock_filter', 'substitute_search', 'audits']
+
+
+def test_memory_profile_covers_every_stage_and_size():
+    result = StressTester().test_memory_usage(MATERIALS, scales=(1, 10, 40))
+    assert result['sizes'] == [50, 500, 2000]
+    # Allocation sites are collected at the middle size
+    assert result['profiles'][1]['stages'][0]['top_allocations'][0]['size_bytes'] > 0
+    for profile in result['profiles']:
+        assert [stage['stage'] for stage in profile['stages']] == STAGES
+        assert profile['peak_bytes'] >= profile['retained_bytes'] > 0
+    # Parsing the catalog dominates, and memory grows with the number of items
+    load = [profile['stages'][0]['retained_bytes'] for profile in result['profiles']]
+    assert load[0] < load[1] < load[2]
+    assert result['projected_peak_mb'][1_000_000] > result['projected_peak_mb'][100_000] > 0
+    assert result['status'] == 'passed'
+
+
+def test_memory_profile_caps_dataset_size():
+    result = StressTester().test_memory_usage(MATERIALS, scales=(1, 10, 100), max_items=3000, top_n=0)
+    assert result['sizes'] == [30, 300, 3000]
+    assert all(not stage['top_allocations'] for profile in result['profiles'] for stage in profile['stages'])
+
+
+def test_memory_profile_accepts_material_table():
+    result = StressTester().test_memory_usage(MaterialTable.from_records(MATERIALS), scales=(1, 4))
+    assert result['sizes'] == [50, 200]
+
+
+def test_memory_profile_leaves_outer_tracing_running():
+    tracemalloc.start()
+    try:
+        result = StressTester().test_memory_usage(MATERIALS, scales=(1,))
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert result['profiles'][0]['peak_bytes'] is None
+    assert result['profiles'][0]['retained_bytes'] > 0
+
+
+if __name__ == "__main__":
+    print("Testing the StressTester memory profile:\n")
+    test_memory_profile_covers_every_stage_and_size()
+    test_memory_profile_caps_dataset_size()
+    test_memory_profile_accepts_material_table()
+    test_memory_profile_leaves_outer_tracing_running()
+    print("Result: per-stage tracemalloc profiles recorded at every dataset size")
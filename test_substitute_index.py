@@ -0,0 +1,52 @@
+import random
+from substitute_index import SubstituteIndex, spec_key
+
+
+def linear_substitute(materials, item):
+    """The original scan: first item with identical specs from a different supplier"""
+    return next((other for other in materials
+                 if other['TechnicalSpecs'] == item['TechnicalSpecs']
+                 and other['SupplierName'] != item['SupplierName']), None)
+
+
+def mixed_catalog(count=600, seed=1):
+    rng = random.Random(seed)
+    specs = [{'grade': f'G-{k}', 'density': 2.7} for k in range(20)]
+    # Unhashable values sort fine but need the JSON fallback key
+    specs += [{'grade': 'L', 'tolerances': [0.1, 0.2]}, {'grade': 'D', 'finish': {'type': 'anodized'}}]
+    return [{'SKU': f'SKU-{i}', 'SupplierName': rng.choice(['Acme', 'Bolt', 'Core']),
+             'TechnicalSpecs': dict(rng.choice(specs))} for i in range(count)]
+
+
+def test_unhashable_specs_fall_back_to_json_key():
+    key = spec_key({'grade': 'L', 'tolerances': [0.1, 0.2]})
+    assert isinstance(key, str)
+    assert key == spec_key({'tolerances': [0.1, 0.2], 'grade': 'L'})
+    assert spec_key({'b': 1, 'a': 2}) == (('a', 2), ('b', 1))
+
+
+def test_index_matches_linear_scan():
+    materials = mixed_catalog()
+    index = SubstituteIndex(materials)
+    for item in materials:
+        # Identity, not just equality: the first match in catalog order from another supplier
+        assert index.find_substitute(item) is linear_substitute(materials, item)
+        assert index.substitutes_for(item) == [other for other in materials
+                                               if other['TechnicalSpecs'] == item['TechnicalSpecs']
+                                               and other['SupplierName'] != item['SupplierName']]
+
+
+def test_same_supplier_group_has_no_substitute():
+    materials = [{'SKU': f'SKU-{i}', 'SupplierName': 'Acme', 'TechnicalSpecs': {'grade': 'X'}} for i in range(3)]
+    index = SubstituteIndex(materials)
+    assert all(index.find_substitute(item) is None for item in materials)
+    assert index.find_substitute_for_sku('SKU-1') is None
+    assert index.find_substitute_for_sku('missing') is None
+
+
+if __name__ == "__main__":
+    print("Testing the substitute index:\n")
+    test_unhashable_specs_fall_back_to_json_key()
+    test_index_matches_linear_scan()
+    test_same_supplier_group_has_no_substitute()
+    print("Result: the hash index returns the same substitutes as the linear scan")
@@ -0,0 +1,50 @@
+import json
+import os
+import pytest
+from visual_report_generator import VisualReportGenerator, PANELS
+
+pytest.importorskip('matplotlib')
+pytest.importorskip('seaborn')
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'master_audit_report.json')) as f:
+    REPORT = json.load(f)
+
+
+def test_headless_dashboard_skips_unchanged_report(tmp_path):
+    output = str(tmp_path / 'dashboard.png')
+    first = VisualReportGenerator(report=REPORT).create_dashboard(output, dpi=40, headless=True)
+    assert not first['skipped'] and os.path.getsize(output) > 0
+
+    again = VisualReportGenerator(report=REPORT).create_dashboard(output, dpi=40, headless=True)
+    assert again['skipped'] and again['report_hash'] == first['report_hash']
+
+    # New options or a changed report are rendered again
+    assert not VisualReportGenerator(report=REPORT).create_dashboard(output, dpi=50, headless=True)['skipped']
+    changed = dict(REPORT, overall_health_score=REPORT['overall_health_score'] - 1)
+    assert not VisualReportGenerator(report=changed).create_dashboard(output, dpi=50, headless=True)['skipped']
+
+
+def test_vector_format_output(tmp_path):
+    output = str(tmp_path / 'dashboard.svg')
+    result = VisualReportGenerator(report=REPORT).create_dashboard(output, headless=True, parallel=True)
+    assert result['format'] == 'svg' and result['mode'] == 'single'
+    with open(output) as f:
+        assert '<svg' in f.read(1000)
+
+
+def test_panels_rendered_in_worker_processes(tmp_path):
+    result = VisualReportGenerator(report=REPORT).render_panels(str(tmp_path), dpi=30, workers=2)
+    assert [os.path.basename(path) for path in result['files']] == [f"{name}.png" for name, *_ in PANELS]
+    assert all(os.path.getsize(path) > 0 for path in result['files'])
+    assert VisualReportGenerator(report=REPORT).render_panels(str(tmp_path), dpi=30, workers=2)['skipped']
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    print("Testing headless dashboard rendering:\n")
+    for test in (test_headless_dashboard_skips_unchanged_report, test_vector_format_output,
+                 test_panels_rendered_in_worker_processes):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("Result: dashboards render headless, in parallel, in any format, and only when the report changes")
@@ -1,65 +1,184 @@
+import argparse
+import hashlib
 import json
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import matplotlib.patches as patches
+
+DEFAULT_REPORT_PATH = 'master_audit_report.json'
+DEFAULT_DASHBOARD_PATH = 'audit_dashboard.png'
+DEFAULT_PANELS_DIR = 'audit_dashboard_panels'
+DEFAULT_DPI = 300
+# Formats whose panels can be rendered separately and composed into the dashboard afterwards
+RASTER_FORMATS = ('png', 'jpg', 'jpeg')
+
+# (panel name, drawing method, dashboard grid row, first column, last column + 1)
+PANELS = (
+    ('health_gauge', 'create_health_gauge', 0, 0, 1),
+    ('component_scores', 'create_component_scores', 0, 1, 3),
+    ('risk_indicator', 'create_risk_indicator', 0, 3, 4),
+    ('stock_analysis', 'create_stock_analysis', 1, 0, 2),
+    ('stress_test_results', 'create_stress_test_results', 1, 2, 4),
+    ('critical_findings', 'create_critical_findings', 2, 0, 2),
+    ('compliance_summary', 'create_compliance_summary', 2, 2, 4),
+    ('metrics_table', 'create_metrics_table', 3, 0, 4),
+)
+DASHBOARD_SIZE = (20, 16)
+GRID_CELL_SIZE = (DASHBOARD_SIZE[0] / 4, DASHBOARD_SIZE[1] / 4)
+
+def load_pyplot(headless=False):
+    """Import matplotlib and seaborn on first use and apply the dashboard style.
+
+    They take up to a few seconds to import, so loading the report or
+    importing this module never pays for them. headless forces the Agg
+    backend, which needs no display.
+    """
+    if headless:
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    return plt
+
+def report_hash(report):
+    """Content hash of an audit report; the dashboard is only re-rendered when it changes"""
+    return hashlib.sha256(json.dumps(report, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def output_format(path, fmt=None):
+    return (fmt or os.path.splitext(path)[1][1:] or 'png').lower()
+
+def _render_state_path(output):
+    if os.path.isdir(output):
+        return os.path.join(output, 'render.json')
+    return output + '.render.json'
+
+def _load_render_state(output):
+    try:
+        with open(_render_state_path(output), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _render_panel_job(report, name, path, dpi, fmt):
+    """Process pool entry point: render one panel from a plain report dict"""
+    return VisualReportGenerator(report=report).render_panel(name, path, dpi, fmt)
 
 class VisualReportGenerator:
-    def __init__(self, report_file='master_audit_report.json'):
-        with open(report_file, 'r') as f:
-            self.report = json.load(f)
-        
-        # Set style
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
-        
-    def create_dashboard(self):
-        """Create comprehensive dashboard with multiple visualizations"""
-        fig = plt.figure(figsize=(20, 16))
+    def __init__(self, report_file=DEFAULT_REPORT_PATH, report=None):
+        if report is None:
+            with open(report_file, 'r') as f:
+                report = json.load(f)
+        self.report = report
+        self.report_hash = report_hash(report)
+
+    def _is_current(self, output, state, files):
+        """True if output was last rendered from the same report with the same options"""
+        previous = _load_render_state(output)
+        return (previous is not None and previous.get('report_hash') == self.report_hash
+                and all(previous.get(key) == value for key, value in state.items())
+                and all(os.path.exists(path) for path in files))
+
+    def _save_render_state(self, output, state, files):
+        record = dict(state, report_hash=self.report_hash, files=files, rendered_at=datetime.now().isoformat())
+        with open(_render_state_path(output), 'w') as f:
+            json.dump(record, f, indent=2)
+        return record
+        
+    def render_panel(self, name, path, dpi=DEFAULT_DPI, fmt=None):
+        """Render one dashboard panel on its own figure, sized like its slot in the dashboard grid"""
+        plt = load_pyplot(headless=True)
+        for panel, method, row, first, last in PANELS:
+            if panel == name:
+                break
+        else:
+            raise ValueError(f"Unknown dashboard panel: {name}")
+        fig, ax = plt.subplots(figsize=(GRID_CELL_SIZE[0] * (last - first), GRID_CELL_SIZE[1]))
+        getattr(self, method)(ax)
+        fig.savefig(path, dpi=dpi, format=output_format(path, fmt), bbox_inches='tight')
+        plt.close(fig)
+        return path
+
+    def render_panels(self, output_dir=DEFAULT_PANELS_DIR, dpi=DEFAULT_DPI, fmt='png', workers=None, force=False):
+        """Render every panel to its own image in output_dir, one worker process per panel.
+
+        Returns the render record, with skipped=True if the images already
+        match this report and these options.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        fmt = output_format('', fmt)
+        files = [os.path.join(output_dir, f"{name}.{fmt}") for name, *_ in PANELS]
+        state = {'mode': 'panels', 'dpi': dpi, 'format': fmt}
+        if not force and self._is_current(output_dir, state, files):
+            return dict(_load_render_state(output_dir), skipped=True)
+
+        self._render_panel_files(files, dpi, fmt, workers)
+        return dict(self._save_render_state(output_dir, state, files), skipped=False)
+
+    def _render_panel_files(self, files, dpi, fmt, workers):
+        workers = min(workers or os.cpu_count() or 1, len(PANELS))
+        jobs = [(name, path) for (name, *_), path in zip(PANELS, files)]
+        if workers == 1:
+            for name, path in jobs:
+                self.render_panel(name, path, dpi, fmt)
+            return
+        # Spawned workers start without the parent's matplotlib state, so each one sets up Agg itself
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(_render_panel_job, self.report, name, path, dpi, fmt) for name, path in jobs]
+            for future in futures:
+                future.result()
+
+    def create_dashboard(self, output=DEFAULT_DASHBOARD_PATH, dpi=DEFAULT_DPI, fmt=None, headless=False,
+                         parallel=False, workers=None, force=False):
+        """Create comprehensive dashboard with multiple visualizations.
+
+        parallel renders the panels in worker processes and composes the
+        images afterwards (raster formats only; vector formats are drawn on
+        one figure). Rendering is skipped when output was already produced
+        from this report with the same options, unless force is set.
+        Returns the render record.
+        """
+        fmt = output_format(output, fmt)
+        parallel = parallel and fmt in RASTER_FORMATS
+        state = {'mode': 'parallel' if parallel else 'single', 'dpi': dpi, 'format': fmt}
+        if not force and self._is_current(output, state, [output]):
+            return dict(_load_render_state(output), skipped=True)
+
+        plt = load_pyplot(headless)
+        fig = plt.figure(figsize=DASHBOARD_SIZE)
         fig.suptitle('Procurement Agent Audit Dashboard', fontsize=24, fontweight='bold', y=0.98)
         
         # Create grid layout
         gs = fig.add_gridspec(4, 4, hspace=0.3, wspace=0.3)
-        
-        # 1. Overall Health Score Gauge
-        ax1 = fig.add_subplot(gs[0, 0])
-        self.create_health_gauge(ax1)
-        
-        # 2. Component Scores Bar Chart
-        ax2 = fig.add_subplot(gs[0, 1:3])
-        self.create_component_scores(ax2)
-        
-        # 3. Risk Level Indicator
-        ax3 = fig.add_subplot(gs[0, 3])
-        self.create_risk_indicator(ax3)
-        
-        # 4. Stock Analysis
-        ax4 = fig.add_subplot(gs[1, 0:2])
-        self.create_stock_analysis(ax4)
-        
-        # 5. Stress Test Results
-        ax5 = fig.add_subplot(gs[1, 2:4])
-        self.create_stress_test_results(ax5)
-        
-        # 6. Critical Findings
-        ax6 = fig.add_subplot(gs[2, 0:2])
-        self.create_critical_findings(ax6)
-        
-        # 7. Compliance Summary
-        ax7 = fig.add_subplot(gs[2, 2:4])
-        self.create_compliance_summary(ax7)
-        
-        # 8. Key Metrics Table
-        ax8 = fig.add_subplot(gs[3, 0:4])
-        self.create_metrics_table(ax8)
+
+        if parallel:
+            with tempfile.TemporaryDirectory() as panel_dir:
+                files = [os.path.join(panel_dir, f"{name}.png") for name, *_ in PANELS]
+                self._render_panel_files(files, dpi, 'png', workers)
+                for (name, method, row, first, last), path in zip(PANELS, files):
+                    ax = fig.add_subplot(gs[row, first:last])
+                    ax.imshow(plt.imread(path))
+                    ax.axis('off')
+        else:
+            for name, method, row, first, last in PANELS:
+                getattr(self, method)(fig.add_subplot(gs[row, first:last]))
         
         plt.tight_layout()
-        plt.savefig('audit_dashboard.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        plt.savefig(output, dpi=dpi, format=fmt, bbox_inches='tight')
+        if headless:
+            plt.close(fig)
+        else:
+            plt.show()
+        return dict(self._save_render_state(output, state, [output]), skipped=False)
         
     def create_health_gauge(self, ax):
         """Create health score gauge"""
+        import numpy as np
+        
         score = self.report['overall_health_score']
         
         # Create gauge
@@ -107,7 +226,9 @@ class VisualReportGenerator:
         risk_level = self.report['risk_level']
         colors = {'LOW': 'green', 'MEDIUM': 'orange', 'HIGH': 'red'}
         
-        circle = plt.Circle((0.5, 0.5), 0.4, color=colors[risk_level], alpha=0.7)
+        from matplotlib.patches import Circle
+        
+        circle = Circle((0.5, 0.5), 0.4, color=colors[risk_level], alpha=0.7)
         ax.add_patch(circle)
         
         ax.text(0.5, 0.5, risk_level, ha='center', va='center', 
@@ -178,7 +299,6 @@ class VisualReportGenerator:
             severity_counts = {s: severities.count(s) for s in set(severities)}
             
             colors = {'high': 'red', 'medium': 'orange', 'low': 'yellow'}
-            y_pos = np.arange(len(severity_counts))
             
             bars = ax.barh(list(severity_counts.keys()), list(severity_counts.values()), 
                           color=[colors[s] for s in severity_counts.keys()], alpha=0.7)
@@ -212,7 +332,7 @@ class VisualReportGenerator:
         
         ax.set_ylabel('Violations')
         ax.set_title('Compliance Violations', fontweight='bold')
-        ax.set_xticklabels(categories, rotation=45, ha='right')
+        ax.set_xticks(range(len(categories)), categories, rotation=45, ha='right')
         ax.grid(axis='y', alpha=0.3)
         
     def create_metrics_table(self, ax):
@@ -253,6 +373,27 @@ class VisualReportGenerator:
         ax.axis('off')
 
 if __name__ == "__main__":
-    generator = VisualReportGenerator()
-    generator.create_dashboard()
-    print("Visual audit dashboard saved as 'audit_dashboard.png'")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Render the audit dashboard from a master audit report')
+    parser.add_argument('--report', default=DEFAULT_REPORT_PATH)
+    parser.add_argument('--output', default=DEFAULT_DASHBOARD_PATH)
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI)
+    parser.add_argument('--format', default=None, help='png, jpg, svg, pdf, ... (default: from --output)')
+    parser.add_argument('--headless', action='store_true', help='Force the Agg backend and do not open a window')
+    parser.add_argument('--parallel', action='store_true', help='Render panels in worker processes and compose them')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--panels-dir', default=None, help='Write each panel as a separate image here instead')
+    parser.add_argument('--force', action='store_true', help='Re-render even if the report is unchanged')
+    args = parser.parse_args()
+
+    generator = VisualReportGenerator(args.report)
+    if args.panels_dir:
+        result = generator.render_panels(args.panels_dir, args.dpi, args.format or 'png', args.workers, args.force)
+        target = f"{len(result['files'])} panels in '{args.panels_dir}'"
+    else:
+        result = generator.create_dashboard(args.output, args.dpi, args.format, args.headless, args.parallel,
+                                            args.workers, args.force)
+        target = f"'{args.output}'"
+    if result['skipped']:
+        print(f"Report unchanged since the last render; kept {target} (use --force to re-render)")
+    else:
+        print(f"Visual audit dashboard saved as {target}")